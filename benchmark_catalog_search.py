@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for catalog search.
+
+Generates synthetic catalogs shaped like products-simple.json, replays a
+query mix (single-term, multi-term, category-filtered, price-capped,
+zero-hit) against each backend and prints machine-readable JSON with
+p50/p95/p99 latency, throughput and peak memory per backend and size.
+
+    python benchmark_catalog_search.py                          # 10^2 .. 10^6 products
+    python benchmark_catalog_search.py --sizes 1000 100000 --output bench.json
+    python benchmark_catalog_search.py --backends memory-bm25 mapped-bm25
+
+Backends are <storage>-<ranker>: storage is `memory` (CatalogSnapshot built
+in process) or `mapped` (compiled .catalog.map), ranker is `fields`, `bm25`
+or `hybrid` (BM25F fused with the semantic index).
+Timings cover search_products' work (rank, filter, materialize the top 10);
+the product_search_tool result cache is deliberately not involved.
+"""
+
+import os
+import gc
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+from typing import Dict, List, Optional, Any, Iterator, Tuple
+from catalog_index import FIELD_NAME, FIELD_DESCRIPTION, FIELD_SUBCATEGORY, tokenize
+from catalog_snapshot import CatalogSnapshot
+from catalog_ranking import BM25FRanker, FieldWeightRanker, materialize, top_products
+from catalog_semantic import HybridRanker
+from catalog_mmap import open_mapped, write_mapped
+
+try:
+    import numpy as np
+except ImportError:  # the pure-Python search paths are benchmarked instead
+    np = None
+
+DEFAULT_SIZES = (100, 1000, 10000, 100000, 1000000)
+BACKENDS = ('memory-fields', 'memory-bm25', 'memory-hybrid', 'mapped-fields', 'mapped-bm25', 'mapped-hybrid')
+QUERY_CLASSES = ('single_term', 'multi_term', 'category_filtered', 'price_capped', 'zero_hit')
+RESULT_LIMIT = 10
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'products-simple.json')
+
+def _field_score(mask: int) -> int:
+    """Root shopping_tools weights: +15 name, else +5 description, +10 subcategory"""
+    score = 0
+    if mask & FIELD_NAME:
+        score += 15
+    elif mask & FIELD_DESCRIPTION:
+        score += 5
+    if mask & FIELD_SUBCATEGORY:
+        score += 10
+    return score
+
+RANKERS = {
+    'fields': FieldWeightRanker(_field_score, min_score=10),
+    'bm25': BM25FRanker(),
+    'hybrid': HybridRanker(BM25FRanker()),
+}
+
+def load_templates() -> List[Dict[str, Any]]:
+    with open(TEMPLATE_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def synthetic_products(n: int, templates: List[Dict[str, Any]], seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    `n` products with the keys, category mix, price range and wording of the
+    templates. Each name also gets a model code, so the vocabulary keeps
+    growing with the catalog the way a real feed's does.
+    """
+    rng = random.Random(seed)
+    name_words: Dict[str, List[str]] = {}
+    description_words: Dict[str, List[str]] = {}
+    for template in templates:
+        name_words.setdefault((template.get('subcategory') or template['category']), []).extend(template['name'].split())
+        description_words.setdefault(template['category'], []).extend(template['description'].split())
+
+    for i in range(n):
+        template = templates[rng.randrange(len(templates))]
+        asin = f"B{i:09d}"
+        words = name_words[(template.get('subcategory') or template['category'])]
+        model = f"{rng.choice('ABCDEFGHJKLMNPQRSTVWXZ')}{rng.choice('ABCDEFGHJKLMNPQRSTVWXZ')}-{rng.randrange(10 ** rng.randint(2, 5))}"
+        name = ' '.join(rng.sample(words, min(len(words), rng.randint(3, 7)))) + ' ' + model
+        description = ' '.join(rng.choice(description_words[template['category']]) for _ in range(rng.randint(6, 14)))
+        yield {
+            'name': name,
+            'price': round(template['price'] * rng.uniform(0.4, 1.6), 2),
+            'asin': asin,
+            'url': f"https://www.amazon.com/dp/{asin}?tag=aipro00-20",
+            'image_url': template['image_url'],
+            'rating': round(rng.uniform(3.5, 5.0), 1),
+            'reviews': int(rng.paretovariate(1.2) * 100),
+            'description': description,
+            'category': template['category'],
+            'subcategory': (template.get('subcategory') or template['category']),
+            'badge': template.get('badge'),
+        }
+
+def query_mix(templates: List[Dict[str, Any]], per_class: int, seed: int = 0) -> List[Tuple[str, str, Optional[float], Optional[str]]]:
+    """(class, query, max_price, category) tuples, `per_class` of each class, interleaved"""
+    rng = random.Random(seed + 1)
+    words = sorted({w for t in templates for w in tokenize(t['name']) if len(w) > 3 and not w.isdigit()})
+    mix: List[Tuple[str, str, Optional[float], Optional[str]]] = []
+    for _ in range(per_class):
+        template = templates[rng.randrange(len(templates))]
+        name_words = [w for w in tokenize(template['name']) if len(w) > 2]
+        mix.append(('single_term', rng.choice(words), None, None))
+        mix.append(('multi_term', ' '.join(rng.sample(name_words, min(len(name_words), rng.randint(2, 3)))), None, None))
+        category = template['category'] if rng.random() < 0.5 else (template.get('subcategory') or template['category'])
+        mix.append(('category_filtered', rng.choice(name_words), None, category))
+        mix.append(('price_capped', rng.choice(words), float(rng.choice((25, 50, 100, 200, 500))), None))
+        mix.append(('zero_hit', f"qzx{rng.randrange(10 ** 6)}", None, None))
+    return mix
+
+def _search(snapshot: Any, ranker: Any, query: str, max_price: Optional[float], category: Optional[str]) -> List[Dict[str, Any]]:
+    """What search_products does: rank and filter, then materialize the hits"""
+    hits = top_products(snapshot, ranker, query, RESULT_LIMIT, max_price=max_price, category=category)
+    return materialize(snapshot.store, hits)
+
+def _percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100.0
+    low = int(k)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (k - low)
+
+def _latency_summary(latencies: List[float]) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    total = sum(ordered)
+    return {
+        'queries': len(ordered),
+        'p50_ms': round(_percentile(ordered, 50) * 1000, 4),
+        'p95_ms': round(_percentile(ordered, 95) * 1000, 4),
+        'p99_ms': round(_percentile(ordered, 99) * 1000, 4),
+        'mean_ms': round(total / len(ordered) * 1000, 4) if ordered else 0.0,
+        'throughput_qps': round(len(ordered) / total, 1) if total else 0.0,
+    }
+
+def _traced(fn: Any) -> Tuple[Any, float, int]:
+    """Run fn() under tracemalloc; returns (result, seconds, peak bytes)"""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        result = fn()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+def bench_backend(snapshot: Any, ranker: Any, mix: List[Tuple[str, str, Optional[float], Optional[str]]]) -> Dict[str, Any]:
+    """Warm up, time every query in the mix, then measure one traced pass for peak query memory"""
+    for _, query, max_price, category in mix[:len(QUERY_CLASSES) * 2]:
+        _search(snapshot, ranker, query, max_price, category)
+
+    latencies: Dict[str, List[float]] = {name: [] for name in QUERY_CLASSES}
+    hits: Dict[str, int] = {name: 0 for name in QUERY_CLASSES}
+    for query_class, query, max_price, category in mix:
+        started = time.perf_counter()
+        results = _search(snapshot, ranker, query, max_price, category)
+        latencies[query_class].append(time.perf_counter() - started)
+        hits[query_class] += len(results)
+
+    _, _, query_peak = _traced(lambda: [_search(snapshot, ranker, q, p, c) for _, q, p, c in mix[:len(QUERY_CLASSES) * 10]])
+    everything = [latency for values in latencies.values() for latency in values]
+    return {
+        'overall': _latency_summary(everything),
+        'classes': {name: dict(_latency_summary(values), mean_hits=round(hits[name] / len(values), 2) if values else 0.0)
+                    for name, values in latencies.items()},
+        'query_peak_bytes': query_peak,
+    }
+
+def bench_size(n: int, backends: List[str], templates: List[Dict[str, Any]], per_class: int,
+               seed: int, workdir: str) -> Dict[str, Any]:
+    version = hashlib.sha256(f"synthetic:{n}:{seed}".encode('utf-8')).hexdigest()
+    mix = query_mix(templates, per_class, seed)
+    result: Dict[str, Any] = {'products': n, 'backends': {}}
+
+    snapshot, build_seconds, build_peak = _traced(
+        lambda: CatalogSnapshot(synthetic_products(n, templates, seed), version, source='synthetic'))
+    # Build and load times are measured under tracemalloc, so they overstate untraced cost
+    result['memory_build'] = {'seconds_traced': round(build_seconds, 3), 'peak_bytes': build_peak}
+    print(f"[{n}] built in {build_seconds:.2f}s, peak {build_peak / 1e6:.1f} MB", file=sys.stderr)
+    for backend in backends:
+        storage, ranker = backend.split('-', 1)
+        if storage == 'memory':
+            result['backends'][backend] = bench_backend(snapshot, RANKERS[ranker], mix)
+            _report(n, backend, result['backends'][backend])
+
+    if any(backend.startswith('mapped-') for backend in backends):
+        path = os.path.join(workdir, f"synthetic-{n}.catalog.map")
+        started = time.perf_counter()
+        file_bytes = write_mapped(path, snapshot, version)
+        result['mapped_compile'] = {'seconds': round(time.perf_counter() - started, 3), 'file_bytes': file_bytes}
+        snapshot = None
+        (parts, _), load_seconds, load_peak = _traced(lambda: open_mapped(path))
+        result['mapped_load'] = {'seconds_traced': round(load_seconds, 6), 'peak_bytes': load_peak}
+        mapped = CatalogSnapshot.from_parts(parts, version, source=path)
+        for backend in backends:
+            storage, ranker = backend.split('-', 1)
+            if storage == 'mapped':
+                result['backends'][backend] = bench_backend(mapped, RANKERS[ranker], mix)
+                _report(n, backend, result['backends'][backend])
+        mapped = parts = None
+        gc.collect()
+        os.remove(path)
+    return result
+
+def _report(n: int, backend: str, stats: Dict[str, Any]) -> None:
+    overall = stats['overall']
+    print(f"[{n}] {backend}: p50 {overall['p50_ms']}ms p95 {overall['p95_ms']}ms p99 {overall['p99_ms']}ms "
+          f"{overall['throughput_qps']} q/s", file=sys.stderr)
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark catalog search across catalog sizes and backends")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help="catalog sizes (default: 10^2 .. 10^6)")
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS), help="backends to run (default: all)")
+    parser.add_argument('--queries', type=int, default=200, help="queries per class per backend (default: 200)")
+    parser.add_argument('--seed', type=int, default=0, help="catalog and query mix seed")
+    parser.add_argument('--output', metavar='PATH', help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    templates = load_templates()
+    report = {
+        'benchmark': 'catalog_search',
+        'commit': _git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'numpy': getattr(np, '__version__', None),
+        'seed': args.seed,
+        'queries_per_class': args.queries,
+        'result_limit': RESULT_LIMIT,
+        'sizes': [],
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in args.sizes:
+            report['sizes'].append(bench_size(n, args.backends, templates, args.queries, args.seed, workdir))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+        print(f"Saved benchmark results to: {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
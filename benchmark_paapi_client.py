@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for PA-API calls: a fresh connection per request (what
+urllib.request.urlopen does) against the keep-alive ConnectionPool.
+
+Runs against the local PA-API stand-in (paapi_stand_in), or against any
+endpoint given with --endpoint, and prints machine-readable JSON with
+p50/p95/p99 latency per client.
+
+    python benchmark_paapi_client.py                              # plain HTTP stand-in
+    python benchmark_paapi_client.py --certfile cert.pem --keyfile key.pem  # HTTPS stand-in
+    python benchmark_paapi_client.py --latency-ms 40 --requests 500
+
+With --certfile the client trusts that certificate, so the TLS handshake a
+pooled connection saves is part of the measurement; over plain HTTP only
+the TCP setup is.
+"""
+
+import sys
+import ssl
+import json
+import time
+import platform
+import argparse
+import urllib.request
+from typing import Dict, List, Optional, Any, Callable
+from catalog_stream import iter_products
+from paapi_client import ConnectionPool
+from paapi_stand_in import DEFAULT_CATALOG, LatencyModel, StandIn, start_stand_in
+
+CLIENTS = ('fresh', 'pooled')
+SEARCH_PATH = '/paapi5/searchitems'
+
+def _percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100.0
+    low = int(k)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (k - low)
+
+def _latency_summary(latencies: List[float]) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    total = sum(ordered)
+    return {
+        'requests': len(ordered),
+        'p50_ms': round(_percentile(ordered, 50) * 1000, 4),
+        'p95_ms': round(_percentile(ordered, 95) * 1000, 4),
+        'p99_ms': round(_percentile(ordered, 99) * 1000, 4),
+        'mean_ms': round(total / len(ordered) * 1000, 4) if ordered else 0.0,
+        'throughput_rps': round(len(ordered) / total, 1) if total else 0.0,
+    }
+
+def fresh_client(endpoint: str, context: Optional[ssl.SSLContext]) -> Callable[[bytes], bytes]:
+    def send(body: bytes) -> bytes:
+        request = urllib.request.Request(endpoint + SEARCH_PATH, data=body, method='POST',
+                                         headers={'Content-Type': 'application/json; charset=utf-8'})
+        with urllib.request.urlopen(request, timeout=10, context=context) as response:
+            return response.read()
+    return send
+
+def pooled_client(pool: ConnectionPool) -> Callable[[bytes], bytes]:
+    def send(body: bytes) -> bytes:
+        return pool.request('POST', SEARCH_PATH, body=body,
+                            headers={'Content-Type': 'application/json; charset=utf-8'}).raise_for_status().body
+    return send
+
+def bench_client(send: Callable[[bytes], bytes], requests: int) -> Dict[str, Any]:
+    body = json.dumps({'Keywords': 'wireless headphones', 'ItemCount': 5}).encode('utf-8')
+    send(body)  # DNS and first-call costs stay out of both clients' numbers
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        send(body)
+        latencies.append(time.perf_counter() - started)
+    return _latency_summary(latencies)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark fresh vs pooled connections for PA-API calls")
+    parser.add_argument('--endpoint', help="benchmark this endpoint instead of the local stand-in")
+    parser.add_argument('--certfile', help="serve the stand-in over HTTPS with this certificate (trusted by the client)")
+    parser.add_argument('--keyfile', help="private key for --certfile")
+    parser.add_argument('--cafile', help="CA bundle to trust for --endpoint")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="stand-in server think time per request")
+    parser.add_argument('--latency-p99-ms', type=float, help="stand-in p99 think time; lognormal when above --latency-ms")
+    parser.add_argument('--requests', type=int, default=200, help="requests per client (default: 200)")
+    parser.add_argument('--clients', nargs='+', choices=CLIENTS, default=list(CLIENTS), help="clients to run (default: all)")
+    parser.add_argument('--output', metavar='PATH', help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    server = None
+    endpoint, cafile = args.endpoint, args.cafile
+    if endpoint is None:
+        stand_in = StandIn(list(iter_products(DEFAULT_CATALOG)), LatencyModel(args.latency_ms, args.latency_p99_ms))
+        server = start_stand_in(stand_in, certfile=args.certfile, keyfile=args.keyfile)
+        scheme = 'https' if args.certfile else 'http'
+        endpoint, cafile = f"{scheme}://localhost:{server.server_address[1]}", args.certfile
+    context = ssl.create_default_context(cafile=cafile) if endpoint.startswith('https') else None
+
+    report: Dict[str, Any] = {
+        'benchmark': 'paapi_client',
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'endpoint': endpoint if args.endpoint else 'stand-in',
+        'tls': endpoint.startswith('https'),
+        'server_latency_ms': args.latency_ms if server else None,
+        'clients': {},
+    }
+    try:
+        for client in args.clients:
+            if client == 'fresh':
+                report['clients'][client] = bench_client(fresh_client(endpoint, context), args.requests)
+            else:
+                pool = ConnectionPool(endpoint, context=context)
+                report['clients'][client] = dict(bench_client(pooled_client(pool), args.requests), pool=pool.stats())
+                pool.close()
+            summary = report['clients'][client]
+            print(f"{client}: p50 {summary['p50_ms']}ms p95 {summary['p95_ms']}ms p99 {summary['p99_ms']}ms",
+                  file=sys.stderr)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+        print(f"Saved benchmark results to: {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+# catalog_artifact.py
+# Precompiled binary catalog: store + indexes serialized once at build time, loaded with a single read
+
+import os
+import struct
+import pickle
+import hashlib
+import logging
+from typing import Dict, Optional, Any, Tuple
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+ARTIFACT_MAGIC = b'ALCATLG\x00'
+# Bump whenever ColumnarCatalog or any index changes shape; older artifacts are then rejected
+ARTIFACT_SCHEMA_VERSION = 7  # 2: normalized index terms, 3: semantic vectors, 4: BM25F corpus statistics, 5: -ie stemming, fewer stopwords, 6: URLs tagged when served, 7: unpriced = inf
+ARTIFACT_SUFFIX = '.catalog.bin'
+
+# magic, schema version, payload sha256, source sha256, payload length
+_HEADER = struct.Struct('<8sI64s64sQ')
+
+# Components of a CatalogSnapshot stored in the artifact
+ARTIFACT_PARTS = ('store', 'index', 'bm25', 'price_index', 'facets', 'semantic')
+
+class ArtifactError(ValueError):
+    """Artifact is missing, corrupt, stale or from another schema version"""
+
+def artifact_path_for(path: str) -> str:
+    """products-simple.json -> products-simple.catalog.bin"""
+    return os.path.splitext(path)[0] + ARTIFACT_SUFFIX
+
+def write_artifact(path: str, snapshot: Any, source_hash: str) -> int:
+    """
+    Serialize a built snapshot's store and indexes. `source_hash` is the
+    sha256 of the JSON it was compiled from, so loaders can detect an
+    artifact that no longer matches its source. Returns bytes written.
+    """
+    payload = pickle.dumps({part: getattr(snapshot, part) for part in ARTIFACT_PARTS},
+                           protocol=pickle.HIGHEST_PROTOCOL)
+    header = _HEADER.pack(ARTIFACT_MAGIC, ARTIFACT_SCHEMA_VERSION,
+                          hashlib.sha256(payload).hexdigest().encode('ascii'),
+                          source_hash.encode('ascii'), len(payload))
+
+    # Write beside the target and rename, so a reader never sees half an artifact
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(payload)
+    os.replace(tmp_path, path)
+    return len(header) + len(payload)
+
+def read_artifact(path: str, source_hash: Optional[str] = None) -> Tuple[Dict[str, Any], str]:
+    """
+    Load an artifact's snapshot parts and source hash with one read.
+    Raises ArtifactError on a wrong magic/schema, a payload that fails its
+    content hash, or (when `source_hash` is given) an artifact compiled from
+    a different source. Only load artifacts produced by this package's build.
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        raise ArtifactError(f"Cannot read catalog artifact {path}: {str(e)}")
+
+    if len(data) < _HEADER.size:
+        raise ArtifactError(f"Catalog artifact {path} is truncated")
+    magic, schema, payload_hash, artifact_source, length = _HEADER.unpack_from(data)
+    if magic != ARTIFACT_MAGIC:
+        raise ArtifactError(f"{path} is not a catalog artifact")
+    if schema != ARTIFACT_SCHEMA_VERSION:
+        raise ArtifactError(f"Catalog artifact {path} has schema {schema}, expected {ARTIFACT_SCHEMA_VERSION}")
+    artifact_source = artifact_source.decode('ascii')
+    if source_hash is not None and artifact_source != source_hash:
+        raise ArtifactError(f"Catalog artifact {path} is stale (built from {artifact_source[:12]}, source is {source_hash[:12]})")
+
+    payload = memoryview(data)[_HEADER.size:]
+    if len(payload) != length or hashlib.sha256(payload).hexdigest().encode('ascii') != payload_hash:
+        raise ArtifactError(f"Catalog artifact {path} failed its content hash")
+
+    try:
+        parts = pickle.loads(payload)
+    except Exception as e:
+        # e.g. a class the artifact references was renamed without a schema bump
+        raise ArtifactError(f"Catalog artifact {path} could not be decoded: {str(e)}")
+    if not isinstance(parts, dict) or any(part not in parts for part in ARTIFACT_PARTS):
+        raise ArtifactError(f"Catalog artifact {path} is missing snapshot parts")
+    return parts, artifact_source
@@ -0,0 +1,338 @@
+# catalog_delta.py
+# Incremental catalog updates: delta files of upserts/deletes layered onto an immutable base snapshot
+
+import os
+import json
+import time
+import hashlib
+import logging
+from typing import Dict, List, Optional, Any, Callable, Iterable, Iterator, Set, Tuple
+from catalog_snapshot import CatalogSnapshot
+from catalog_stream import validate_product
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# How often a warm container looks for new delta files
+CATALOG_DELTA_POLL_SECONDS = float(os.environ.get('CATALOG_DELTA_POLL_SECONDS', '30'))
+
+DELTA_SUFFIX = '.json'
+
+class DeltaError(ValueError):
+    """A delta file could not be read or parsed"""
+
+def parse_delta(data: bytes, name: str) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    A delta file is a JSON object:
+
+        {"upserts": [{"asin": "B0...", "price": 19.99}, ...], "deletes": ["B0...", ...]}
+
+    An upsert is merged over the product's current record, so a price change
+    only needs the ASIN and the price; an unknown ASIN is a new product and
+    needs a full record. Returns (upserts, deleted ASINs).
+    """
+    try:
+        delta = json.loads(data)
+    except ValueError as e:
+        raise DeltaError(f"Delta {name} is not valid JSON: {str(e)}")
+    if not isinstance(delta, dict):
+        raise DeltaError(f"Delta {name} must be a JSON object")
+    upserts, deletes = delta.get('upserts') or [], delta.get('deletes') or []
+    if not isinstance(upserts, list) or not isinstance(deletes, list):
+        raise DeltaError(f"Delta {name}: upserts and deletes must be arrays")
+    for record in upserts:
+        if not isinstance(record, dict) or not isinstance(record.get('asin'), str) or not record['asin']:
+            raise DeltaError(f"Delta {name}: every upsert needs an asin")
+    if not all(isinstance(asin, str) for asin in deletes):
+        raise DeltaError(f"Delta {name}: deletes must be ASIN strings")
+    return upserts, deletes
+
+class DirectoryDeltaSource:
+    """Delta files (*.json) in a local directory, applied in file name order"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def list(self) -> List[Tuple[str, str]]:
+        """(name, change tag) per delta file, sorted by name"""
+        try:
+            names = sorted(name for name in os.listdir(self.directory) if name.endswith(DELTA_SUFFIX))
+        except FileNotFoundError:
+            return []
+        entries = []
+        for name in names:
+            stat = os.stat(os.path.join(self.directory, name))
+            entries.append((name, f"{stat.st_mtime_ns}:{stat.st_size}"))
+        return entries
+
+    def read(self, name: str) -> bytes:
+        with open(os.path.join(self.directory, name), 'rb') as f:
+            return f.read()
+
+class S3DeltaSource:
+    """
+    Delta objects under an S3 (or S3-compatible, via `endpoint_url`) prefix,
+    applied in key order. The client is created on first use.
+    """
+
+    def __init__(self, bucket: str, prefix: str = '', endpoint_url: Optional[str] = None, client: Any = None):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.endpoint_url = endpoint_url
+        self._client = client
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            import boto3
+            self._client = boto3.client('s3', endpoint_url=self.endpoint_url)
+        return self._client
+
+    def list(self) -> List[Tuple[str, str]]:
+        entries = []
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for item in page.get('Contents', []):
+                if item['Key'].endswith(DELTA_SUFFIX):
+                    entries.append((item['Key'], item['ETag']))
+        return sorted(entries)
+
+    def read(self, name: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=name)['Body'].read()
+
+class LayeredStore:
+    """
+    Store of a LayeredSnapshot: base product ids first, overlay ids after them.
+    Replaced and deleted base products are skipped by find() and products().
+    """
+
+    def __init__(self, base: Any, overlay: Any, live: bytearray):
+        self.base = base
+        self.overlay = overlay
+        self.live = live
+        self.offset = len(base)
+        self.rating = _Column(base.rating, overlay.rating, self.offset)
+        self.price = _Column(base.price, overlay.price, self.offset)
+
+    def __len__(self) -> int:
+        return self.offset + len(self.overlay)
+
+    def find(self, asin: str) -> Optional[int]:
+        doc_id = self.overlay.find(asin)
+        if doc_id is not None:
+            return self.offset + doc_id
+        doc_id = self.base.find(asin)
+        return doc_id if doc_id is not None and self.live[doc_id] else None
+
+    def to_dict(self, doc_id: int, **extra: Any) -> Dict[str, Any]:
+        if doc_id >= self.offset:
+            return self.overlay.to_dict(doc_id - self.offset, **extra)
+        return self.base.to_dict(doc_id, **extra)
+
+    def live_ids(self) -> Iterator[int]:
+        for doc_id in range(self.offset):
+            if self.live[doc_id]:
+                yield doc_id
+        yield from range(self.offset, len(self))
+
+class _Column:
+    """Read-only concatenation of a base column and an overlay column"""
+
+    def __init__(self, base: Any, overlay: Any, offset: int):
+        self.base = base
+        self.overlay = overlay
+        self.offset = offset
+
+    def __len__(self) -> int:
+        return self.offset + len(self.overlay)
+
+    def __getitem__(self, doc_id: int) -> Any:
+        return self.overlay[doc_id - self.offset] if doc_id >= self.offset else self.base[doc_id]
+
+class LayeredIndex:
+    """
+    Keyword index of a LayeredSnapshot, with CatalogIndex's lookups in
+    layered product ids: base matches of replaced and deleted products are
+    dropped and overlay matches are shifted past the base.
+    """
+
+    def __init__(self, base: Any, overlay: Any, live: bytearray):
+        self.base = base
+        self.overlay = overlay
+        self.live = live
+        self.offset = len(live)
+
+    def __len__(self) -> int:
+        return self.offset + len(self.overlay)
+
+    def match(self, word: str) -> Dict[int, int]:
+        matches = {doc_id: mask for doc_id, mask in self.base.match(word).items() if self.live[doc_id]}
+        for doc_id, mask in self.overlay.match(word).items():
+            matches[self.offset + doc_id] = mask
+        return matches
+
+    def score(self, words: Iterable[str], weigh: Callable[[int], int],
+              allowed: Optional[bytearray] = None) -> Dict[int, int]:
+        scores: Dict[int, int] = {}
+        for word in words:
+            for doc_id, mask in self.match(word).items():
+                if allowed is None or allowed[doc_id]:
+                    scores[doc_id] = scores.get(doc_id, 0) + weigh(mask)
+        return scores
+
+class LayeredFacets:
+    """Facet counts of a LayeredSnapshot (live base products plus the overlay)"""
+
+    def __init__(self, base: CatalogSnapshot, overlay: CatalogSnapshot, dead: List[int]):
+        counts = base.facets.counts()
+        for doc_id in dead:
+            product = base.store.to_dict(doc_id)
+            for level in ('category', 'subcategory'):
+                value = product.get(level)
+                if value in counts[level]:
+                    counts[level][value] -= 1
+        for level, values in overlay.facets.counts().items():
+            for value, count in values.items():
+                counts[level][value] = counts[level].get(value, 0) + count
+        self._counts = {level: {value: count for value, count in values.items() if count}
+                        for level, values in counts.items()}
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        return {level: dict(values) for level, values in self._counts.items()}
+
+class LayeredSnapshot:
+    """
+    A base CatalogSnapshot plus an overlay snapshot of every product upserted
+    by the applied deltas, and a liveness bitmap over the base (0 = replaced
+    or deleted). Applying a delta builds a new overlay from the upserts only,
+    never the base, and the result is as immutable as any snapshot.
+    """
+
+    __slots__ = ('base', 'overlay', 'live', 'store', 'index', 'facets', 'version', 'source', 'deltas', 'loaded_at')
+
+    def __init__(self, base: CatalogSnapshot, overlay: CatalogSnapshot, dead: List[int],
+                 version: str, deltas: Tuple[str, ...]):
+        self.base = base
+        self.overlay = overlay
+        self.live = bytearray(b'\x01') * len(base)
+        for doc_id in dead:
+            self.live[doc_id] = 0
+        self.store = LayeredStore(base.store, overlay.store, self.live)
+        self.index = LayeredIndex(base.index, overlay.index, self.live)
+        self.facets = LayeredFacets(base, overlay, dead)
+        self.version = version
+        self.source = base.source
+        self.deltas = deltas
+        self.loaded_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self.base) - self.live.count(0) + len(self.overlay)
+
+    def segments(self) -> List[Tuple[CatalogSnapshot, int, Optional[bytearray]]]:
+        return [(self.base, 0, self.live), (self.overlay, len(self.base), None)]
+
+    def products(self) -> List[Dict[str, Any]]:
+        return [self.store.to_dict(doc_id) for doc_id in self.store.live_ids()]
+
+class DeltaFeed:
+    """
+    Applies a delta source to base snapshots for SnapshotCache. Deltas are
+    applied in name order, later ones winning; only files that are new since
+    the last poll are read. If an applied file changes or disappears, or the
+    base is reloaded, every delta is re-applied from scratch. A delta that
+    fails to load is logged and retried on the next poll, and the deltas
+    before it stay applied. Each new delta rebuilds the overlay from every
+    product upserted since the base was compiled, so a poll costs more as
+    delta history accumulates; rebuild and redeploy the catalog
+    (extract_products.py) to fold the deltas into the base once the overlay
+    grows to a sizeable share of the catalog.
+    """
+
+    def __init__(self, source: Any, poll_seconds: float = CATALOG_DELTA_POLL_SECONDS):
+        self.source = source
+        self.poll_seconds = poll_seconds
+        self._base: Optional[CatalogSnapshot] = None
+        self._applied: List[Tuple[str, str]] = []
+        self._upserts: Dict[str, Dict[str, Any]] = {}
+        self._deletes: Set[str] = set()
+        self._current: Any = None
+
+    def apply(self, base: CatalogSnapshot) -> Any:
+        """Snapshot serving `base` with every delta in the source applied"""
+        try:
+            entries = self.source.list()
+        except Exception as e:
+            logger.error(f"Error listing catalog deltas: {str(e)}")
+            return self._current if self._base is base else base
+
+        if self._base is not base or entries[:len(self._applied)] != self._applied:
+            self._base, self._applied, self._upserts, self._deletes = base, [], {}, set()
+            self._current = base
+        pending = entries[len(self._applied):]
+        if not pending:
+            return self._current
+
+        applied = len(self._applied)
+        for name, tag in pending:
+            try:
+                upserts, deletes = parse_delta(self.source.read(name), name)
+            except Exception as e:
+                logger.error(f"Error loading catalog delta {name}: {str(e)}")
+                break
+            self._merge(base, name, upserts, deletes)
+            self._applied.append((name, tag))
+        if len(self._applied) == applied:
+            return self._current
+        self._current = self._layer(base)
+        logger.info(f"Applied {len(self._applied)} catalog deltas to {base.version[:12]}: "
+                    f"{len(self._upserts)} upserted, {len(self._deletes)} deleted")
+        return self._current
+
+    def _merge(self, base: CatalogSnapshot, name: str, upserts: List[Dict[str, Any]], deletes: List[str]) -> None:
+        for asin in deletes:
+            self._upserts.pop(asin, None)
+            self._deletes.add(asin)
+        for record in upserts:
+            asin = record['asin']
+            current = self._upserts.get(asin)
+            if current is None and asin not in self._deletes:
+                doc_id = base.store.find(asin)
+                current = base.store.to_dict(doc_id) if doc_id is not None else {}
+            product = dict(current or {}, **record)
+            problem = validate_product(product)
+            if problem is not None:
+                logger.warning(f"Skipping upsert of {asin} in delta {name}: {problem}")
+                continue
+            self._upserts[asin] = product
+            self._deletes.discard(asin)
+
+    def _layer(self, base: CatalogSnapshot) -> Any:
+        if not self._upserts and not self._deletes:
+            return base
+        digest = hashlib.sha256(base.version.encode('utf-8'))
+        for name, tag in self._applied:
+            digest.update(f"\n{name}\t{tag}".encode('utf-8'))
+        version = digest.hexdigest()
+
+        # Base rows replaced by an upsert or deleted; their ASINs now resolve to the overlay or nowhere
+        dead = sorted({doc_id for doc_id in map(base.store.find, list(self._upserts) + list(self._deletes))
+                       if doc_id is not None})
+        overlay = CatalogSnapshot(self._upserts.values(), version, source='delta', corpus=base,
+                                  removed=[base.store.to_dict(doc_id) for doc_id in dead])
+        return LayeredSnapshot(base, overlay, dead, version, tuple(name for name, _ in self._applied))
+
+def delta_feed_from_env() -> Optional[DeltaFeed]:
+    """
+    DeltaFeed for CATALOG_DELTA_LOCATION: `s3://bucket/prefix` (endpoint from
+    CATALOG_DELTA_ENDPOINT for S3-compatible stores) or a local directory.
+    None when unset, i.e. no delta updates.
+    """
+    location = os.environ.get('CATALOG_DELTA_LOCATION')
+    if not location:
+        return None
+    if location.startswith('s3://'):
+        bucket, _, prefix = location[len('s3://'):].partition('/')
+        source: Any = S3DeltaSource(bucket, prefix, endpoint_url=os.environ.get('CATALOG_DELTA_ENDPOINT'))
+    else:
+        source = DirectoryDeltaSource(location)
+    return DeltaFeed(source)
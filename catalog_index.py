@@ -0,0 +1,287 @@
+# catalog_index.py
+# Inverted token index over the product catalog
+
+import re
+import logging
+from functools import lru_cache
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Any, Callable, Iterable, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Lambda packages ship without numpy
+    np = None
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Field bits stored on every posting
+FIELD_NAME = 1
+FIELD_DESCRIPTION = 2
+FIELD_SUBCATEGORY = 4
+FIELD_CATEGORY = 8
+
+INDEXED_FIELDS = (
+    ('name', FIELD_NAME),
+    ('description', FIELD_DESCRIPTION),
+    ('subcategory', FIELD_SUBCATEGORY),
+    ('category', FIELD_CATEGORY),
+)
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Function words in product text and spoken queries; never indexed or searched.
+# Words with meaning ("best", "cheap") stay searchable; price phrases become a price cap (see split_price_cap)
+STOPWORDS = frozenset((
+    'a', 'an', 'and', 'the', 'for', 'of', 'to', 'in', 'on', 'with', 'by', 'at', 'or', 'from',
+    'is', 'it', 'its', 'my', 'me', 'i', 'you', 'your', 'some', 'any', 'this', 'that',
+))
+
+# "under $50", "less than 30 bucks", "below 100 dollars"...
+_PRICE_CAP_RE = re.compile(
+    r'\b(?:under|below|less\s+than|cheaper\s+than|up\s+to|max(?:imum)?|no\s+more\s+than)\s*\$?\s*'
+    r'(\d+(?:\.\d+)?)\s*(?:dollars?|bucks|usd)?\b', re.IGNORECASE)
+
+# Synonyms fold onto their first (stemmed) term at index and query time alike
+SYNONYM_GROUPS = (
+    ('television', 'tv'),
+    ('earphone', 'earbud'),
+    ('smartphone', 'cellphone'),
+    ('refrigerator', 'fridge'),
+    ('sofa', 'couch'),
+    ('bicycle', 'bike'),
+    ('vacuum', 'hoover'),
+    ('computer', 'pc'),
+)
+SYNONYMS = {variant: group[0] for group in SYNONYM_GROUPS for variant in group[1:]}
+
+# Distinct query words whose normalized terms are memoized
+QUERY_TERM_CACHE_SIZE = 4096
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase alphanumeric tokens"""
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+def stem(token: str) -> str:
+    """
+    Light plural stemming: headphones -> headphone, batteries -> battery,
+    watches -> watch. "-ies" plurals can come from "-y" or "-ie" singulars,
+    so "-ie" words fold onto "-y" too (smoothie, smoothies -> smoothy).
+    Short tokens and model numbers are left alone.
+    """
+    if not token.isalpha():
+        return token
+    if token.endswith('ie') and len(token) >= 3:
+        return token[:-2] + 'y'
+    if len(token) <= 3:
+        return token
+    if token.endswith('ies') and not token.endswith(('aies', 'eies')):
+        return token[:-3] + 'y'
+    if token.endswith(('sses', 'xes', 'ches', 'shes', 'zes')):
+        return token[:-2]
+    if token.endswith('s') and not token.endswith(('ss', 'us', 'is')):
+        return token[:-1]
+    return token
+
+def normalize(token: str) -> Optional[str]:
+    """Index term for a token, or None for a stopword"""
+    if token in STOPWORDS:
+        return None
+    token = stem(token)
+    return SYNONYMS.get(token, token)
+
+def analyze(text: str) -> List[str]:
+    """Text -> normalized index terms, in order"""
+    terms = []
+    for token in tokenize(text):
+        term = normalize(token)
+        if term is not None:
+            terms.append(term)
+    return terms
+
+@lru_cache(maxsize=QUERY_TERM_CACHE_SIZE)
+def query_terms(word: str) -> Tuple[str, ...]:
+    """Normalized terms for one query word; the same analysis the index was built with"""
+    return tuple(analyze(word))
+
+class CatalogIndex:
+    """
+    Maps each normalized term (see analyze) to a posting list of
+    {product_id: field_mask}. Product ids are insertion order, matching the
+    catalog store's row numbers.
+    """
+
+    def __init__(self, products: Optional[Iterable[Dict[str, Any]]] = None):
+        self.size = 0
+        self.postings: Dict[str, Dict[int, int]] = {}
+        for product in products or ():
+            self.add(product)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, product: Dict[str, Any]) -> int:
+        """Index a product and return its product id"""
+        doc_id = self.size
+        self.size += 1
+        for field, bit in INDEXED_FIELDS:
+            for term in analyze(product.get(field, '')):
+                posting = self.postings.setdefault(term, {})
+                posting[doc_id] = posting.get(doc_id, 0) | bit
+        return doc_id
+
+    def match(self, word: str) -> Dict[int, int]:
+        """
+        Products matching a query word, with the fields it was found in.
+        Lookups are exact on normalized terms, so plurals and synonyms cost
+        nothing extra. Punctuated words ("wh-1000xm5") must match every part
+        in the same field.
+        """
+        parts = query_terms(word)
+        if not parts:
+            return {}
+        matches = self.postings.get(parts[0], {})
+        for part in parts[1:]:
+            other = self.postings.get(part, {})
+            matches = {doc_id: mask & other[doc_id] for doc_id, mask in matches.items()
+                       if mask & other.get(doc_id, 0)}
+        return matches
+
+    def score(self, words: Iterable[str], weigh: Callable[[int], int],
+              allowed: Optional[bytearray] = None) -> Dict[int, int]:
+        """Sum weigh(field_mask) per product over all query words, skipping products not `allowed`"""
+        scores: Dict[int, int] = {}
+        for word in words:
+            for doc_id, mask in self.match(word).items():
+                if allowed is None or allowed[doc_id]:
+                    scores[doc_id] = scores.get(doc_id, 0) + weigh(mask)
+        return scores
+
+class SortedColumnIndex:
+    """
+    Product ids ordered by a numeric column (price, rating...), so a range
+    filter is two bisects plus a slice instead of a scan over the catalog.
+    """
+
+    def __init__(self, column: Sequence[float]):
+        self.ids = array('i', sorted(range(len(column)), key=column.__getitem__))
+        self.values = array('d', (column[i] for i in self.ids))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def span(self, low: Optional[float] = None, high: Optional[float] = None) -> Tuple[int, int]:
+        """Positions in `ids` of the products with low <= value <= high"""
+        start = bisect_left(self.values, low) if low is not None else 0
+        end = bisect_right(self.values, high) if high is not None else len(self.values)
+        return start, max(start, end)
+
+    def mask(self, low: Optional[float] = None, high: Optional[float] = None) -> Optional[bytearray]:
+        """
+        Candidate bitmap (one byte per product) for a value range, or None when
+        the range covers the whole catalog and filtering would be a no-op.
+        """
+        start, end = self.span(low, high)
+        size = len(self.ids)
+        if start == 0 and end == size:
+            return None
+        if np is not None:
+            allowed = bytearray(size)
+            np.frombuffer(allowed, dtype=np.bool_)[np.frombuffer(self.ids, dtype=np.int32)[start:end]] = True
+            return allowed
+        # Touch whichever side of the range is smaller
+        if (end - start) * 2 <= size:
+            allowed = bytearray(size)
+            for doc_id in self.ids[start:end]:
+                allowed[doc_id] = 1
+        else:
+            allowed = bytearray(b'\x01') * size
+            for doc_id in self.ids[:start]:
+                allowed[doc_id] = 0
+            for doc_id in self.ids[end:]:
+                allowed[doc_id] = 0
+        return allowed
+
+class FacetIndex:
+    """
+    Category and subcategory -> product ids, with counts fixed at catalog load.
+    A category filter matches either level, as search_products always has.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.categories: Dict[str, array] = {}
+        self.subcategories: Dict[str, array] = {}
+        self._masks: Dict[str, bytearray] = {}
+
+    def add(self, product: Dict[str, Any]) -> int:
+        doc_id = self.size
+        self.size += 1
+        category = product.get('category')
+        subcategory = product.get('subcategory')
+        if category:
+            self.categories.setdefault(category, array('i')).append(doc_id)
+        if subcategory:
+            self.subcategories.setdefault(subcategory, array('i')).append(doc_id)
+        return doc_id
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Product counts per facet value"""
+        return {
+            'category': {value: len(ids) for value, ids in self.categories.items()},
+            'subcategory': {value: len(ids) for value, ids in self.subcategories.items()},
+        }
+
+    def mask(self, value: str) -> bytearray:
+        """Candidate bitmap for a category or subcategory; built once per value"""
+        allowed = self._masks.get(value)
+        if allowed is None:
+            allowed = bytearray(self.size)
+            for ids in (self.categories.get(value), self.subcategories.get(value)):
+                for doc_id in ids or ():
+                    allowed[doc_id] = 1
+            self._masks[value] = allowed
+        return allowed
+
+def intersect_masks(a: Optional[bytearray], b: Optional[bytearray]) -> Optional[bytearray]:
+    """AND two candidate bitmaps; None means no constraint"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return bytearray((int.from_bytes(a, 'little') & int.from_bytes(b, 'little')).to_bytes(len(a), 'little'))
+
+def split_price_cap(query: str) -> Tuple[str, Optional[float]]:
+    """(query without its price phrase, the lowest price cap it named), e.g. "speaker under $50" -> ("speaker", 50.0)"""
+    caps = [float(match) for match in _PRICE_CAP_RE.findall(query)]
+    if not caps:
+        return query, None
+    return ' '.join(_PRICE_CAP_RE.sub(' ', query).split()), min(caps)
+
+def query_words(query: str, min_length: int = 0) -> List[str]:
+    """Lowercase query words longer than min_length that contain a searchable token (stopwords included)"""
+    return [w for w in query.lower().split() if len(w) > min_length and _TOKEN_RE.search(w)]
+
+# Word pairs that must share (or not share) a term; `python catalog_index.py` checks them
+_SAME_TERM = (('smoothie', 'smoothies'), ('battery', 'batteries'), ('headphone', 'headphones'), ('watch', 'watches'),
+              ('hoodie', 'hoodies'), ('movie', 'movies'), ('tv', 'television'), ('pie', 'pies'))
+_DIFFERENT_TERM = (('glass', 'glas'), ('bus', 'bu'))
+_PRICE_CAPS = (('speaker under $50', ('speaker', 50.0)), ('headphones less than 30 bucks', ('headphones', 30.0)),
+               ('cheap laptop', ('cheap laptop', None)), ('tv below 500 dollars', ('tv', 500.0)))
+
+def check_analyzer() -> List[str]:
+    """Descriptions of the analyzer cases that fail (empty when all pass)"""
+    failures = [f"{a} != {b}" for a, b in _SAME_TERM if analyze(a) != analyze(b)]
+    failures += [f"{a} == {b}" for a, b in _DIFFERENT_TERM if analyze(a) == analyze(b)]
+    failures += [f"split_price_cap({query!r}) = {split_price_cap(query)!r}"
+                 for query, expected in _PRICE_CAPS if split_price_cap(query) != expected]
+    failures += [f"{word} is a stopword" for word in ('best', 'cheap', 'under') if normalize(word) is None]
+    return failures
+
+if __name__ == '__main__':
+    failed = check_analyzer()
+    print(f"Analyzer checks: {'FAILED ' + '; '.join(failed) if failed else 'all passed'}")
+    raise SystemExit(1 if failed else 0)
@@ -0,0 +1,310 @@
+# catalog_mmap.py
+# Memory-mapped catalog: fixed-width columns and index arrays read in place, records decoded on demand
+
+import os
+import sys
+import json
+import mmap
+import struct
+import logging
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Dict, List, Optional, Any, Iterator, Sequence, Tuple
+from catalog_index import CatalogIndex, FacetIndex, SortedColumnIndex
+from catalog_ranking import BM25FIndex
+from catalog_semantic import SemanticIndex
+from catalog_artifact import ArtifactError
+from catalog_store import bare_product_url, tagged_product_url
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+MAPPED_MAGIC = b'ALCMMAP\x00'
+# Bump whenever a section is added, removed or changes meaning
+MAPPED_SCHEMA_VERSION = 7  # 2: normalized index terms, 3: semantic vectors, 4: BM25F corpus statistics, 5: -ie stemming, fewer stopwords, 6: untagged URLs, 7: unpriced = inf
+MAPPED_SUFFIX = '.catalog.map'
+
+# magic, schema version, source sha256, header length; the JSON header follows
+_PREAMBLE = struct.Struct('<8sI64sQ')
+_ALIGN = 8
+
+def mapped_path_for(path: str) -> str:
+    """products-simple.json -> products-simple.catalog.map"""
+    return os.path.splitext(path)[0] + MAPPED_SUFFIX
+
+class StringTable(Sequence):
+    """UTF-8 strings packed back to back; string i is heap[offsets[i]:offsets[i + 1]]"""
+
+    def __init__(self, offsets: Sequence[int], heap: memoryview):
+        self.offsets = offsets
+        self.heap = heap
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return str(self.heap[self.offsets[i]:self.offsets[i + 1]], 'utf-8')
+
+class TermSpans(Mapping):
+    """Sorted vocabulary -> (start, end) row span, looked up by bisect instead of a dict"""
+
+    def __init__(self, vocabulary: StringTable, rows: Sequence[int]):
+        self.vocabulary = vocabulary
+        self.rows = rows
+        self._terms: Optional[List[str]] = None
+
+    def _position(self, term: str) -> int:
+        i = bisect_left(self.vocabulary, term)
+        if i < len(self.vocabulary) and self.vocabulary[i] == term:
+            return i
+        return -1
+
+    def __getitem__(self, term: str) -> Tuple[int, int]:
+        i = self._position(term) if isinstance(term, str) else -1
+        if i < 0:
+            raise KeyError(term)
+        return self.rows[i], self.rows[i + 1]
+
+    def __contains__(self, term: Any) -> bool:
+        return isinstance(term, str) and self._position(term) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        # Iterating the vocabulary decodes every term once, on first use
+        if self._terms is None:
+            self._terms = list(self.vocabulary)
+        return iter(self._terms)
+
+    def __len__(self) -> int:
+        return len(self.vocabulary)
+
+class MappedPostings(TermSpans):
+    """CatalogIndex postings: term -> {product_id: field_mask}, built from the mapped row"""
+
+    def __init__(self, vocabulary: StringTable, rows: Sequence[int], docs: Sequence[int], masks: Sequence[int]):
+        super().__init__(vocabulary, rows)
+        self.docs = docs
+        self.masks = masks
+
+    def __getitem__(self, term: str) -> Dict[int, int]:
+        start, end = super().__getitem__(term)
+        return dict(zip(self.docs[start:end], self.masks[start:end]))
+
+class MappedCatalog:
+    """
+    Read-only ColumnarCatalog over a mapped file. Price/rating/reviews are
+    zero-copy column views; a product's strings stay encoded in the file until
+    to_dict() is called for it, so only returned products are ever decoded.
+    """
+
+    def __init__(self, size: int, sections: Dict[str, Any]):
+        self.size = size
+        self.price = sections['price']
+        self.rating = sections['rating']
+        self.reviews = sections['reviews']
+        self._records = StringTable(sections['record_offsets'], sections['record_heap'])
+        self._asins = StringTable(sections['asin_offsets'], sections['asin_heap'])
+        self._asin_order = sections['asin_order']
+
+    def __len__(self) -> int:
+        return self.size
+
+    def asin(self, doc_id: int) -> str:
+        return self._asins[doc_id]
+
+    def find(self, asin: str) -> Optional[int]:
+        """Product id for an ASIN: bisect over product ids sorted by ASIN"""
+        order, asins = self._asin_order, self._asins
+        low, high = 0, len(order)
+        while low < high:
+            mid = (low + high) // 2
+            if asins[order[mid]] < asin:
+                low = mid + 1
+            else:
+                high = mid
+        if low < len(order) and asins[order[low]] == asin:
+            return order[low]
+        return None
+
+    def to_dict(self, doc_id: int, **extra: Any) -> Dict[str, Any]:
+        """Decode one product; the stored record already has the handlers' key order, but not the partner tag"""
+        product = json.loads(self._records[doc_id])
+        if 'url' in product:
+            product['url'] = tagged_product_url(product['url'])
+        product.update(extra)
+        return product
+
+def _restore(cls: type, **attributes: Any) -> Any:
+    """Instance of an index class with its arrays replaced by mapped views"""
+    instance = cls.__new__(cls)
+    instance.__dict__.update(attributes)
+    return instance
+
+def _string_section(values: Sequence[str]) -> Tuple[array, bytes]:
+    offsets = array('q', [0])
+    heap = bytearray()
+    for value in values:
+        heap += value.encode('utf-8')
+        offsets.append(len(heap))
+    return offsets, bytes(heap)
+
+def write_mapped(path: str, snapshot: Any, source_hash: str, source_size: Optional[int] = None) -> int:
+    """
+    Lay a built snapshot out as fixed-width sections plus string heaps.
+    `source_size` (bytes of the source JSON) lets open_mapped catch most
+    stale maps with a stat. Returns bytes written. The file is replaced atomically.
+    """
+    store, index, bm25 = snapshot.store, snapshot.index, snapshot.bm25
+    size = len(store)
+    sections: Dict[str, Any] = {
+        'price': array('d', store.price),
+        'rating': array('d', store.rating),
+        'reviews': array('q', store.reviews),
+    }
+
+    # Records are stored as their materialized dicts so decoding gives back exactly to_dict(),
+    # except that the partner tag is left off product URLs and added when they are decoded
+    records = []
+    for doc_id in range(size):
+        product = store.to_dict(doc_id)
+        if 'url' in product:
+            product['url'] = bare_product_url(product['url'])
+        records.append(json.dumps(product, ensure_ascii=False))
+    sections['record_offsets'], sections['record_heap'] = _string_section(records)
+    asins = [store.records[doc_id].asin or '' for doc_id in range(size)]
+    sections['asin_offsets'], sections['asin_heap'] = _string_section(asins)
+    sections['asin_order'] = array('i', sorted(store.asin_ids.values(), key=lambda doc_id: (asins[doc_id], doc_id)))
+
+    vocabulary = sorted(index.postings)
+    sections['index_term_offsets'], sections['index_term_heap'] = _string_section(vocabulary)
+    rows, docs, masks = array('q', [0]), array('i'), array('B')
+    for term in vocabulary:
+        for doc_id, mask in sorted(index.postings[term].items()):
+            docs.append(doc_id)
+            masks.append(mask)
+        rows.append(len(docs))
+    sections['index_rows'], sections['index_docs'], sections['index_masks'] = rows, docs, masks
+
+    vocabulary = sorted(bm25.terms)
+    sections['bm25_term_offsets'], sections['bm25_term_heap'] = _string_section(vocabulary)
+    # finalize() lays rows out in vocabulary order, so one boundary array describes every span
+    rows = array('q', [0])
+    for term in vocabulary:
+        start, end = bm25.terms[term]
+        if start != rows[-1]:
+            raise ValueError(f"BM25F row for {term!r} is not contiguous")
+        rows.append(end)
+    sections['bm25_rows'] = rows
+    sections['bm25_docs'], sections['bm25_impacts'], sections['bm25_order'] = bm25.docs, bm25.impacts, bm25.order
+
+    sections['price_ids'] = snapshot.price_index.ids
+    sections['price_values'] = snapshot.price_index.values
+
+    facet_ids = array('i')
+    facets: Dict[str, List[Tuple[str, int, int]]] = {}
+    for level, values in (('categories', snapshot.facets.categories), ('subcategories', snapshot.facets.subcategories)):
+        facets[level] = []
+        for value, ids in values.items():
+            facets[level].append((value, len(facet_ids), len(facet_ids) + len(ids)))
+            facet_ids.extend(ids)
+    sections['facet_ids'] = facet_ids
+
+    semantic = snapshot.semantic
+    sections['semantic_vectors'], sections['semantic_centroids'] = semantic.vectors, semantic.centroids
+    sections['semantic_offsets'], sections['semantic_ids'] = semantic.list_offsets, semantic.list_ids
+
+    # Lay sections out after the header, each aligned for zero-copy typed views
+    layout: Dict[str, Tuple[int, int, str]] = {}
+    blobs: List[Tuple[int, bytes]] = []
+    offset = 0
+    for name, section in sections.items():
+        data = section.tobytes() if isinstance(section, array) else bytes(section)
+        typecode = section.typecode if isinstance(section, array) else 'B'
+        offset += -offset % _ALIGN
+        layout[name] = (offset, len(data), typecode)
+        blobs.append((offset, data))
+        offset += len(data)
+    header = json.dumps({'size': size, 'byteorder': sys.byteorder, 'source_size': source_size, 'sections': layout, 'facets': facets,
+                         'bm25_avg_lengths': bm25.avg_lengths, 'semantic_dimensions': semantic.dimensions}, ensure_ascii=False).encode('utf-8')
+    base = _PREAMBLE.size + len(header)
+    base += -base % _ALIGN
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAPPED_MAGIC, MAPPED_SCHEMA_VERSION, source_hash.encode('ascii'), len(header)))
+        f.write(header)
+        for section_offset, data in blobs:
+            f.seek(base + section_offset)
+            f.write(data)
+        f.truncate(base + offset)
+    os.replace(tmp_path, path)
+    return base + offset
+
+def open_mapped(path: str, source_hash: Optional[str] = None,
+                source_size: Optional[int] = None) -> Tuple[Dict[str, Any], str]:
+    """
+    Map a catalog file and return CatalogSnapshot parts plus its source hash.
+    Only the preamble and JSON header are read; every column and index stays
+    in the page cache until touched, so the cost does not grow with the catalog.
+    Raises ArtifactError on a wrong magic/schema/byte order, a truncated file,
+    or a file compiled from a different source: one whose hash is not
+    `source_hash`, or whose size is not `source_size`, when those are given.
+    """
+    try:
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        raise ArtifactError(f"Cannot map catalog {path}: {str(e)}")
+
+    if len(mapped) < _PREAMBLE.size:
+        raise ArtifactError(f"Mapped catalog {path} is truncated")
+    magic, schema, artifact_source, header_length = _PREAMBLE.unpack_from(mapped)
+    if magic != MAPPED_MAGIC:
+        raise ArtifactError(f"{path} is not a mapped catalog")
+    if schema != MAPPED_SCHEMA_VERSION:
+        raise ArtifactError(f"Mapped catalog {path} has schema {schema}, expected {MAPPED_SCHEMA_VERSION}")
+    artifact_source = artifact_source.decode('ascii')
+    if source_hash is not None and artifact_source != source_hash:
+        raise ArtifactError(f"Mapped catalog {path} is stale (built from {artifact_source[:12]}, source is {source_hash[:12]})")
+
+    try:
+        header = json.loads(mapped[_PREAMBLE.size:_PREAMBLE.size + header_length].decode('utf-8'))
+    except ValueError as e:
+        raise ArtifactError(f"Mapped catalog {path} has a bad header: {str(e)}")
+    if header.get('byteorder') != sys.byteorder:
+        raise ArtifactError(f"Mapped catalog {path} was built for {header.get('byteorder')}-endian hosts")
+    if source_size is not None and header.get('source_size') not in (None, source_size):
+        raise ArtifactError(f"Mapped catalog {path} is stale (built from {header['source_size']} bytes, source is {source_size})")
+
+    base = _PREAMBLE.size + header_length
+    base += -base % _ALIGN
+    view = memoryview(mapped)
+    sections: Dict[str, Any] = {}
+    for name, (offset, length, typecode) in header['sections'].items():
+        if base + offset + length > len(mapped):
+            raise ArtifactError(f"Mapped catalog {path} is truncated")
+        sections[name] = view[base + offset:base + offset + length].cast(typecode)
+
+    size = header['size']
+    store = MappedCatalog(size, sections)
+    index = _restore(CatalogIndex, size=size, postings=MappedPostings(
+        StringTable(sections['index_term_offsets'], sections['index_term_heap']),
+        sections['index_rows'], sections['index_docs'], sections['index_masks']))
+    bm25 = _restore(BM25FIndex, size=size, field_lengths=[], avg_lengths=header['bm25_avg_lengths'],
+                    _counts=None, _views=None,
+                    terms=TermSpans(StringTable(sections['bm25_term_offsets'], sections['bm25_term_heap']),
+                                    sections['bm25_rows']),
+                    docs=sections['bm25_docs'], impacts=sections['bm25_impacts'], order=sections['bm25_order'])
+    price_index = _restore(SortedColumnIndex, ids=sections['price_ids'], values=sections['price_values'])
+    facet_ids = sections['facet_ids']
+    facets = _restore(FacetIndex, size=size, _masks={},
+                      categories={value: facet_ids[start:end] for value, start, end in header['facets']['categories']},
+                      subcategories={value: facet_ids[start:end] for value, start, end in header['facets']['subcategories']})
+
+    semantic = _restore(SemanticIndex, dimensions=header['semantic_dimensions'], size=size, _views=None,
+                        vectors=sections['semantic_vectors'], centroids=sections['semantic_centroids'],
+                        list_offsets=sections['semantic_offsets'], list_ids=sections['semantic_ids'])
+
+    parts = {'store': store, 'index': index, 'bm25': bm25, 'price_index': price_index, 'facets': facets,
+             'semantic': semantic}
+    return parts, artifact_source
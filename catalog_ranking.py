@@ -0,0 +1,385 @@
+# catalog_ranking.py
+# Pluggable ranking engines for catalog search: fixed field weights or BM25F
+
+import math
+import heapq
+import logging
+from bisect import bisect_left
+from array import array
+from typing import Dict, List, Optional, Any, Callable, Iterable, NamedTuple, Sequence, Tuple
+from catalog_index import analyze, query_terms, query_words, intersect_masks, split_price_cap
+
+try:
+    import numpy as np
+except ImportError:  # Lambda packages ship without numpy; the pure-Python path is used instead
+    np = None
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# (field, weight, length normalization b) - name matters most, short label fields are not length-normalized
+BM25F_FIELDS = (
+    ('name', 3.0, 0.75),
+    ('description', 1.0, 0.75),
+    ('subcategory', 2.0, 0.0),
+    ('category', 1.0, 0.0),
+)
+BM25_K1 = 1.2
+
+# Per-field term counts are packed into one int per posting while the index is built
+# (a field would need 65536 repeats of one token to overflow into the next)
+_COUNT_BITS = 16
+_COUNT_MASK = (1 << _COUNT_BITS) - 1
+
+# Below this many postings a plain scan is cheaper than threshold bookkeeping
+EARLY_TERMINATION_MIN_POSTINGS = 4096
+
+class BM25FIndex:
+    """
+    Per-field term statistics, precomputed into a CSR term-document matrix.
+    Because BM25F's per-document term weight does not depend on the query,
+    each posting stores its final impact = idf * tf~ / (k1 + tf~); a query
+    score is then just a sparse row sum.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.field_lengths = [array('I') for _ in BM25F_FIELDS]
+        self.avg_lengths: List[float] = []
+        self.terms: Dict[str, Tuple[int, int]] = {}  # term -> (start, end) row span
+        self.docs = array('i')
+        self.impacts = array('f')
+        self.order = array('i')  # row positions by descending impact, for early termination
+        self._counts: Optional[Dict[str, Dict[int, int]]] = {}
+        self._views = None
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, product: Dict[str, Any]) -> int:
+        """Collect term frequencies for a product; call finalize() when done"""
+        doc_id = self.size
+        self.size += 1
+        for f, (field, _, _) in enumerate(BM25F_FIELDS):
+            tokens = analyze(product.get(field, ''))
+            self.field_lengths[f].append(len(tokens))
+            unit = 1 << (_COUNT_BITS * f)
+            for token in tokens:
+                counts = self._counts.setdefault(token, {})
+                counts[doc_id] = counts.get(doc_id, 0) + unit
+        return doc_id
+
+    def finalize(self, corpus: Optional['BM25FIndex'] = None, removed: Iterable[Dict[str, Any]] = ()) -> None:
+        """
+        Turn collected frequencies into impact-weighted postings. With a
+        `corpus` (the base catalog of a delta overlay), document frequencies
+        and average field lengths cover both indexes, so overlay scores stay
+        comparable with the corpus's own. `removed` are the corpus products
+        the overlay replaces or deletes; their lengths and document
+        frequencies are taken back out, so an upsert that leaves a product's
+        text alone leaves its score alone too.
+        """
+        n = self.size
+        totals = [sum(lengths) for lengths in self.field_lengths]
+        removed_df: Dict[str, int] = {}
+        if corpus is not None:
+            totals = [total + average * corpus.size for total, average in zip(totals, corpus.avg_lengths)]
+            n += corpus.size
+            for product in removed:
+                n -= 1
+                terms = set()
+                for f, (field, _, _) in enumerate(BM25F_FIELDS):
+                    tokens = analyze(product.get(field, ''))
+                    totals[f] -= len(tokens)
+                    terms.update(tokens)
+                for term in terms:
+                    removed_df[term] = removed_df.get(term, 0) + 1
+        self.avg_lengths = avg_lengths = [(total / n) if n else 0.0 for total in totals]
+        for term in sorted(self._counts):
+            postings = self._counts[term]
+            df = len(postings)
+            if corpus is not None and term in corpus.terms:
+                start, end = corpus.terms[term]
+                df += end - start - removed_df.get(term, 0)
+            idf = math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+            start = len(self.docs)
+            for doc_id in sorted(postings):
+                tf = 0.0
+                packed = postings[doc_id]
+                for f, (_, weight, b) in enumerate(BM25F_FIELDS):
+                    count = (packed >> (_COUNT_BITS * f)) & _COUNT_MASK
+                    if count:
+                        norm = (1.0 - b) + b * (self.field_lengths[f][doc_id] / avg_lengths[f]) if avg_lengths[f] else 1.0
+                        tf += weight * count / norm
+                self.docs.append(doc_id)
+                self.impacts.append(idf * tf / (BM25_K1 + tf))
+            end = len(self.docs)
+            self.order.extend(sorted(range(start, end), key=lambda i: -self.impacts[i]))
+            self.terms[term] = (start, end)
+        self._counts = None
+
+    def impact(self, term: str, doc_id: int) -> float:
+        """Random access into a term's doc-sorted row"""
+        start, end = self.terms[term]
+        i = bisect_left(self.docs, doc_id, start, end)
+        if i < end and self.docs[i] == doc_id:
+            return self.impacts[i]
+        return 0.0
+
+    def arrays(self):
+        """Zero-copy NumPy views of the posting arrays"""
+        if self._views is None:
+            self._views = (np.frombuffer(self.docs, dtype=np.int32), np.frombuffer(self.impacts, dtype=np.float32))
+        return self._views
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_views'] = None
+        return state
+
+class SearchHit(NamedTuple):
+    """
+    One search result: a product id in the snapshot that was searched, and its
+    score. Immutable, so hits can be cached or handed across threads; response
+    dicts are built from them by materialize().
+    """
+    product_id: int
+    score: float
+
+def materialize(store: Any, hits: Sequence[SearchHit],
+                format_score: Optional[Callable[[float], Any]] = None) -> List[Dict[str, Any]]:
+    """Fresh response dicts for hits, each carrying its `_search_score`"""
+    return [store.to_dict(hit.product_id, _search_score=format_score(hit.score) if format_score else hit.score)
+            for hit in hits]
+
+class TopK:
+    """
+    Bounded min-heap holding the k best (score, rating, -product_id) keys,
+    so selecting results never sorts the full candidate list.
+    """
+
+    __slots__ = ('k', 'heap')
+
+    def __init__(self, k: int):
+        self.k = k
+        self.heap: List[Tuple[float, float, int]] = []
+
+    def push(self, score: float, rating: float, doc_id: int) -> None:
+        entry = (score, rating, -doc_id)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+        elif entry > self.heap[0]:
+            heapq.heapreplace(self.heap, entry)
+
+    def floor(self) -> Optional[float]:
+        """Score a new candidate must beat once the heap is full"""
+        return self.heap[0][0] if self.k and len(self.heap) >= self.k else None
+
+    def results(self) -> List[SearchHit]:
+        return [SearchHit(-neg_id, score) for score, _, neg_id in sorted(self.heap, reverse=True)]
+
+def _select(store: Any, doc_ids: Sequence[int], scores: Sequence[float], limit: int) -> List[SearchHit]:
+    """Keep the top `limit` scored candidates by score, rating, catalog order"""
+    if np is not None and isinstance(doc_ids, np.ndarray):
+        if 0 < limit < len(scores):
+            # Partial selection: only candidates tied with or above the k-th score get sorted
+            kth = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+            keep = scores >= kth
+            doc_ids, scores = doc_ids[keep], scores[keep]
+        ratings = np.frombuffer(store.rating, dtype=np.float64)[doc_ids]
+        order = np.lexsort((-doc_ids, ratings, scores))[::-1][:limit]
+        return [SearchHit(int(doc_ids[i]), float(scores[i])) for i in order]
+
+    top = TopK(limit)
+    for doc_id, score in zip(doc_ids, scores):
+        top.push(score, store.rating[doc_id], doc_id)
+    return top.results()
+
+class FieldWeightRanker:
+    """The original fixed per-field scores, e.g. +15 name / +5 description / +10 subcategory"""
+
+    name = 'fields'
+
+    def __init__(self, weigh: Callable[[int], int], min_score: int = 1, min_length: int = 0):
+        self.weigh = weigh
+        self.min_score = min_score
+        self.min_length = min_length
+
+    def score(self, snapshot: Any, query: str,
+              allowed: Optional[bytearray] = None) -> Tuple[Sequence[int], Sequence[float]]:
+        scores = snapshot.index.score(query_words(query, self.min_length), self.weigh, allowed)
+        hits = [(doc_id, score) for doc_id, score in scores.items() if score >= self.min_score]
+        return [doc_id for doc_id, _ in hits], [score for _, score in hits]
+
+    def top(self, snapshot: Any, query: str, limit: int,
+            allowed: Optional[bytearray] = None) -> List[SearchHit]:
+        doc_ids, scores = self.score(snapshot, query, allowed)
+        return _select(snapshot.store, doc_ids, scores, limit)
+
+class BM25FRanker:
+    """BM25F over name/description/subcategory/category, vectorized with NumPy when available"""
+
+    name = 'bm25'
+
+    def __init__(self, min_length: int = 0):
+        self.min_length = min_length
+
+    def query_terms(self, snapshot: Any, query: str) -> List[str]:
+        """Normalized query terms present in the index"""
+        bm25 = snapshot.bm25
+        return [term for word in query_words(query, self.min_length) for term in query_terms(word) if term in bm25.terms]
+
+    def score(self, snapshot: Any, query: str,
+              allowed: Optional[bytearray] = None) -> Tuple[Sequence[int], Sequence[float]]:
+        bm25 = snapshot.bm25
+        spans = [bm25.terms[term] for term in self.query_terms(snapshot, query) if term in bm25.terms]
+        if not spans:
+            return [], []
+
+        if np is not None:
+            docs, impacts = bm25.arrays()
+            doc_ids = np.concatenate([docs[start:end] for start, end in spans])
+            weights = np.concatenate([impacts[start:end] for start, end in spans])
+            if allowed is not None:
+                # Drop postings outside the candidate bitmap before any scoring work
+                keep = np.frombuffer(allowed, dtype=np.bool_)[doc_ids]
+                doc_ids, weights = doc_ids[keep], weights[keep]
+            if len(doc_ids) * 8 > bm25.size:
+                # Broad query: a dense accumulator beats sorting the postings
+                dense = np.bincount(doc_ids, weights=weights, minlength=bm25.size)
+                unique_ids = np.flatnonzero(dense)
+                return unique_ids, dense[unique_ids]
+            unique_ids, positions = np.unique(doc_ids, return_inverse=True)
+            return unique_ids, np.bincount(positions, weights=weights)
+
+        scores: Dict[int, float] = {}
+        docs, impacts = bm25.docs, bm25.impacts
+        for start, end in spans:
+            for i in range(start, end):
+                doc_id = docs[i]
+                if allowed is None or allowed[doc_id]:
+                    scores[doc_id] = scores.get(doc_id, 0.0) + impacts[i]
+        return list(scores.keys()), list(scores.values())
+
+    def top(self, snapshot: Any, query: str, limit: int,
+            allowed: Optional[bytearray] = None) -> List[SearchHit]:
+        if np is None:
+            bm25 = snapshot.bm25
+            weights: Dict[str, int] = {}
+            for term in self.query_terms(snapshot, query):
+                if term in bm25.terms:
+                    weights[term] = weights.get(term, 0) + 1
+            postings = sum(bm25.terms[term][1] - bm25.terms[term][0] for term in weights)
+            if allowed is not None and bm25.size:
+                # Only the postings that survive the candidate bitmap count
+                postings = postings * allowed.count(1) // bm25.size
+            if postings >= EARLY_TERMINATION_MIN_POSTINGS:
+                return self._top_threshold(snapshot, weights, limit, allowed)
+        doc_ids, scores = self.score(snapshot, query, allowed)
+        return _select(snapshot.store, doc_ids, scores, limit)
+
+    def _top_threshold(self, snapshot: Any, weights: Dict[str, int], limit: int,
+                       allowed: Optional[bytearray]) -> List[SearchHit]:
+        """
+        Fagin's threshold algorithm over impact-ordered postings. Rows are read
+        round-robin from their highest impact down; a newly seen product is
+        scored in full by random access into the other rows. Scanning stops as
+        soon as the k-th best score beats the sum of the rows' remaining upper
+        bounds, so broad terms ("best", "wireless") are rarely read to the end.
+        """
+        bm25, store = snapshot.bm25, snapshot.store
+        if limit <= 0:
+            return []
+
+        rows = [(term, qtf, *bm25.terms[term]) for term, qtf in weights.items()]
+        cursors = [start for _, _, start, _ in rows]
+        bounds = [qtf * bm25.impacts[bm25.order[start]] for _, qtf, start, _ in rows]
+        docs, impacts, order = bm25.docs, bm25.impacts, bm25.order
+        top = TopK(limit)
+        seen = set()
+
+        while True:
+            active = False
+            for r, (term, qtf, start, end) in enumerate(rows):
+                cursor = cursors[r]
+                if cursor >= end:
+                    continue
+                active = True
+                position = order[cursor]
+                cursors[r] = cursor + 1
+                bounds[r] = qtf * impacts[order[cursor + 1]] if cursor + 1 < end else 0.0
+
+                doc_id = docs[position]
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                if allowed is not None and not allowed[doc_id]:
+                    continue
+
+                score = qtf * impacts[position]
+                for other, (other_term, other_qtf, _, _) in enumerate(rows):
+                    if other != r:
+                        score += other_qtf * bm25.impact(other_term, doc_id)
+                top.push(score, store.rating[doc_id], doc_id)
+
+            floor = top.floor()
+            if not active or (floor is not None and floor > sum(bounds)):
+                break
+        return top.results()
+
+def _candidates(segment: Any, live: Optional[bytearray], max_price: Optional[float],
+                category: Optional[str]) -> Tuple[bool, Optional[bytearray]]:
+    """(any candidates left, candidate bitmap) for one segment's price cap and category"""
+    allowed = live
+    if max_price:
+        start, end = segment.price_index.span(high=max_price)
+        if start == end:
+            return False, None
+        allowed = intersect_masks(allowed, segment.price_index.mask(high=max_price))
+    if category:
+        if category not in segment.facets.categories and category not in segment.facets.subcategories:
+            return False, None
+        allowed = intersect_masks(allowed, segment.facets.mask(category))
+    return True, allowed
+
+def rank_segments(store: Any, scopes: Sequence[Tuple[Any, int, Optional[bytearray]]],
+                  ranker: Any, query: str, limit: int) -> List[SearchHit]:
+    """
+    Run a ranker over (segment, product id offset, candidate bitmap) scopes
+    and merge the hits. Fusing rankers (see catalog_semantic.HybridRanker)
+    fuse their parts' merged rankings, not per-segment ones.
+    """
+    parts = getattr(ranker, 'parts', None)
+    if parts is not None:
+        depth = max(limit, ranker.depth)
+        return ranker.fuse(store, [rank_segments(store, scopes, part, query, depth) for part in parts], limit)
+    if len(scopes) == 1 and scopes[0][1] == 0:
+        segment, _, allowed = scopes[0]
+        return ranker.top(segment, query, limit, allowed=allowed)
+
+    hits = [SearchHit(hit.product_id + offset, hit.score)
+            for segment, offset, allowed in scopes
+            for hit in ranker.top(segment, query, limit, allowed=allowed)]
+    return _select(store, [hit.product_id for hit in hits], [hit.score for hit in hits], limit)
+
+def top_products(snapshot: Any, ranker: Any, query: str, limit: int,
+                 max_price: Optional[float] = None, category: Optional[str] = None) -> List[SearchHit]:
+    """
+    Rank, filter by price/category and return the best SearchHits, best
+    first. Ties break on rating, then catalog order. The price cap and the
+    category become candidate bitmaps (price index, facet index) that are
+    intersected and applied before scoring. A snapshot with delta updates
+    (see catalog_delta) is searched segment by segment, its base with
+    replaced and deleted products masked out, and the hits merged. Without
+    a max_price, a price phrase in the query ("under $50") becomes the cap.
+    """
+    if max_price is None:
+        query, max_price = split_price_cap(query)
+    scopes = []
+    for segment, offset, live in snapshot.segments():
+        found, allowed = _candidates(segment, live, max_price, category)
+        if found:
+            scopes.append((segment, offset, allowed))
+    if not scopes:
+        return []
+    return rank_segments(snapshot.store, scopes, ranker, query, limit)
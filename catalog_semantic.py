@@ -0,0 +1,336 @@
+# catalog_semantic.py
+# Offline product vectors and an in-process approximate nearest-neighbour index for conversational queries
+
+import os
+import math
+import zlib
+import logging
+from array import array
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Sequence, Tuple
+from catalog_index import analyze, normalize
+from catalog_ranking import SearchHit, _select
+
+try:
+    import numpy as np
+except ImportError:  # Lambda packages ship without numpy; the pure-Python path is used instead
+    np = None
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Vector width: one dimension per concept, the rest a hashed term space (4 bytes each per product)
+SEMANTIC_DIMENSIONS = 256
+
+# (field, weight) - the same fields the keyword index reads
+SEMANTIC_FIELDS = (
+    ('name', 2.0),
+    ('subcategory', 1.5),
+    ('category', 1.0),
+    ('description', 1.0),
+)
+# Concepts outweigh literal words: matching on purpose is what the keyword rankers cannot do
+CONCEPT_WEIGHT = 2.0
+
+# Below this many products every vector is scored exactly; above it an IVF index is trained
+IVF_MIN_PRODUCTS = 4096
+IVF_MAX_LISTS = 1024
+# Inverted lists scanned per query; more probes trade latency for recall
+IVF_PROBES = int(os.environ.get('SEMANTIC_PROBES', '8'))
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_SIZE = 20000
+
+# Cosine similarity below which a product is not considered related at all
+SEMANTIC_MIN_SIMILARITY = 0.15
+
+# Reciprocal rank fusion: score = sum of 1 / (RRF_K + rank) over the fused rankings
+RRF_K = 60
+# How deep each ranking is read before fusing
+HYBRID_DEPTH = 50
+
+# Words that say what a product is *for*. Each word also sets its concepts'
+# dimensions, so "sleep on flights" lands near pillows, blankets and luggage
+# without sharing a term with them.
+CONCEPT_GROUPS = (
+    ('sleep', ('sleep', 'nap', 'rest', 'bed', 'bedding', 'pillow', 'mattress', 'blanket', 'sheet',
+               'night', 'insomnia', 'snore', 'relax', 'weighted', 'calm')),
+    ('travel', ('travel', 'flight', 'plane', 'airplane', 'airport', 'trip', 'vacation', 'luggage',
+                'suitcase', 'carry', 'backpack', 'tsa', 'commute', 'journey', 'portable', 'passport')),
+    ('quiet', ('quiet', 'noise', 'canceling', 'cancelling', 'cancellation', 'anc', 'silence', 'silent',
+               'peace', 'focus', 'loud')),
+    ('audio', ('audio', 'music', 'sound', 'listen', 'headphone', 'earphone', 'speaker', 'song', 'podcast',
+               'bass', 'microphone', 'stereo')),
+    ('fitness', ('fitness', 'workout', 'exercise', 'gym', 'run', 'running', 'yoga', 'training', 'weight',
+                 'dumbbell', 'cardio', 'treadmill', 'health', 'heart', 'step', 'tracker', 'bike', 'shape')),
+    ('kitchen', ('kitchen', 'cook', 'cooking', 'cooker', 'meal', 'food', 'bake', 'baking', 'blender',
+                 'smoothie', 'chef', 'recipe', 'dinner', 'fryer', 'oven', 'mixer', 'dough')),
+    ('coffee', ('coffee', 'espresso', 'brew', 'brewer', 'latte', 'caffeine', 'morning', 'cup', 'pod')),
+    ('cleaning', ('clean', 'cleaning', 'cleaner', 'vacuum', 'dust', 'mop', 'floor', 'carpet', 'suction',
+                  'allergen', 'wash', 'detailing', 'purifier')),
+    ('smart_home', ('smart', 'alexa', 'echo', 'automation', 'voice', 'assistant', 'wifi', 'thermostat',
+                    'doorbell', 'lock', 'bulb', 'light', 'security', 'camera')),
+    ('reading', ('read', 'reading', 'book', 'ebook', 'kindle', 'novel', 'bestseller', 'author')),
+    ('money', ('money', 'finance', 'wealth', 'rich', 'invest', 'investing', 'budget', 'business', 'power')),
+    ('kids', ('kid', 'child', 'children', 'toy', 'play', 'gift', 'family', 'lego', 'doll', 'dollhouse',
+              'board', 'age')),
+    ('gaming', ('gaming', 'gamer', 'game', 'console', 'controller', 'playstation', 'nintendo', 'switch')),
+    ('outdoor', ('outdoor', 'camp', 'camping', 'tent', 'hike', 'hiking', 'garden', 'yard', 'lawn', 'mower',
+                 'patio', 'plant', 'sun', 'weatherproof', 'waterproof')),
+    ('car', ('car', 'auto', 'automotive', 'vehicle', 'drive', 'driving', 'jump', 'wiper', 'road', 'gps')),
+    ('beauty', ('beauty', 'skin', 'skincare', 'makeup', 'hair', 'face', 'facial', 'moisturizer', 'serum',
+                'cream', 'salon', 'styler', 'dryer', 'grooming', 'trimmer')),
+    ('work', ('work', 'office', 'desk', 'productivity', 'meeting', 'laptop', 'keyboard', 'mouse', 'monitor',
+              'computer', 'ergonomic', 'stand', 'ssd', 'storage')),
+    ('style', ('fashion', 'style', 'clothing', 'jeans', 'shoe', 'boot', 'sunglasses', 'handbag', 'leather',
+               'hat', 'watch', 'accessory')),
+)
+
+def _concepts() -> Dict[str, Tuple[int, ...]]:
+    """Normalized word -> concept dimensions, built with the index's own analysis"""
+    concepts: Dict[str, List[int]] = {}
+    for dimension, (_, words) in enumerate(CONCEPT_GROUPS):
+        for word in words:
+            term = normalize(word)
+            if term is not None and dimension not in concepts.setdefault(term, []):
+                concepts[term].append(dimension)
+    return {term: tuple(dimensions) for term, dimensions in concepts.items()}
+
+CONCEPTS = _concepts()
+
+@lru_cache(maxsize=65536)
+def _slot(term: str) -> Tuple[int, float]:
+    """
+    Signed feature hashing of a term into the dimensions after the concepts'
+    (crc32, so vectors built offline match queries embedded in any other process).
+    """
+    h = zlib.crc32(term.encode('utf-8'))
+    return len(CONCEPT_GROUPS) + h % (SEMANTIC_DIMENSIONS - len(CONCEPT_GROUPS)), 1.0 if h & 0x80000000 else -1.0
+
+def _embed(weighted_texts: Sequence[Tuple[str, float]]) -> Dict[int, float]:
+    """Sparse L2-normalized vector {dimension: value} for weighted pieces of text"""
+    # Concepts own the first dimensions outright, so they never collide with a term
+    features: Dict[Any, float] = {}
+    for text, weight in weighted_texts:
+        for term in analyze(text):
+            features[term] = features.get(term, 0.0) + weight
+            for concept in CONCEPTS.get(term, ()):
+                features[concept] = features.get(concept, 0.0) + weight * CONCEPT_WEIGHT
+
+    vector: Dict[int, float] = {}
+    for feature, weight in features.items():
+        # Square root damping, so a word repeated across fields does not swamp the rest
+        dimension, sign = (feature, 1.0) if isinstance(feature, int) else _slot(feature)
+        vector[dimension] = vector.get(dimension, 0.0) + sign * math.sqrt(weight)
+    norm = math.sqrt(sum(value * value for value in vector.values()))
+    if not norm:
+        return {}
+    return {dimension: value / norm for dimension, value in vector.items() if value}
+
+def embed_product(product: Dict[str, Any]) -> Dict[int, float]:
+    return _embed([(product.get(field) or '', weight) for field, weight in SEMANTIC_FIELDS])
+
+def embed_query(query: str) -> Dict[int, float]:
+    return _embed([(query, 1.0)])
+
+class SemanticIndex:
+    """
+    Product vectors as one contiguous float32 matrix (row = product id),
+    computed when the catalog is built, plus an optional IVF partition:
+    k-means centroids and the product ids of each centroid's list, laid out
+    back to back. A query scores the centroids, then only the products in the
+    `probes` closest lists. Small catalogs (or builds without numpy) keep no
+    lists and are scanned exactly.
+    """
+
+    def __init__(self, dimensions: int = SEMANTIC_DIMENSIONS):
+        self.dimensions = dimensions
+        self.size = 0
+        self.vectors = array('f')
+        self.centroids = array('f')  # lists x dimensions
+        self.list_offsets = array('q', [0])  # list i is list_ids[list_offsets[i]:list_offsets[i + 1]]
+        self.list_ids = array('i')
+        self._views = None
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def lists(self) -> int:
+        return len(self.centroids) // self.dimensions
+
+    def add(self, product: Dict[str, Any]) -> int:
+        """Embed a product into the next row; call finalize() when done"""
+        doc_id = self.size
+        self.size += 1
+        row = [0.0] * self.dimensions
+        for dimension, value in embed_product(product).items():
+            row[dimension] = value
+        self.vectors.extend(row)
+        return doc_id
+
+    def finalize(self) -> None:
+        """Train the IVF lists for a large catalog (needs numpy; otherwise search stays exact)"""
+        if np is None or self.size < IVF_MIN_PRODUCTS:
+            return
+        vectors = np.frombuffer(self.vectors, dtype=np.float32).reshape(self.size, self.dimensions)
+        rng = np.random.default_rng(0)  # deterministic, so rebuilding a catalog gives the same file
+        lists = min(IVF_MAX_LISTS, int(math.sqrt(self.size)))
+        sample = vectors[rng.choice(self.size, min(self.size, KMEANS_SAMPLE_SIZE), replace=False)]
+        centroids = sample[rng.choice(len(sample), lists, replace=False)].copy()
+
+        # Spherical k-means: vectors are unit length, so the nearest centroid is the largest dot product
+        for _ in range(KMEANS_ITERATIONS):
+            assignment = _nearest(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            norms = np.linalg.norm(sums, axis=1)
+            filled = norms > 0
+            centroids[filled] = sums[filled] / norms[filled, None]
+
+        assignment = _nearest(vectors, centroids)
+        self.centroids = array('f')
+        self.centroids.frombytes(centroids.astype(np.float32).tobytes())
+        self.list_offsets = array('q', [0])
+        self.list_offsets.extend(np.cumsum(np.bincount(assignment, minlength=lists)).tolist())
+        self.list_ids = array('i')
+        self.list_ids.frombytes(np.argsort(assignment, kind='stable').astype(np.int32).tobytes())
+        self._views = None
+
+    def arrays(self):
+        """Zero-copy NumPy views: (vectors, centroids, list offsets, list ids)"""
+        if self._views is None:
+            self._views = (
+                np.frombuffer(self.vectors, dtype=np.float32).reshape(self.size, self.dimensions),
+                np.frombuffer(self.centroids, dtype=np.float32).reshape(self.lists, self.dimensions),
+                np.frombuffer(self.list_offsets, dtype=np.int64),
+                np.frombuffer(self.list_ids, dtype=np.int32),
+            )
+        return self._views
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_views'] = None
+        return state
+
+    def score(self, query: Dict[int, float], allowed: Optional[bytearray] = None,
+              limit: int = 0, probes: int = IVF_PROBES) -> Tuple[Sequence[int], Sequence[float]]:
+        """
+        Candidates and cosine similarities for a query vector (see embed_query),
+        keeping only similarities of at least SEMANTIC_MIN_SIMILARITY. With a
+        candidate bitmap, probing widens until `limit` candidates survive it
+        or every list has been read.
+        """
+        if not query or not self.size:
+            return [], []
+        if np is not None:
+            return self._score_numpy(query, allowed, limit, probes)
+
+        candidates = self._candidates(query, allowed, limit, probes)
+        vectors, dimensions = self.vectors, self.dimensions
+        items = list(query.items())
+        doc_ids: List[int] = []
+        scores: List[float] = []
+        for doc_id in candidates:
+            # The query is sparse, so only its few nonzero dimensions are read
+            base = doc_id * dimensions
+            similarity = sum(vectors[base + dimension] * value for dimension, value in items)
+            if similarity >= SEMANTIC_MIN_SIMILARITY:
+                doc_ids.append(doc_id)
+                scores.append(similarity)
+        return doc_ids, scores
+
+    def _score_numpy(self, query: Dict[int, float], allowed: Optional[bytearray],
+                     limit: int, probes: int) -> Tuple[Sequence[int], Sequence[float]]:
+        vectors, centroids, offsets, ids = self.arrays()
+        dimensions = np.fromiter(query.keys(), dtype=np.intp, count=len(query))
+        values = np.fromiter(query.values(), dtype=np.float32, count=len(query))
+        keep = None if allowed is None else np.frombuffer(allowed, dtype=np.bool_)
+
+        if self.lists:
+            closeness = centroids[:, dimensions] @ values
+            ranked = np.argsort(-closeness)
+            probes = max(1, min(probes, self.lists))
+            while True:
+                doc_ids = np.concatenate([ids[offsets[i]:offsets[i + 1]] for i in ranked[:probes]])
+                if keep is not None:
+                    doc_ids = doc_ids[keep[doc_ids]]
+                if keep is None or len(doc_ids) >= limit or probes >= self.lists:
+                    break
+                probes *= 2
+        else:
+            doc_ids = np.arange(self.size, dtype=np.int32) if keep is None else np.flatnonzero(keep).astype(np.int32)
+
+        # Gathering only the query's dimensions keeps the scan to len(query) columns
+        scores = vectors[doc_ids[:, None], dimensions] @ values
+        matched = scores >= SEMANTIC_MIN_SIMILARITY
+        return doc_ids[matched], scores[matched].astype(np.float64)
+
+    def _candidates(self, query: Dict[int, float], allowed: Optional[bytearray],
+                    limit: int, probes: int) -> List[int]:
+        """Pure-Python IVF probe (or every product when there are no lists)"""
+        if not self.lists:
+            return [doc_id for doc_id in range(self.size) if allowed is None or allowed[doc_id]]
+        centroids, dimensions = self.centroids, self.dimensions
+        closeness = [sum(centroids[i * dimensions + dimension] * value for dimension, value in query.items())
+                     for i in range(self.lists)]
+        ranked = sorted(range(self.lists), key=lambda i: -closeness[i])
+        probes = max(1, min(probes, self.lists))
+        while True:
+            candidates = [doc_id for i in ranked[:probes]
+                          for doc_id in self.list_ids[self.list_offsets[i]:self.list_offsets[i + 1]]
+                          if allowed is None or allowed[doc_id]]
+            if allowed is None or len(candidates) >= limit or probes >= self.lists:
+                return candidates
+            probes *= 2
+
+def _nearest(vectors: Any, centroids: Any, chunk: int = 16384) -> Any:
+    """Index of the closest centroid for each row, in chunks to bound the similarity matrix"""
+    return np.concatenate([np.argmax(vectors[start:start + chunk] @ centroids.T, axis=1)
+                           for start in range(0, len(vectors), chunk)])
+
+class SemanticRanker:
+    """Nearest products by cosine similarity of hashed term + concept vectors"""
+
+    name = 'semantic'
+
+    def __init__(self, probes: int = IVF_PROBES):
+        self.probes = probes
+
+    def top(self, snapshot: Any, query: str, limit: int,
+            allowed: Optional[bytearray] = None) -> List[SearchHit]:
+        doc_ids, scores = snapshot.semantic.score(embed_query(query), allowed, limit, self.probes)
+        return _select(snapshot.store, doc_ids, scores, limit)
+
+class HybridRanker:
+    """
+    Keyword and semantic rankings fused by reciprocal rank: products both
+    agree on come first, and a conversational query with few literal matches
+    still gets semantically close products.
+    """
+
+    name = 'hybrid'
+
+    def __init__(self, keyword: Any, semantic: Optional[SemanticRanker] = None,
+                 depth: int = HYBRID_DEPTH, rrf_k: int = RRF_K):
+        self.keyword = keyword
+        self.semantic = semantic or SemanticRanker()
+        self.depth = depth
+        self.rrf_k = rrf_k
+
+    @property
+    def parts(self) -> Tuple[Any, SemanticRanker]:
+        return self.keyword, self.semantic
+
+    def fuse(self, store: Any, rankings: Sequence[List[SearchHit]], limit: int) -> List[SearchHit]:
+        """Reciprocal rank fusion of rankings over the same products"""
+        fused: Dict[int, float] = {}
+        for hits in rankings:
+            for rank, hit in enumerate(hits, 1):
+                fused[hit.product_id] = fused.get(hit.product_id, 0.0) + 1.0 / (self.rrf_k + rank)
+        return _select(store, list(fused.keys()), list(fused.values()), limit)
+
+    def top(self, snapshot: Any, query: str, limit: int,
+            allowed: Optional[bytearray] = None) -> List[SearchHit]:
+        depth = max(limit, self.depth)
+        return self.fuse(snapshot.store, [ranker.top(snapshot, query, depth, allowed=allowed)
+                                          for ranker in self.parts], limit)
@@ -0,0 +1,225 @@
+# catalog_snapshot.py
+# Per-container catalog snapshots: load once, share, reload only when the source changes
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Optional, Any, Callable, Iterable, Tuple
+from catalog_index import CatalogIndex, FacetIndex, SortedColumnIndex
+from catalog_store import ColumnarCatalog
+from catalog_ranking import BM25FIndex
+from catalog_semantic import SemanticIndex
+from catalog_artifact import ArtifactError, artifact_path_for, read_artifact
+from catalog_mmap import MAPPED_SUFFIX, mapped_path_for, open_mapped
+from catalog_stream import file_content_hash, iter_products
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# How often a warm container stats the catalog file for a redeploy
+CATALOG_RECHECK_SECONDS = float(os.environ.get('CATALOG_RECHECK_SECONDS', '5'))
+
+def content_hash(data: bytes) -> str:
+    """Version id for a catalog: sha256 of its serialized content"""
+    return hashlib.sha256(data).hexdigest()
+
+class CatalogSnapshot:
+    """
+    One immutable catalog version: columnar store plus search indexes
+    (keyword, BM25F, semantic vectors, price and facets).
+    Never mutated after construction, so it is shared by all warm invocations.
+    A delta overlay (see catalog_delta) is built with its base as `corpus`
+    and the base products it shadows as `removed`, so its BM25F scores use
+    the document frequencies and lengths of the catalog actually served.
+    """
+
+    __slots__ = ('store', 'index', 'bm25', 'price_index', 'facets', 'semantic', 'version', 'source', 'loaded_at')
+
+    def __init__(self, products: Iterable[Dict[str, Any]], version: str, source: str,
+                 corpus: Optional['CatalogSnapshot'] = None, removed: Iterable[Dict[str, Any]] = ()):
+        self.store = ColumnarCatalog()
+        self.index = CatalogIndex()
+        self.bm25 = BM25FIndex()
+        self.facets = FacetIndex()
+        self.semantic = SemanticIndex()
+        for product in products:
+            self.store.append(product)
+            self.index.add(product)
+            self.bm25.add(product)
+            self.facets.add(product)
+            self.semantic.add(product)
+        self.bm25.finalize(corpus.bm25 if corpus is not None else None, removed)
+        self.semantic.finalize()
+        self.price_index = SortedColumnIndex(self.store.price)
+        self.version = version
+        self.source = source
+        self.loaded_at = time.time()
+
+    @classmethod
+    def from_parts(cls, parts: Dict[str, Any], version: str, source: str) -> 'CatalogSnapshot':
+        """Reassemble a snapshot from prebuilt store and indexes (see catalog_artifact)"""
+        snapshot = cls.__new__(cls)
+        for name, value in parts.items():
+            setattr(snapshot, name, value)
+        snapshot.version = version
+        snapshot.source = source
+        snapshot.loaded_at = time.time()
+        return snapshot
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def segments(self) -> List[Tuple['CatalogSnapshot', int, Optional[bytearray]]]:
+        """(segment, product id offset, liveness bitmap) to search; a plain snapshot is one live segment"""
+        return [(self, 0, None)]
+
+    def products(self) -> List[Dict[str, Any]]:
+        """Materialize every product as a fresh dict"""
+        return [self.store.to_dict(doc_id) for doc_id in range(len(self.store))]
+
+class SnapshotCache:
+    """
+    Serves the current CatalogSnapshot for a catalog source.
+    A file source (`path`: products JSON, catalog JSON or JSONL) is re-stat'ed at most every `recheck_seconds` and
+    reloaded only when its mtime/size and content hash change. A `builder`
+    source (in-code catalog) is built exactly once. With a `deltas` feed
+    (catalog_delta.DeltaFeed), its location is polled every
+    `deltas.poll_seconds` and new delta files are layered onto that base;
+    the served snapshot is swapped in one assignment, never modified.
+    When a compiled artifact built from the same JSON sits next to a file
+    source, it is loaded instead of parsing and indexing the JSON. At cold
+    start a mapped catalog (*.catalog.map) is opened without reading or
+    hashing the JSON, so startup cost does not grow with the catalog: the
+    deploy scripts compile it from the JSON they package, and only a stat
+    checks that the JSON still has the size it was compiled from. A JSON
+    replaced under a warm container is hashed as before, and any artifact is
+    used only if it was compiled from exactly that content. A mapped catalog
+    can also be the source itself, with no JSON next to it.
+    """
+
+    def __init__(self, path: Optional[str] = None, builder: Optional[Callable[[], List[Dict[str, Any]]]] = None,
+                 recheck_seconds: float = CATALOG_RECHECK_SECONDS, artifact_path: Optional[str] = None,
+                 deltas: Optional[Any] = None):
+        if not path and not builder:
+            raise ValueError("SnapshotCache needs a path or a builder")
+        self.path = path
+        self.builder = builder
+        self.artifact_path = artifact_path or (artifact_path_for(path) if path else None)
+        self.mapped_path = mapped_path_for(path) if path else None
+        self.recheck_seconds = recheck_seconds
+        self.deltas = deltas
+        self._base: Optional[CatalogSnapshot] = None  # built from the source alone
+        self._snapshot: Optional[Any] = None  # what get() serves: the base, or the base with deltas applied
+        self._file_signature: Optional[Tuple[int, int]] = None
+        self._checked_at = 0.0
+        self._polled_at = 0.0
+        self._lock = threading.Lock()
+
+    def _due(self, now: float) -> bool:
+        if self.path is not None and now - self._checked_at >= self.recheck_seconds:
+            return True
+        return self.deltas is not None and now - self._polled_at >= self.deltas.poll_seconds
+
+    def get(self) -> Any:
+        """Current snapshot; warm calls cost a clock read and, occasionally, a stat or a delta poll"""
+        snapshot = self._snapshot
+        if snapshot is not None and not self._due(time.monotonic()):
+            return snapshot
+        with self._lock:
+            now = time.monotonic()
+            base = self._base
+            if base is None or (self.path is not None and now - self._checked_at >= self.recheck_seconds):
+                self._refresh()
+            if self.deltas is None:
+                self._snapshot = self._base
+            elif self._base is not base or now - self._polled_at >= self.deltas.poll_seconds:
+                self._polled_at = now
+                self._snapshot = self.deltas.apply(self._base)
+            return self._snapshot
+
+    def invalidate(self) -> None:
+        """Force the next get() to re-check the source and poll for deltas"""
+        self._checked_at = 0.0
+        self._polled_at = 0.0
+        self._file_signature = None
+
+    def _refresh(self) -> None:
+        if self.path is None:
+            if self._base is None:
+                products = self.builder()
+                version = content_hash(json.dumps(products, sort_keys=True).encode('utf-8'))
+                self._base = CatalogSnapshot(products, version, source='builtin')
+                logger.info(f"Built catalog snapshot {version[:12]} ({len(products)} products)")
+            return
+
+        self._checked_at = time.monotonic()
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            if self._base is None:
+                logger.error(f"Catalog file not found at {self.path}")
+                self._base = CatalogSnapshot([], version='', source=self.path)
+            return
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._file_signature:
+            return
+
+        try:
+            if self.path.endswith(MAPPED_SUFFIX):
+                # Only the header is read; the version is the hash of the JSON it was compiled from
+                parts, version = open_mapped(self.path)
+                if self._base is None or version != self._base.version:
+                    self._base = CatalogSnapshot.from_parts(parts, version, source=self.path)
+                    logger.info(f"Mapped catalog snapshot {version[:12]} ({len(self._base)} products) from {self.path}")
+            else:
+                cold = self._open_mapped_unhashed(stat.st_size) if self._base is None else None
+                if cold is not None:
+                    self._base = cold
+                else:
+                    version = file_content_hash(self.path)
+                    if self._base is None or version != self._base.version:
+                        self._base = self._load_artifact(version) or self._load_json(version)
+            self._file_signature = signature
+        except Exception as e:
+            # Keep serving the previous snapshot if a redeploy left a bad file behind
+            logger.error(f"Error loading catalog from {self.path}: {str(e)}")
+            if self._base is None:
+                self._base = CatalogSnapshot([], version='', source=self.path)
+
+    def _open_mapped_unhashed(self, source_size: int) -> Optional[CatalogSnapshot]:
+        """Cold-start snapshot from the mapped catalog next to the JSON, trusting its recorded source hash"""
+        if not os.path.exists(self.mapped_path):
+            return None
+        try:
+            parts, version = open_mapped(self.mapped_path, source_size=source_size)
+        except ArtifactError as e:
+            logger.warning(f"Ignoring catalog artifact: {str(e)}")
+            return None
+        snapshot = CatalogSnapshot.from_parts(parts, version, source=self.mapped_path)
+        logger.info(f"Mapped catalog snapshot {version[:12]} ({len(snapshot)} products) from {self.mapped_path}")
+        return snapshot
+
+    def _load_artifact(self, version: str) -> Optional[CatalogSnapshot]:
+        """Prebuilt snapshot for this JSON version (mapped first), or None to fall back to a JSON build"""
+        for path, load in ((self.mapped_path, open_mapped), (self.artifact_path, read_artifact)):
+            if not os.path.exists(path):
+                continue
+            try:
+                parts, _ = load(path, source_hash=version)
+            except ArtifactError as e:
+                logger.warning(f"Ignoring catalog artifact: {str(e)}")
+                continue
+            snapshot = CatalogSnapshot.from_parts(parts, version, source=path)
+            logger.info(f"Loaded catalog snapshot {version[:12]} ({len(snapshot)} products) from {path}")
+            return snapshot
+        return None
+
+    def _load_json(self, version: str) -> CatalogSnapshot:
+        # Records are streamed into the indexes; the parsed document is never held whole
+        snapshot = CatalogSnapshot(iter_products(self.path), version, source=self.path)
+        logger.info(f"Loaded catalog snapshot {version[:12]} ({len(snapshot)} products) from {self.path}")
+        return snapshot
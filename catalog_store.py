@@ -0,0 +1,141 @@
+# catalog_store.py
+# Compact columnar product storage: numeric columns + __slots__ records
+
+import os
+import re
+import sys
+import logging
+from array import array
+from typing import Dict, List, Optional, Any, Tuple
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+PRODUCT_URL_PREFIX = 'https://www.amazon.com/dp/'
+IMAGE_URL_PREFIX = 'https://m.media-amazon.com/images/I/'
+# Catalogs store bare product URLs; this deployment's affiliate tag is added as they are served
+AMAZON_PARTNER_TAG = os.environ.get('AMAZON_PARTNER_TAG', 'aipro00-20')
+
+# Price column value for a product without a price: outside every max_price cap, and last in price order
+UNPRICED = float('inf')
+
+_PRODUCT_URL_RE = re.compile(r'^(https://www\.amazon\.com/dp/[^?/]+)(?:\?tag=[^&]*)?$')
+
+# Keys held in ProductRecord slots or numeric columns; anything else goes to `extra`
+_COLUMN_KEYS = ('price', 'rating', 'reviews')
+_RECORD_KEYS = ('name', 'asin', 'url', 'image_url', 'description', 'category', 'subcategory', 'badge')
+
+class ProductRecord:
+    """
+    String fields of one product. Repeated values (category, subcategory,
+    badge) are interned; URLs keep only what differs per product, and the
+    product page URL of the ASIN is not stored at all.
+    """
+
+    __slots__ = ('name', 'asin', 'product_page', 'url', 'image', 'description',
+                 'category', 'subcategory', 'badge', 'layout', 'extra')
+
+    def __init__(self, product: Dict[str, Any], layout: Tuple[str, ...]):
+        self.name = product.get('name')
+        self.asin = product.get('asin')
+        self.description = product.get('description')
+        self.category = _intern(product.get('category'))
+        self.subcategory = _intern(product.get('subcategory'))
+        self.badge = _intern(product.get('badge'))
+        self.layout = layout
+
+        url = product.get('url')
+        self.product_page = bool(url and self.asin and bare_product_url(url) == PRODUCT_URL_PREFIX + self.asin)
+        self.url = None if self.product_page else url
+
+        image = product.get('image_url')
+        if image and image.startswith(IMAGE_URL_PREFIX):
+            image = image[len(IMAGE_URL_PREFIX):]
+        self.image = image
+
+        extra = {k: v for k, v in product.items() if k not in _COLUMN_KEYS and k not in _RECORD_KEYS}
+        self.extra = extra or None
+
+    def product_url(self) -> Optional[str]:
+        if self.product_page:
+            return f"{PRODUCT_URL_PREFIX}{self.asin}?tag={AMAZON_PARTNER_TAG}"
+        return self.url
+
+    def image_url(self) -> Optional[str]:
+        image = self.image
+        if image and not image.startswith(('http://', 'https://')):
+            return IMAGE_URL_PREFIX + image
+        return image
+
+def bare_product_url(url: Any) -> Any:
+    """An Amazon product URL without its affiliate tag; anything else unchanged"""
+    match = _PRODUCT_URL_RE.match(url) if isinstance(url, str) else None
+    return match.group(1) if match else url
+
+def tagged_product_url(url: Any) -> Any:
+    """An Amazon product URL with this deployment's affiliate tag (replacing any it had); anything else unchanged"""
+    match = _PRODUCT_URL_RE.match(url) if isinstance(url, str) else None
+    return f"{match.group(1)}?tag={AMAZON_PARTNER_TAG}" if match else url
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+class ColumnarCatalog:
+    """
+    Products stored as array-backed price/rating/reviews columns plus
+    ProductRecord objects. Product ids are row numbers; dicts are only
+    materialized by to_dict() at the response boundary.
+    """
+
+    def __init__(self):
+        self.price = array('d')
+        self.rating = array('d')
+        self.reviews = array('q')
+        self.records: List[ProductRecord] = []
+        self.asin_ids: Dict[str, int] = {}
+        self._layouts: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def append(self, product: Dict[str, Any]) -> int:
+        """Add a product row and return its product id"""
+        doc_id = len(self.records)
+        layout = tuple(product.keys())
+        layout = self._layouts.setdefault(layout, layout)
+        price = product.get('price')
+        self.price.append(float(price) if price is not None else UNPRICED)
+        self.rating.append(float(product.get('rating') or 0.0))
+        self.reviews.append(int(product.get('reviews') or 0))
+        record = ProductRecord(product, layout)
+        self.records.append(record)
+        if record.asin:
+            self.asin_ids.setdefault(record.asin, doc_id)
+        return doc_id
+
+    def find(self, asin: str) -> Optional[int]:
+        """Product id for an ASIN"""
+        return self.asin_ids.get(asin)
+
+    def to_dict(self, doc_id: int, **extra: Any) -> Dict[str, Any]:
+        """Materialize one product as the dict shape the handlers expect"""
+        record = self.records[doc_id]
+        product: Dict[str, Any] = {}
+        for key in record.layout:
+            if key == 'price':
+                price = self.price[doc_id]
+                product[key] = price if price != UNPRICED else None
+            elif key == 'rating':
+                product[key] = self.rating[doc_id]
+            elif key == 'reviews':
+                product[key] = self.reviews[doc_id]
+            elif key == 'url':
+                product[key] = record.product_url()
+            elif key == 'image_url':
+                product[key] = record.image_url()
+            elif key in _RECORD_KEYS:
+                product[key] = getattr(record, key)
+            else:
+                product[key] = record.extra[key]
+        product.update(extra)
+        return product
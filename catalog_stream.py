@@ -0,0 +1,192 @@
+# catalog_stream.py
+# Streaming catalog ingestion: product records read one at a time from JSON or JSONL feeds
+
+import re
+import json
+import hashlib
+import logging
+from numbers import Real
+from typing import Dict, Optional, Any, Iterator, TextIO
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Characters read per refill; memory stays at a few chunks plus one record
+STREAM_CHUNK_SIZE = 1 << 16
+
+JSONL_SUFFIXES = ('.jsonl', '.ndjson')
+
+_WHITESPACE = re.compile(r'\s*')
+_decoder = json.JSONDecoder()
+
+def file_content_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """sha256 of a file, read in chunks (same value as hashing its full contents)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def validate_product(product: Any) -> Optional[str]:
+    """Why a record cannot be indexed, or None if it is usable"""
+    if not isinstance(product, dict):
+        return f"expected an object, got {type(product).__name__}"
+    for key in ('name', 'asin'):
+        if not isinstance(product.get(key), str) or not product[key]:
+            return f"missing {key}"
+    for key in ('description', 'category', 'subcategory'):
+        if product.get(key) is not None and not isinstance(product[key], str):
+            return f"{key} is not a string"
+    for key in ('price', 'rating', 'reviews'):
+        value = product.get(key)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, Real) or value < 0):
+            return f"{key} is not a non-negative number"
+    return None
+
+class _JSONReader:
+    """
+    Pull parser over a text stream: decodes one JSON value at a time from a
+    sliding buffer and can skip a value without keeping it.
+    """
+
+    def __init__(self, stream: TextIO, chunk_size: int):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Append one chunk, dropping what has been consumed; False at end of input"""
+        if self.eof:
+            return False
+        if self.pos:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer += chunk
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of input)"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} in catalog feed, found {self.peek()!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next value, reading more input until it is complete"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                if self._fill():
+                    continue
+                raise
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and not self.eof and self.buffer[self.pos] not in '{["':
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+    def skip(self) -> None:
+        """
+        Consume the next value without keeping it (e.g. the `categories` copy).
+        Containers are walked element by element, so only one leaf record is
+        ever decoded at a time.
+        """
+        char = self.peek()
+        if char == '[':
+            for _ in self.array():
+                pass
+        elif char == '{':
+            self.pos += 1
+            while self.peek() != '}':
+                self.value()
+                self.expect(':')
+                self.skip()
+                if self.peek() == ',':
+                    self.pos += 1
+            self.pos += 1
+        else:
+            self.value()
+
+    def array(self) -> Iterator[Any]:
+        """Yield the elements of the array at the cursor one by one"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError(f"Expected ',' or ']' in catalog feed, found {char!r}")
+
+def _records(stream: TextIO, chunk_size: int) -> Iterator[Any]:
+    """Products from a JSON array or from the `products` array of a catalog object"""
+    reader = _JSONReader(stream, chunk_size)
+    if reader.peek() == '[':
+        yield from reader.array()
+        return
+
+    reader.expect('{')
+    found = False
+    while reader.peek() != '}':
+        key = reader.value()
+        reader.expect(':')
+        if key == 'products' and not found:
+            found = True
+            yield from reader.array()
+        else:
+            reader.skip()
+        if reader.peek() == ',':
+            reader.pos += 1
+    if not found:
+        raise ValueError("Catalog object has no 'products' array")
+
+def _jsonl_records(stream: TextIO) -> Iterator[Any]:
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+def iter_products(path: str, strict: bool = False,
+                  chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Stream product records from a products JSON array, a products-catalog.json
+    style object (only `products` is kept; `categories` is skipped one record
+    at a time),
+    or JSONL (.jsonl/.ndjson, one product per line). Records that fail
+    validate_product() are logged and skipped, or raise ValueError if `strict`.
+    """
+    skipped = 0
+    with open(path, 'r', encoding='utf-8') as f:
+        records = _jsonl_records(f) if path.endswith(JSONL_SUFFIXES) else _records(f, chunk_size)
+        for n, product in enumerate(records):
+            problem = validate_product(product)
+            if problem is None:
+                yield product
+                continue
+            if strict:
+                raise ValueError(f"Invalid product record {n} in {path}: {problem}")
+            skipped += 1
+            if skipped <= 10:
+                logger.warning(f"Skipping product record {n} in {path}: {problem}")
+    if skipped:
+        logger.warning(f"Skipped {skipped} invalid product records in {path}")
@@ -12,6 +12,13 @@ $DYNAMODB_TABLE = "ai-assistant-users-dev"
 
 Write-Host "[Step 1] Packaging Lambda function..." -ForegroundColor Yellow
 
+# Build the catalog from catalog/ and precompile it so cold starts skip JSON parsing and indexing
+python extract_products.py
+if ($LASTEXITCODE -ne 0) {
+    Write-Host "❌ Catalog build failed" -ForegroundColor Red
+    exit 1
+}
+
 # Create temporary directory for packaging
 $tempDir = "temp_lambda_package"
 if (Test-Path $tempDir) {
@@ -22,6 +29,24 @@ New-Item -ItemType Directory -Path $tempDir | Out-Null
 # Copy Lambda files
 Copy-Item "lambda_ai_pro_complete_shopping.py" "$tempDir/lambda_function.py"
 Copy-Item "shopping_tools.py" "$tempDir/"
+Copy-Item "catalog_index.py" "$tempDir/"
+Copy-Item "catalog_snapshot.py" "$tempDir/"
+Copy-Item "catalog_store.py" "$tempDir/"
+Copy-Item "catalog_ranking.py" "$tempDir/"
+Copy-Item "catalog_artifact.py" "$tempDir/"
+Copy-Item "catalog_mmap.py" "$tempDir/"
+Copy-Item "catalog_stream.py" "$tempDir/"
+Copy-Item "result_cache.py" "$tempDir/"
+Copy-Item "catalog_semantic.py" "$tempDir/"
+Copy-Item "catalog_delta.py" "$tempDir/"
+Copy-Item "single_flight.py" "$tempDir/"
+Copy-Item "shopping_tools_federated.py" "$tempDir/"
+Copy-Item "shopping_tools_amazon_api.py" "$tempDir/"
+Copy-Item "paapi_client.py" "$tempDir/"
+Copy-Item "paapi_cache.py" "$tempDir/"
+Copy-Item "sigv4.py" "$tempDir/"
+Copy-Item "products-simple.json" "$tempDir/"
+Copy-Item "products-simple.catalog.map" "$tempDir/"
 
 # Create ZIP file
 $zipFile = "lambda-complete-shopping-deployment.zip"
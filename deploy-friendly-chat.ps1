@@ -27,6 +27,27 @@ Copy-Item "lambda_ai_pro_friendly_chat.py" "$TEMP_DIR\lambda_function.py"
 # Copy shopping tools
 Write-Host "  - Copying shopping_tools.py..." -ForegroundColor Gray
 Copy-Item "shopping_tools.py" "$TEMP_DIR\shopping_tools.py"
+Copy-Item "catalog_index.py" "$TEMP_DIR\catalog_index.py"
+Copy-Item "catalog_snapshot.py" "$TEMP_DIR\catalog_snapshot.py"
+Copy-Item "catalog_store.py" "$TEMP_DIR\catalog_store.py"
+Copy-Item "catalog_ranking.py" "$TEMP_DIR\catalog_ranking.py"
+Copy-Item "catalog_artifact.py" "$TEMP_DIR\catalog_artifact.py"
+Copy-Item "catalog_mmap.py" "$TEMP_DIR\catalog_mmap.py"
+Copy-Item "catalog_stream.py" "$TEMP_DIR\catalog_stream.py"
+Copy-Item "result_cache.py" "$TEMP_DIR\result_cache.py"
+Copy-Item "catalog_semantic.py" "$TEMP_DIR\catalog_semantic.py"
+Copy-Item "catalog_delta.py" "$TEMP_DIR\catalog_delta.py"
+Copy-Item "single_flight.py" "$TEMP_DIR\single_flight.py"
+
+# Build the catalog from catalog/ and precompile it so cold starts skip JSON parsing and indexing
+Write-Host "  - Building product catalog..." -ForegroundColor Gray
+python extract_products.py
+if ($LASTEXITCODE -ne 0) {
+    Write-Host "❌ Catalog build failed" -ForegroundColor Red
+    exit 1
+}
+Copy-Item "products-simple.json" "$TEMP_DIR\products-simple.json"
+Copy-Item "products-simple.catalog.map" "$TEMP_DIR\products-simple.catalog.map"
 
 Write-Host "[2/5] Installing Python dependencies..." -ForegroundColor Yellow
 Write-Host "  - boto3 (AWS SDK)" -ForegroundColor Gray
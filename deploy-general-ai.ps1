@@ -2,9 +2,16 @@
 
 Write-Host "🚀 Deploying AI Pro General Assistant..." -ForegroundColor Cyan
 
+# Step 0: Build the catalog from catalog/ and precompile it so cold starts skip JSON parsing and indexing
+python extract_products.py
+if ($LASTEXITCODE -ne 0) {
+    Write-Host "❌ Catalog build failed" -ForegroundColor Red
+    exit 1
+}
+
 # Step 1: Package the Lambda function
 Write-Host "`n📦 Packaging Lambda function..." -ForegroundColor Yellow
-Compress-Archive -Path "lambda_ai_pro_general.py","shopping_tools.py" -DestinationPath "lambda-general-ai.zip" -Force
+Compress-Archive -Path "lambda_ai_pro_general.py","shopping_tools.py","catalog_index.py","catalog_snapshot.py","catalog_store.py","catalog_ranking.py","catalog_artifact.py","catalog_mmap.py","catalog_stream.py","result_cache.py","catalog_semantic.py","catalog_delta.py","single_flight.py","products-simple.json","products-simple.catalog.map" -DestinationPath "lambda-general-ai.zip" -Force
 
 if (Test-Path "lambda-general-ai.zip") {
     Write-Host "✅ Package created successfully" -ForegroundColor Green
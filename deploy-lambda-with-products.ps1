@@ -17,11 +17,31 @@ if (Test-Path $ZIP_FILE) {
 Write-Host "`n📦 Creating deployment package..." -ForegroundColor Yellow
 Set-Location "lambda-current"
 
+# Precompile the catalog so cold starts skip JSON parsing and indexing
+python ..\extract_products.py --compile products-simple.json
+if ($LASTEXITCODE -ne 0) {
+    # Never ship a map left over from an earlier compile
+    Write-Host "❌ Catalog compile failed" -ForegroundColor Red
+    Set-Location ..
+    exit 1
+}
+
 # Create zip with all required files
 Compress-Archive -Path @(
     "lambda_ai_pro_secure.py",
     "shopping_tools.py",
-    "products-simple.json"
+    "..\catalog_index.py",
+    "..\catalog_snapshot.py",
+    "..\catalog_store.py",
+    "..\catalog_ranking.py",
+    "..\catalog_artifact.py",
+    "..\catalog_mmap.py",
+    "..\catalog_stream.py",
+    "..\result_cache.py",
+    "..\catalog_semantic.py",
+    "..\catalog_delta.py",
+    "products-simple.json",
+    "products-simple.catalog.map"
 ) -DestinationPath "..\$ZIP_FILE" -Force
 
 Set-Location ..
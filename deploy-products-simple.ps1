@@ -11,7 +11,14 @@ if (Test-Path $ZIP_FILE) {
 
 # Create zip
 Set-Location "lambda-current"
-Compress-Archive -Path "lambda_ai_pro_secure.py","shopping_tools.py","products-simple.json" -DestinationPath "..\$ZIP_FILE"
+# Precompile the catalog so cold starts skip JSON parsing and indexing
+python ..\extract_products.py --compile products-simple.json
+if ($LASTEXITCODE -ne 0) {
+    Write-Host "Catalog compile failed"
+    Set-Location ..
+    exit 1
+}
+Compress-Archive -Path "lambda_ai_pro_secure.py","shopping_tools.py","..\catalog_index.py","..\catalog_snapshot.py","..\catalog_store.py","..\catalog_ranking.py","..\catalog_artifact.py","..\catalog_mmap.py","..\catalog_stream.py","..\result_cache.py","..\catalog_semantic.py","..\catalog_delta.py","products-simple.json","products-simple.catalog.map" -DestinationPath "..\$ZIP_FILE"
 Set-Location ..
 
 Write-Host "Created deployment package: $ZIP_FILE"
@@ -29,12 +29,32 @@ try {
     exit 1
 }
 
+# Build the catalog from catalog/ and precompile it so cold starts skip JSON parsing and indexing
+python extract_products.py
+if ($LASTEXITCODE -ne 0) {
+    Write-Host "❌ Catalog build failed" -ForegroundColor Red
+    exit 1
+}
+
 # Create deployment package for main Lambda function
 Write-Host "📦 Creating deployment package for main Lambda function..." -ForegroundColor Yellow
 
 $lambdaFiles = @(
     "lambda_ai_pro_shopping.py",
-    "shopping_tools.py"
+    "shopping_tools.py",
+    "catalog_index.py",
+    "catalog_snapshot.py",
+    "catalog_store.py",
+    "catalog_ranking.py",
+    "catalog_artifact.py",
+    "catalog_mmap.py",
+    "catalog_stream.py",
+    "result_cache.py",
+    "catalog_semantic.py",
+    "catalog_delta.py",
+    "single_flight.py",
+    "products-simple.json",
+    "products-simple.catalog.map"
 )
 
 # Create temporary directory for packaging
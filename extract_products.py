@@ -1,39 +1,141 @@
 #!/usr/bin/env python3
 """
-Extract all 80 products from shopping_tools.py to JSON format
+Build the product catalog from its sources and compile it into the catalog
+artifact (store, search indexes and semantic vectors) that the Lambda loads
+at cold start without parsing or indexing. The default `map` format is
+memory-mapped and opens in constant time; `pickle` is loaded into memory.
+
+    python extract_products.py                                 # build + compile
+    python extract_products.py --compile products-simple.json  # compile only
+    python extract_products.py --compile feed.jsonl --strict   # large feed, fail on bad records
+
+catalog/products.json is the source of truth for the curated catalog; other
+JSON/JSONL feeds in catalog/ are merged after it in name order. Products are
+deduplicated by ASIN (the first source listing an ASIN wins), normalized to
+one schema (PRODUCT_FIELDS) and written to products-simple.json and
+products-catalog.json. The web stores open product URLs from
+products-simple.json as they are, so those keep the source's affiliate tag;
+the compiled artifact stores them untagged and the Lambda adds its own
+AMAZON_PARTNER_TAG when it serves them.
+
+Compiling streams the source (JSON array, products-catalog.json or JSONL)
+record by record, so feeds far larger than the Lambda's memory can be built.
 """
 
+import os
+import sys
 import json
-from shopping_tools import get_all_products
+import argparse
+from catalog_snapshot import CatalogSnapshot
+from catalog_stream import JSONL_SUFFIXES, file_content_hash, iter_products
+from catalog_artifact import artifact_path_for, write_artifact
+from catalog_mmap import mapped_path_for, write_mapped
 
-# Get all products
-products = get_all_products()
-
-# Create product catalog with all data
-catalog = {
-    "total_products": len(products),
-    "categories": {},
-    "products": products
+# format -> (default artifact path, writer)
+ARTIFACT_FORMATS = {
+    'map': (mapped_path_for, write_mapped),
+    'pickle': (artifact_path_for, write_artifact),
 }
 
-# Organize by category
-for product in products:
-    category = product.get('category', 'other')
-    if category not in catalog['categories']:
-        catalog['categories'][category] = []
-    catalog['categories'][category].append(product)
+CATALOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'catalog')
+PRIMARY_SOURCE = 'products.json'
+
+# Every built product has exactly these keys, in this order; the shopping_tools modules and benchmarks rely on them
+PRODUCT_FIELDS = ('name', 'price', 'asin', 'url', 'image_url', 'rating', 'reviews', 'description',
+                  'category', 'subcategory', 'badge')
+DEFAULT_SUBCATEGORY = 'general'
+
+def catalog_sources(directory=CATALOG_DIR):
+    """Source files in merge order: products.json first, then the other feeds by name"""
+    names = sorted(name for name in os.listdir(directory) if name.endswith(('.json',) + JSONL_SUFFIXES))
+    names.sort(key=lambda name: name != PRIMARY_SOURCE)
+    return [os.path.join(directory, name) for name in names]
+
+def normalize_product(product):
+    """The product in the catalog schema: missing fields filled in (subcategory 'general', no badge), others dropped"""
+    normalized = {field: product.get(field) for field in PRODUCT_FIELDS}
+    normalized['subcategory'] = normalized['subcategory'] or DEFAULT_SUBCATEGORY
+    return normalized
+
+def merge_sources(paths, strict=False):
+    """Products of every source in the catalog schema, deduplicated by ASIN (the first source wins)"""
+    products, seen, duplicates = [], set(), 0
+    for path in paths:
+        for product in iter_products(path, strict=strict):
+            if product['asin'] in seen:
+                duplicates += 1
+                continue
+            seen.add(product['asin'])
+            products.append(normalize_product(product))
+
+    print(f"Merged {len(products)} products from {len(paths)} sources ({duplicates} duplicate ASINs dropped)")
+    return products
+
+def extract(sources=None, strict=False):
+    # Get all products
+    products = merge_sources(sources or catalog_sources(), strict)
+
+    # Create product catalog with all data
+    catalog = {
+        "total_products": len(products),
+        "categories": {},
+        "products": products
+    }
+
+    # Organize by category
+    for product in products:
+        category = product.get('category', 'other')
+        if category not in catalog['categories']:
+            catalog['categories'][category] = []
+        catalog['categories'][category].append(product)
+
+    # Save to JSON file
+    with open('products-catalog.json', 'w', encoding='utf-8') as f:
+        json.dump(catalog, f, indent=2, ensure_ascii=False)
+
+    print(f"Extracted {len(products)} products")
+    print(f"Categories: {', '.join(catalog['categories'].keys())}")
+    print(f"Saved to: products-catalog.json")
+
+    # Create simplified version for website (just the products array)
+    with open('products-simple.json', 'w', encoding='utf-8') as f:
+        json.dump(products, f, indent=2, ensure_ascii=False)
+
+    print(f"Saved simple version to: products-simple.json")
+
+def compile_catalog(json_path, artifact_path=None, artifact_format='map', strict=False):
+    """Build the snapshot for a products JSON/JSONL file and write it as an artifact"""
+    path_for, write = ARTIFACT_FORMATS[artifact_format]
+    artifact_path = artifact_path or path_for(json_path)
+
+    # The artifact is keyed to the exact source bytes; the Lambda rejects it if they differ
+    version = file_content_hash(json_path)
+    snapshot = CatalogSnapshot(iter_products(json_path, strict=strict), version, source=json_path)
+    if write is write_mapped:
+        # The Lambda opens a map without hashing its source, so the size is recorded for a cheap stat check
+        size = write(artifact_path, snapshot, version, source_size=os.path.getsize(json_path))
+    else:
+        size = write(artifact_path, snapshot, version)
 
-# Save to JSON file
-with open('products-catalog.json', 'w', encoding='utf-8') as f:
-    json.dump(catalog, f, indent=2, ensure_ascii=False)
+    print(f"Compiled {len(snapshot)} products ({version[:12]}) to: {artifact_path} ({size} bytes)")
+    return artifact_path
 
-print(f"Extracted {len(products)} products")
-print(f"Categories: {', '.join(catalog['categories'].keys())}")
-print(f"Saved to: products-catalog.json")
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the product catalog and compile its search artifact")
+    parser.add_argument('--compile', metavar='JSON', help="only compile an existing products JSON/JSONL file")
+    parser.add_argument('--sources', nargs='+', metavar='FILE', help="catalog sources to merge (default: catalog/)")
+    parser.add_argument('--strict', action='store_true', help="fail on invalid product records instead of skipping them")
+    parser.add_argument('--output', metavar='PATH', help="artifact path (default: <JSON>.catalog.map / .catalog.bin)")
+    parser.add_argument('--format', choices=sorted(ARTIFACT_FORMATS), default='map', help="artifact format (default: map)")
+    args = parser.parse_args(argv)
 
-# Create simplified version for website (just the products array)
-with open('products-simple.json', 'w', encoding='utf-8') as f:
-    json.dump(products, f, indent=2, ensure_ascii=False)
+    if args.compile:
+        compile_catalog(args.compile, args.output, args.format, args.strict)
+        return 0
 
-print(f"Saved simple version to: products-simple.json")
+    extract(args.sources, args.strict)
+    compile_catalog('products-simple.json', args.output, args.format, args.strict)
+    return 0
 
+if __name__ == '__main__':
+    sys.exit(main())
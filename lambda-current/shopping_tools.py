@@ -5,90 +5,106 @@ import os
 import json
 import logging
 from typing import Dict, List, Optional, Any
+from catalog_index import FIELD_NAME, FIELD_DESCRIPTION, FIELD_CATEGORY, FIELD_SUBCATEGORY
+from catalog_snapshot import CatalogSnapshot, SnapshotCache
+from catalog_delta import delta_feed_from_env
+from catalog_ranking import BM25FRanker, FieldWeightRanker, materialize, top_products
+from catalog_semantic import HybridRanker, SemanticRanker
+from result_cache import ResultCache, search_cache_key
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 AMAZON_PARTNER_TAG = os.environ.get('AMAZON_PARTNER_TAG', 'aipro00-20')
 
+# products-simple.json is parsed once per container; a redeployed file is picked up on the next check.
+# When the deploy ships a products-simple.catalog.map compiled from this same JSON, it is mapped instead.
+_CATALOG_FILE = os.path.join(os.path.dirname(__file__), 'products-simple.json')
+# Delta files under CATALOG_DELTA_LOCATION (directory or s3://bucket/prefix) are layered on while warm.
+_catalog = SnapshotCache(path=_CATALOG_FILE,
+                         deltas=delta_feed_from_env())
+
+def get_catalog_snapshot() -> CatalogSnapshot:
+    """Current catalog snapshot (products, index and version)"""
+    return _catalog.get()
+
 def get_all_products() -> List[Dict[str, Any]]:
     """
-    Load all 108 products from products-simple.json
+    All products from products-simple.json, materialized from the cached snapshot
     """
-    try:
-        # Try to load from file in Lambda package
-        json_path = os.path.join(os.path.dirname(__file__), 'products-simple.json')
-        
-        if not os.path.exists(json_path):
-            logger.error(f"products-simple.json not found at {json_path}")
-            # Return empty list if file not found
-            return []
-        
-        with open(json_path, 'r', encoding='utf-8') as f:
-            products = json.load(f)
-        
-        logger.info(f"Successfully loaded {len(products)} products from JSON")
-        return products
-        
-    except Exception as e:
-        logger.error(f"Error loading products: {str(e)}")
-        return []
+    return _catalog.get().products()
+
+def get_catalog_index() -> Any:
+    """
+    Keyword index for the current catalog snapshot: a CatalogIndex, or with
+    deltas applied a LayeredIndex offering the same match() and score()
+    """
+    return _catalog.get().index
+
+def get_product_by_asin(asin: str) -> Optional[Dict[str, Any]]:
+    """Look up one product by ASIN without materializing the catalog"""
+    store = _catalog.get().store
+    doc_id = store.find(asin)
+    return store.to_dict(doc_id) if doc_id is not None else None
+
+def _field_score(mask: int) -> int:
+    """Score a query word by the fields it matched"""
+    score = 0
+    if mask & FIELD_NAME:
+        score += 10
+    if mask & FIELD_DESCRIPTION:
+        score += 5
+    if mask & FIELD_CATEGORY:
+        score += 3
+    if mask & FIELD_SUBCATEGORY:
+        score += 3
+    return score
+
+def _round_score(score: float) -> Any:
+    """Keep integer field scores as-is; trim BM25 floats for the response"""
+    return score if isinstance(score, int) else round(score, 3)
+
+# Ranking engine, selectable per deployment: 'bm25' (default) or the original fixed 'fields' weights
+_RANKERS = {
+    'fields': FieldWeightRanker(_field_score, min_score=1),
+    'bm25': BM25FRanker(),
+    'semantic': SemanticRanker(),
+    'hybrid': HybridRanker(BM25FRanker()),
+}
+_ranker = _RANKERS.get(os.environ.get('CATALOG_RANKER', 'bm25'), _RANKERS['bm25'])
 
 def search_products(query: str, max_price: Optional[float] = None, category: Optional[str] = None) -> List[Dict[str, Any]]:
     """Search through all products"""
-    all_products = get_all_products()
-    
-    # Filter by category if specified
-    if category:
-        all_products = [p for p in all_products if p.get('category') == category or p.get('subcategory') == category]
-    
-    # Convert query to lowercase for case-insensitive search
-    query_lower = query.lower()
-    query_words = query_lower.split()
-    
-    scored_products = []
-    for product in all_products:
-        score = 0
-        name_lower = product.get('name', '').lower()
-        desc_lower = product.get('description', '').lower()
-        cat_lower = product.get('category', '').lower()
-        subcat_lower = product.get('subcategory', '').lower()
-        
-        # Score based on matches
-        for word in query_words:
-            if word in name_lower:
-                score += 10
-            if word in desc_lower:
-                score += 5
-            if word in cat_lower:
-                score += 3
-            if word in subcat_lower:
-                score += 3
-        
-        # Only include products with decent score (at least one match)
-        if score > 0:
-            product['_search_score'] = score
-            scored_products.append(product)
-    
-    # If NO matches at all, return empty list (no random products!)
-    if not scored_products:
-        return []
-    
-    # Filter by price if specified
-    if max_price:
-        scored_products = [p for p in scored_products if p['price'] <= max_price]
-    
-    # Sort by search score and rating
-    scored_products.sort(key=lambda x: (x.get('_search_score', 0), x.get('rating', 0)), reverse=True)
+    return _search(_catalog.get(), query, max_price, category)
+
+def _search(snapshot: CatalogSnapshot, query: str, max_price: Optional[float], category: Optional[str]) -> List[Dict[str, Any]]:
+    # Only products sharing a term with the query and under the price cap are scored
+    hits = top_products(snapshot, _ranker, query, 15, max_price=max_price, category=category)
     
-    return scored_products[:15]  # Return top 15 matches
+    # Hits are (product id, score) views; only the returned products get fresh dicts
+    return materialize(snapshot.store, hits, _round_score)
+
+# Popular queries repeat; results are cached per catalog version (SEARCH_CACHE_SIZE / SEARCH_CACHE_TTL_SECONDS)
+_search_cache = ResultCache()
+
+def get_search_cache_stats() -> Dict[str, int]:
+    """Hit/miss/eviction counters for the product_search_tool result cache"""
+    return _search_cache.stats()
 
 def product_search_tool(query: str, category: Optional[str] = None, max_price: Optional[float] = None) -> Dict[str, Any]:
     """
     Main product search function that Alexa uses
     """
     try:
-        products = search_products(query, max_price=max_price, category=category)
+        # Cache hits skip ranking; products are stored encoded so each caller gets its own dicts
+        snapshot = _catalog.get()
+        key = search_cache_key(query, max_price, category)
+        cached = _search_cache.get(key, snapshot.version)
+        if cached is None:
+            products = _search(snapshot, query, max_price, category)
+            _search_cache.put(key, json.dumps(products), snapshot.version)
+        else:
+            products = json.loads(cached)
         
         if not products:
             return {
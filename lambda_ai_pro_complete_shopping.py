@@ -10,7 +10,8 @@ import urllib.parse
 import uuid
 from datetime import datetime
 from decimal import Decimal
-from shopping_tools import product_search_tool, affiliate_injector
+# Curated catalog and live PA-API under one deadline (FEDERATED_DEADLINE_MS); curated only without PA-API credentials
+from shopping_tools_federated import product_search_tool, affiliate_injector
 
 # Configure logging
 logger = logging.getLogger()
@@ -0,0 +1,192 @@
+# paapi_cache.py
+# Stale-while-revalidate cache for PA-API search results: in-container LRU plus a DynamoDB tier
+
+import os
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Callable, Hashable, Set, Tuple
+from result_cache import ResultCache
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+PAAPI_CACHE_SIZE = int(os.environ.get('PAAPI_CACHE_SIZE', '256'))
+# Results younger than this are served as-is
+PAAPI_CACHE_FRESH_SECONDS = float(os.environ.get('PAAPI_CACHE_FRESH_SECONDS', '3600'))
+# Older results are served while a background refresh runs, up to this age; past it the search waits for PA-API
+PAAPI_CACHE_MAX_STALE_SECONDS = float(os.environ.get('PAAPI_CACHE_MAX_STALE_SECONDS', '86400'))
+# Per-category fresh windows in seconds, e.g. {"electronics": 900, "books": 86400}
+PAAPI_CACHE_CATEGORY_FRESH_SECONDS: Dict[str, float] = json.loads(os.environ.get('PAAPI_CACHE_CATEGORY_FRESH_SECONDS') or '{}')
+# DynamoDB table shared by every container (partition key `cacheKey`, TTL attribute `expiresAt`); unset = LRU only
+PAAPI_CACHE_TABLE = os.environ.get('PAAPI_CACHE_TABLE')
+
+class DynamoDBResultStore:
+    """
+    Persistent tier: one item per search with the encoded products, the
+    fetch time and a DynamoDB TTL (`expiresAt`) at the end of the stale
+    window, so expired results are deleted by DynamoDB. The table is
+    opened on first use.
+    """
+
+    def __init__(self, table_name: str, table: Any = None):
+        self.table_name = table_name
+        self._table = table
+
+    @property
+    def table(self) -> Any:
+        if self._table is None:
+            import boto3
+            self._table = boto3.resource('dynamodb').Table(self.table_name)
+        return self._table
+
+    def get(self, key: str) -> Optional[Tuple[float, str]]:
+        """(fetched at, encoded products), or None"""
+        item = self.table.get_item(Key={'cacheKey': key}).get('Item')
+        if item is None:
+            return None
+        return float(item['fetchedAt']), item['products']
+
+    def put(self, key: str, fetched_at: float, products: str, expires_at: float) -> None:
+        self.table.put_item(Item={
+            'cacheKey': key,
+            'fetchedAt': int(fetched_at),
+            'expiresAt': int(expires_at),
+            'products': products,
+        })
+
+class StaleWhileRevalidateCache:
+    """
+    Two-tier cache of search results with stale-while-revalidate. Lookups
+    try the in-container LRU, then the persistent store. A result younger
+    than its category's fresh window is returned as-is; an older one, up to
+    `max_stale_seconds`, is returned immediately and refreshed in the
+    background (one refresh per key at a time). Missing or older results
+    are fetched inline. A failed refresh keeps the stale result.
+
+    In Lambda, a background refresh that is still running when the
+    invocation returns resumes when the container is next invoked.
+    """
+
+    def __init__(self, store: Optional[DynamoDBResultStore] = None, max_entries: int = PAAPI_CACHE_SIZE,
+                 fresh_seconds: float = PAAPI_CACHE_FRESH_SECONDS,
+                 max_stale_seconds: float = PAAPI_CACHE_MAX_STALE_SECONDS,
+                 category_fresh_seconds: Optional[Dict[str, float]] = None,
+                 clock: Callable[[], float] = time.time):
+        self.store = store
+        self.fresh_seconds = fresh_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self.category_fresh_seconds = dict(PAAPI_CACHE_CATEGORY_FRESH_SECONDS if category_fresh_seconds is None
+                                           else category_fresh_seconds)
+        self.clock = clock
+        self._local = ResultCache(max_entries, ttl_seconds=max_stale_seconds)
+        self._refreshing: Set[Hashable] = set()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.store_errors = 0
+
+    def fresh_for(self, category: Optional[str]) -> float:
+        """Fresh window for a category, capped at the stale window"""
+        return min(self.category_fresh_seconds.get(category or '', self.fresh_seconds), self.max_stale_seconds)
+
+    def get(self, key: Tuple[Any, ...], fetch: Callable[[], List[Dict[str, Any]]],
+            category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Products for `key`, calling fetch() inline on a miss and in the background when stale"""
+        entry = self._local.get(key) or self._load(key)
+        if entry is not None:
+            fetched_at, products = entry
+            age = self.clock() - fetched_at
+            if age <= self.fresh_for(category):
+                self._count('fresh_hits')
+                return json.loads(products)
+            if age <= self.max_stale_seconds:
+                self._count('stale_hits')
+                self._revalidate(key, fetch)
+                return json.loads(products)
+
+        self._count('misses')
+        products = fetch()
+        self._save(key, products)
+        return products
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/refresh counters; `local` is the LRU's own counters"""
+        with self._lock:
+            return {
+                'fresh_hits': self.fresh_hits,
+                'stale_hits': self.stale_hits,
+                'store_hits': self.store_hits,
+                'misses': self.misses,
+                'refreshes': self.refreshes,
+                'refresh_errors': self.refresh_errors,
+                'store_errors': self.store_errors,
+                'refreshing': len(self._refreshing),
+                'local': self._local.stats(),
+            }
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _load(self, key: Tuple[Any, ...]) -> Optional[Tuple[float, str]]:
+        """Persistent-tier entry, copied into the LRU"""
+        if self.store is None:
+            return None
+        try:
+            entry = self.store.get(_store_key(key))
+        except Exception as e:
+            logger.error(f"Error reading PA-API result cache: {str(e)}")
+            self._count('store_errors')
+            return None
+        if entry is not None and self.clock() - entry[0] <= self.max_stale_seconds:
+            self._count('store_hits')
+            self._local.put(key, entry)
+            return entry
+        return None
+
+    def _save(self, key: Tuple[Any, ...], products: List[Dict[str, Any]]) -> None:
+        fetched_at = self.clock()
+        encoded = json.dumps(products)
+        self._local.put(key, (fetched_at, encoded))
+        if self.store is None:
+            return
+        try:
+            self.store.put(_store_key(key), fetched_at, encoded, fetched_at + self.max_stale_seconds)
+        except Exception as e:
+            logger.error(f"Error writing PA-API result cache: {str(e)}")
+            self._count('store_errors')
+
+    def _revalidate(self, key: Tuple[Any, ...], fetch: Callable[[], List[Dict[str, Any]]]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='paapi-refresh')
+        self._executor.submit(self._refresh, key, fetch)
+
+    def _refresh(self, key: Tuple[Any, ...], fetch: Callable[[], List[Dict[str, Any]]]) -> None:
+        try:
+            self._save(key, fetch())
+            self._count('refreshes')
+        except Exception as e:
+            logger.error(f"Background PA-API refresh failed, keeping stale results: {str(e)}")
+            self._count('refresh_errors')
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+def _store_key(key: Tuple[Any, ...]) -> str:
+    return json.dumps(list(key), separators=(',', ':'))
+
+def result_store_from_env() -> Optional[DynamoDBResultStore]:
+    """DynamoDB tier for PAAPI_CACHE_TABLE, or None when unset"""
+    return DynamoDBResultStore(PAAPI_CACHE_TABLE) if PAAPI_CACHE_TABLE else None
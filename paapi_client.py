@@ -0,0 +1,443 @@
+# paapi_client.py
+# Keep-alive HTTPS connection pool, rate limiting and circuit breaking for Product Advertising API calls
+
+import os
+import ssl
+import json
+import time
+import select
+import logging
+import threading
+import http.client
+import urllib.parse
+from typing import Dict, List, Optional, Any, Callable, NamedTuple, Tuple
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# PA-API base URL; point it at a local stand-in server for benchmarks and tests
+AMAZON_API_ENDPOINT = os.environ.get('AMAZON_API_ENDPOINT', 'https://webservices.amazon.com')
+# Idle keep-alive connections kept per container
+PAAPI_POOL_SIZE = int(os.environ.get('PAAPI_POOL_SIZE', '4'))
+# Per-request connect/read timeout; Alexa gives the whole skill response 8 seconds
+PAAPI_TIMEOUT_SECONDS = float(os.environ.get('PAAPI_TIMEOUT_SECONDS', '3'))
+# Connections idle longer than this are closed instead of reused (servers drop idle keep-alives)
+PAAPI_MAX_IDLE_SECONDS = float(os.environ.get('PAAPI_MAX_IDLE_SECONDS', '30'))
+
+# This container's share of the account's PA-API requests per second (accounts start at 1 TPS)
+PAAPI_TPS = float(os.environ.get('PAAPI_TPS', '1'))
+if PAAPI_TPS <= 0:
+    logger.warning(f"PAAPI_TPS must be positive, got {PAAPI_TPS}; using 1")
+    PAAPI_TPS = 1.0
+# Longest a search waits for a rate-limit token before giving up on PA-API for that search.
+# The default covers one token interval at PAAPI_TPS, so back-to-back searches queue instead of failing
+PAAPI_RATE_WAIT_SECONDS = float(os.environ.get('PAAPI_RATE_WAIT_SECONDS') or max(0.25, 1.0 / PAAPI_TPS))
+# Consecutive throttles, 5xx responses or timeouts that open the circuit breaker
+PAAPI_BREAKER_FAILURES = int(os.environ.get('PAAPI_BREAKER_FAILURES', '5'))
+# How long an open breaker fails calls fast before letting one probe through
+PAAPI_BREAKER_COOLDOWN_SECONDS = float(os.environ.get('PAAPI_BREAKER_COOLDOWN_SECONDS', '30'))
+
+PAAPI_TARGET_PREFIX = 'com.amazon.paapi5.v1.ProductAdvertisingAPIv1.'
+
+class PAAPIError(Exception):
+    """PA-API answered with a non-2xx status"""
+
+    def __init__(self, status: int, body: bytes):
+        super().__init__(f"PA-API returned HTTP {status}: {body[:200].decode('utf-8', 'replace')}")
+        self.status = status
+        self.body = body
+
+class PAAPIUnavailable(Exception):
+    """The call was not sent: the circuit breaker is open or no rate-limit token came in time"""
+
+class PAAPIResponse(NamedTuple):
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+    def json(self) -> Any:
+        return json.loads(self.body.decode('utf-8'))
+
+    def raise_for_status(self) -> 'PAAPIResponse':
+        if not 200 <= self.status < 300:
+            raise PAAPIError(self.status, self.body)
+        return self
+
+class ConnectionPool:
+    """
+    Bounded pool of keep-alive HTTP(S) connections to one endpoint. Requests
+    take the most recently used idle connection (LIFO keeps the fewest
+    sockets warm), after a health check: connections idle past
+    `max_idle_seconds`, or whose peer has closed them, are dropped. A request
+    that fails because the server closed a reused connection is retried once
+    on a fresh one. When more requests run at once than the pool holds, the
+    extra connections are closed after use rather than kept.
+    """
+
+    def __init__(self, endpoint: str = AMAZON_API_ENDPOINT, size: int = PAAPI_POOL_SIZE,
+                 timeout: float = PAAPI_TIMEOUT_SECONDS, max_idle_seconds: float = PAAPI_MAX_IDLE_SECONDS,
+                 context: Optional[ssl.SSLContext] = None):
+        parts = urllib.parse.urlsplit(endpoint)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f"Unsupported PA-API endpoint: {endpoint}")
+        self.endpoint = endpoint
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip('/')
+        self.size = size
+        self.timeout = timeout
+        self.max_idle_seconds = max_idle_seconds
+        self.context = context or (ssl.create_default_context() if self.scheme == 'https' else None)
+        self._idle: List[Tuple[float, http.client.HTTPConnection]] = []
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.created = 0
+        self.reused = 0
+        self.dropped = 0
+        self.retries = 0
+
+    @property
+    def host_header(self) -> str:
+        """Host header value, as signed and as sent by http.client"""
+        return f"{self.host}:{self.port}" if self.port else self.host
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None) -> PAAPIResponse:
+        """Send one request over a pooled connection and read the whole response"""
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock:
+            self.requests += 1
+        retried = False
+        while True:
+            conn, reused = self._acquire(timeout)
+            try:
+                conn.request(method, self.base_path + path, body=body, headers=headers or {})
+                response = conn.getresponse()
+                data = response.read()
+            except (ConnectionError, http.client.BadStatusLine) as e:
+                conn.close()
+                if not reused or retried:
+                    raise
+                # The server closed the keep-alive connection between our health check and the request
+                retried = True
+                with self._lock:
+                    self.retries += 1
+                logger.info(f"Retrying PA-API request on a new connection: {str(e)}")
+                continue
+            except BaseException:
+                conn.close()
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            return PAAPIResponse(response.status, {k.lower(): v for k, v in response.getheaders()}, data)
+
+    def close(self) -> None:
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for _, conn in idle:
+            conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for sizing the pool and spotting dropped keep-alives"""
+        with self._lock:
+            return {
+                'idle': len(self._idle),
+                'size': self.size,
+                'requests': self.requests,
+                'created': self.created,
+                'reused': self.reused,
+                'dropped': self.dropped,
+                'retries': self.retries,
+            }
+
+    def _acquire(self, timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        """(connection with `timeout` applied, whether it was reused)"""
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    self.created += 1
+                    break
+                released_at, conn = self._idle.pop()
+            if now - released_at > self.max_idle_seconds or _is_dropped(conn):
+                conn.close()
+                with self._lock:
+                    self.dropped += 1
+                continue
+            with self._lock:
+                self.reused += 1
+            conn.timeout = timeout
+            conn.sock.settimeout(timeout)
+            return conn, True
+
+        if self.scheme == 'https':
+            conn = http.client.HTTPSConnection(self.host, self.port, timeout=timeout, context=self.context)
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+        return conn, False
+
+    def _release(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append((time.monotonic(), conn))
+                return
+        conn.close()
+
+def _is_dropped(conn: http.client.HTTPConnection) -> bool:
+    """
+    An idle keep-alive connection has nothing to read; if its socket is
+    readable the peer has closed it (or sent junk), so it can't be reused.
+    """
+    sock = conn.sock
+    if sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter: `rate` tokens per second refill a bucket of
+    `burst` tokens, and each call takes one. acquire() sleeps until a token
+    is free, so a batch job stays under the PA-API request-per-second quota.
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        if rate <= 0:
+            raise ValueError(f"Token bucket rate must be positive, got {rate}")
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token, waiting for one if needed; returns the seconds waited"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                wait = self._take()
+                if wait == 0:
+                    return waited
+            self.sleep(wait)
+            waited += wait
+
+    def try_acquire(self, max_wait: float) -> bool:
+        """Take a token if one is free within `max_wait` seconds (waiting for it); False leaves the bucket as it was"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                wait = self._take()
+                if wait == 0:
+                    return True
+                if waited + wait > max_wait:
+                    return False
+            self.sleep(wait)
+            waited += wait
+
+    def _take(self) -> float:
+        """Refill, then take a token (0) or return the wait until one is free; call under the lock"""
+        now = self.clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+class AdaptiveTokenBucket(TokenBucket):
+    """
+    Token bucket whose rate follows PA-API's answers (additive increase,
+    multiplicative decrease): each throttled call halves the rate, down to
+    `min_rate`, and drains the bucket; each successful one adds back a
+    twentieth of `max_rate`. Containers sharing one account's quota settle
+    below it instead of each being throttled at the configured rate.
+    """
+
+    def __init__(self, max_rate: float, burst: float = 1.0, min_rate: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        super().__init__(max_rate, burst, clock, sleep)
+        self.max_rate = max_rate
+        self.min_rate = max_rate / 10 if min_rate is None else min_rate
+        self.throttles = 0
+
+    def throttled(self) -> None:
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = 0.0
+            self.throttles += 1
+
+    def succeeded(self) -> None:
+        if self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {'rate': round(self.rate, 3), 'max_rate': self.max_rate, 'throttles': self.throttles}
+
+class CircuitBreaker:
+    """
+    Stops calling PA-API while it is failing. After `failure_threshold`
+    consecutive failures the breaker opens and allow() refuses calls for
+    `cooldown_seconds`; then it lets a single probe through (half-open).
+    A successful probe closes the breaker, and a failed one reopens it
+    for another cool-down.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold: int = PAAPI_BREAKER_FAILURES,
+                 cooldown_seconds: float = PAAPI_BREAKER_COOLDOWN_SECONDS, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.clock = clock
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.rejected = 0
+        self.probes = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; a True in the half-open state makes that call the probe"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self.clock() - self._opened_at >= self.cooldown_seconds:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                self.probes += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            # Calls still in flight when the breaker opened don't extend its cool-down
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self._failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self._opened_at = self.clock()
+                self.opened += 1
+                logger.warning(f"PA-API circuit breaker open for {self.cooldown_seconds:g}s "
+                               f"after {self._failures} consecutive failures")
+            self._probing = False
+
+    def release(self) -> None:
+        """The allowed call was not sent after all; a half-open breaker may probe again"""
+        with self._lock:
+            self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self._failures,
+                'opened': self.opened,
+                'rejected': self.rejected,
+                'probes': self.probes,
+            }
+
+def _is_upstream_failure(error: BaseException) -> bool:
+    """Throttling, server errors, timeouts and connection failures; other 4xx mean PA-API is up"""
+    if isinstance(error, PAAPIError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (OSError, http.client.HTTPException))
+
+def call_operation(pool: ConnectionPool, signer: Any, operation: str, payload: Dict[str, Any],
+                   timeout: Optional[float] = None, limiter: Optional[AdaptiveTokenBucket] = None,
+                   breaker: Optional[CircuitBreaker] = None, max_wait: float = PAAPI_RATE_WAIT_SECONDS) -> Any:
+    """
+    One signed PA-API 5.0 operation (SearchItems, GetItems...) over `pool`;
+    returns the decoded response and raises PAAPIError on a non-2xx status.
+    With a breaker and limiter, raises PAAPIUnavailable without calling
+    PA-API while the breaker is open or when no token is free within
+    `max_wait`, and feeds the outcome back to both.
+    """
+    if breaker is not None and not breaker.allow():
+        raise PAAPIUnavailable("PA-API circuit breaker is open")
+    if limiter is not None and not limiter.try_acquire(max_wait):
+        if breaker is not None:
+            breaker.release()
+        raise PAAPIUnavailable(f"PA-API rate limit: no request slot within {max_wait:.2f}s")
+    try:
+        result = _send_operation(pool, signer, operation, payload, timeout)
+    except Exception as e:
+        if limiter is not None and isinstance(e, PAAPIError) and e.status == 429:
+            limiter.throttled()
+        if breaker is not None:
+            if _is_upstream_failure(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        raise
+    if limiter is not None:
+        limiter.succeeded()
+    if breaker is not None:
+        breaker.record_success()
+    return result
+
+def _send_operation(pool: ConnectionPool, signer: Any, operation: str, payload: Dict[str, Any],
+                    timeout: Optional[float]) -> Any:
+    path = f"/paapi5/{operation.lower()}"
+    body = json.dumps(payload).encode('utf-8')
+    headers = {
+        'Content-Type': 'application/json; charset=utf-8',
+        'X-Amz-Target': PAAPI_TARGET_PREFIX + operation,
+        'Content-Encoding': 'amz-1.0',
+    }
+    # Sign with AWS Signature Version 4 (adds Host, X-Amz-Date and Authorization)
+    headers = signer.sign('POST', pool.host_header, pool.base_path + path, headers, body)
+    return pool.request('POST', path, body=body, headers=headers, timeout=timeout).raise_for_status().json()
+
+# One pool per container, created on first use and shared by every warm invocation
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+# Interactive searches share one limiter and breaker per container, so a PA-API incident costs
+# each container a few failed calls and then fails fast until a probe gets through
+_limiter: Optional[AdaptiveTokenBucket] = None
+_breaker: Optional[CircuitBreaker] = None
+
+def get_limiter() -> AdaptiveTokenBucket:
+    global _limiter
+    if _limiter is None:
+        with _pool_lock:
+            if _limiter is None:
+                _limiter = AdaptiveTokenBucket(PAAPI_TPS)
+    return _limiter
+
+def get_breaker() -> CircuitBreaker:
+    global _breaker
+    if _breaker is None:
+        with _pool_lock:
+            if _breaker is None:
+                _breaker = CircuitBreaker()
+    return _breaker
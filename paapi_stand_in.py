@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the PA-API 5.0 endpoint, for load and latency tests of
+the PA-API client, caches and fallbacks without spending real quota.
+
+Answers SearchItems and GetItems (POST /paapi5/searchitems and
+/paapi5/getitems) in the response shapes shopping_tools_amazon_api and
+refresh_catalog_prices parse, from the products in products-simple.json.
+On top of that it can:
+
+  - add latency, fixed or lognormal with a given median and p99
+  - throttle like PA-API: HTTP 429 TooManyRequests past --tps requests/second
+  - inject 429s, 500s, hung requests and dropped connections at given rates
+  - drift prices, so a price refresh has something to report
+
+    python paapi_stand_in.py --port 8080 --latency-ms 80 --latency-p99-ms 400 --tps 10
+    python paapi_stand_in.py --port 8080 --error-rate 0.05 --hang-rate 0.01 --seed 7
+    AMAZON_API_ENDPOINT=http://localhost:8080 python refresh_catalog_prices.py
+
+GET /stats returns the request and fault counters as JSON.
+"""
+
+import os
+import re
+import sys
+import ssl
+import json
+import math
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Any
+from catalog_stream import iter_products
+
+DEFAULT_CATALOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'products-simple.json')
+OPERATIONS = {'/paapi5/searchitems': 'SearchItems', '/paapi5/getitems': 'GetItems'}
+TARGET_PREFIX = 'com.amazon.paapi5.v1.ProductAdvertisingAPIv1.'
+# z-score of the 99th percentile, for turning a median and p99 into a lognormal sigma
+_Z99 = 2.3263
+# With a zero median, half the requests take no time and the other half an exponential
+# tail that half exceeds p99 2% of the time, i.e. 1% of all requests
+_ZERO_MEDIAN_TAIL_SHARE = 0.02
+
+# Error bodies as PA-API sends them
+THROTTLED = (429, 'TooManyRequestsException', 'TooManyRequests',
+             'The request was denied due to request throttling. Please verify the number of requests made per '
+             'second to the Amazon Product Advertising API.')
+INTERNAL_FAILURE = (500, 'InternalServerException', 'InternalFailure',
+                    'The request processing has failed because of an unknown error, exception or failure.')
+INCOMPLETE_SIGNATURE = (401, 'UnrecognizedClientException', 'IncompleteSignature',
+                        'The request signature did not include all of the required components.')
+UNKNOWN_OPERATION = (404, 'UnknownOperationException', 'UnknownOperation',
+                     'The operation requested is invalid. Please verify that the operation name is typed correctly.')
+
+def _error_body(error: tuple) -> bytes:
+    _, error_type, code, message = error
+    return json.dumps({'__type': f"com.amazon.paapi5#{error_type}",
+                       'Errors': [{'Code': code, 'Message': message}]}).encode('utf-8')
+
+class LatencyModel:
+    """
+    Server think time per request: fixed at the median, or lognormal through
+    the median and p99. A lognormal cannot have a zero median, so a p99 with
+    a zero median gives instant responses half the time and an exponential
+    tail through the p99 otherwise.
+    """
+
+    def __init__(self, median_ms: float = 0.0, p99_ms: Optional[float] = None, rng: Optional[random.Random] = None):
+        self.median = median_ms / 1000.0
+        self.p99 = (p99_ms / 1000.0) if p99_ms is not None else self.median
+        if self.p99 < self.median:
+            raise ValueError("p99 latency must be at least the median")
+        self.sigma = math.log(self.p99 / self.median) / _Z99 if self.median and self.p99 > self.median else 0.0
+        self.tail_rate = -math.log(_ZERO_MEDIAN_TAIL_SHARE) / self.p99 if not self.median and self.p99 else 0.0
+        self.rng = rng or random.Random()
+
+    def sample(self) -> float:
+        if self.tail_rate:
+            return self.rng.expovariate(self.tail_rate) if self.rng.random() < 0.5 else 0.0
+        if not self.sigma:
+            return self.median
+        return self.median * math.exp(self.rng.gauss(0.0, self.sigma))
+
+class StandIn:
+    """
+    Catalog, latency, rate limit and fault rates behind the stand-in
+    server, plus its counters. The fault rates are independent
+    probabilities per request, checked in the order throttle, error, hang,
+    drop. One seeded generator drives every random choice.
+    """
+
+    def __init__(self, products: List[Dict[str, Any]], latency: Optional[LatencyModel] = None,
+                 tps: Optional[float] = None, throttle_rate: float = 0.0, error_rate: float = 0.0,
+                 hang_rate: float = 0.0, hang_seconds: float = 30.0, drop_rate: float = 0.0,
+                 price_drift: float = 0.0, require_signature: bool = False, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+        self.products = {p['asin']: p for p in products}
+        self.latency = latency or LatencyModel()
+        self.latency.rng = self.rng
+        self.tps = tps
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.drop_rate = drop_rate
+        self.price_drift = price_drift
+        self.require_signature = require_signature
+        self._tokens = tps or 0.0
+        self._refilled = time.monotonic()
+        self._lock = threading.Lock()
+        self.counters = {'requests': 0, 'SearchItems': 0, 'GetItems': 0, 'ok': 0, 'rate_limited': 0,
+                         'throttled': 0, 'errors': 0, 'hung': 0, 'dropped': 0, 'rejected': 0}
+
+    def count(self, counter: str) -> None:
+        with self._lock:
+            self.counters[counter] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters)
+
+    def chance(self, rate: float) -> bool:
+        if not rate:
+            return False
+        with self._lock:
+            return self.rng.random() < rate
+
+    def think_time(self) -> float:
+        with self._lock:
+            return self.latency.sample()
+
+    def take_token(self) -> bool:
+        """Server-side token bucket at `tps` with one second of burst; True if the request may proceed"""
+        if self.tps is None:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.tps, self._tokens + (now - self._refilled) * self.tps)
+            self._refilled = now
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+    def fault(self) -> Optional[str]:
+        """Fault to inject for this request, if any: rate_limited, throttled, error, hang or drop"""
+        if not self.take_token():
+            return 'rate_limited'
+        for name, rate in (('throttled', self.throttle_rate), ('error', self.error_rate),
+                           ('hang', self.hang_rate), ('drop', self.drop_rate)):
+            if self.chance(rate):
+                return name
+        return None
+
+    def price(self, product: Dict[str, Any]) -> float:
+        if not self.price_drift:
+            return product['price']
+        with self._lock:
+            factor = 1.0 + self.rng.uniform(-self.price_drift, self.price_drift)
+        return round(product['price'] * factor, 2)
+
+    def item(self, product: Dict[str, Any]) -> Dict[str, Any]:
+        """One product in PA-API's Item shape (the resources this repo requests)"""
+        item: Dict[str, Any] = {
+            'ASIN': product['asin'],
+            'DetailPageURL': f"https://www.amazon.com/dp/{product['asin']}",
+            'ItemInfo': {
+                'Title': {'DisplayValue': product['name']},
+                'Features': {'DisplayValues': [product['description']] if product.get('description') else []},
+            },
+            'Offers': {'Listings': [{
+                'Price': {'Amount': self.price(product), 'Currency': 'USD'},
+                'Availability': {'Message': product.get('availability', 'In Stock')},
+            }]},
+        }
+        if product.get('image_url'):
+            item['Images'] = {'Primary': {'Large': {'URL': product['image_url'], 'Height': 500, 'Width': 500}}}
+        if product.get('rating'):
+            item['CustomerReviews'] = {'StarRating': {'Value': product['rating']}, 'Count': product.get('reviews', 0)}
+        return item
+
+    def search_items(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Products sharing the most keywords with the request, under MaxPrice (cents)"""
+        words = set(re.findall(r'[a-z0-9]+', str(request.get('Keywords', '')).lower()))
+        max_price = request.get('MaxPrice')
+        scored = []
+        for product in self.products.values():
+            if max_price is not None and product['price'] * 100 > max_price:
+                continue
+            text = set(re.findall(r'[a-z0-9]+', f"{product['name']} {product.get('description', '')}".lower()))
+            matches = len(words & text)
+            if matches:
+                scored.append((-matches, product['asin']))
+        scored.sort()
+        items = [self.item(self.products[asin]) for _, asin in scored[:int(request.get('ItemCount', 10))]]
+        if not items:
+            return {'Errors': [{'Code': 'NoResults', 'Message': 'No results found for your request.'}]}
+        return {'SearchResult': {'TotalResultCount': len(scored), 'Items': items}}
+
+    def get_items(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Requested ASINs in request order; unknown ones come back as ItemNotAccessible errors"""
+        asins = request.get('ItemIds', [])
+        response: Dict[str, Any] = {}
+        items = [self.item(self.products[asin]) for asin in asins if asin in self.products]
+        if items:
+            response['ItemsResult'] = {'Items': items}
+        missing = [asin for asin in asins if asin not in self.products]
+        if missing:
+            response['Errors'] = [{'Code': 'InvalidParameterValue',
+                                   'Message': f"The ItemId {asin} is not accessible through the Product Advertising API."}
+                                  for asin in missing]
+        return response
+
+def _handler(stand_in: StandIn) -> type:
+    class PAAPIHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out in separate writes; Nagle would hold the body for the client's delayed ACK
+        disable_nagle_algorithm = True
+
+        def do_GET(self) -> None:
+            if self.path != '/stats':
+                self._send(404, b'{}')
+                return
+            self._send(200, json.dumps(stand_in.stats()).encode('utf-8'))
+
+        def do_POST(self) -> None:
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            stand_in.count('requests')
+            operation = OPERATIONS.get(self.path.split('?')[0].lower())
+            target = self.headers.get('X-Amz-Target', '')
+            if operation is None or (target and target != TARGET_PREFIX + operation):
+                stand_in.count('rejected')
+                self._send_error(UNKNOWN_OPERATION)
+                return
+            if stand_in.require_signature and not self.headers.get('Authorization', '').startswith('AWS4-HMAC-SHA256 '):
+                stand_in.count('rejected')
+                self._send_error(INCOMPLETE_SIGNATURE)
+                return
+            stand_in.count(operation)
+
+            fault = stand_in.fault()
+            if fault in ('rate_limited', 'throttled'):
+                stand_in.count(fault)
+                self._send_error(THROTTLED)
+                return
+            time.sleep(stand_in.think_time())
+            if fault == 'error':
+                stand_in.count('errors')
+                self._send_error(INTERNAL_FAILURE)
+                return
+            if fault == 'hang':
+                stand_in.count('hung')
+                time.sleep(stand_in.hang_seconds)
+                self.close_connection = True
+                return
+            if fault == 'drop':
+                stand_in.count('dropped')
+                self.close_connection = True
+                return
+
+            try:
+                request = json.loads(body or b'{}')
+            except ValueError:
+                request = {}
+            response = stand_in.search_items(request) if operation == 'SearchItems' else stand_in.get_items(request)
+            stand_in.count('ok')
+            self._send(200, json.dumps(response).encode('utf-8'))
+
+        def _send_error(self, error: tuple) -> None:
+            self._send(error[0], _error_body(error))
+
+        def _send(self, status: int, payload: bytes) -> None:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return PAAPIHandler
+
+def start_stand_in(stand_in: StandIn, port: int = 0, certfile: Optional[str] = None,
+                   keyfile: Optional[str] = None, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """Serve on a background thread (port 0 picks a free one); stop with server.shutdown()"""
+    server = ThreadingHTTPServer((host, port), _handler(stand_in))
+    server.daemon_threads = True
+    if certfile:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile, keyfile)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Local PA-API 5.0 stand-in with latency, throttling and fault injection")
+    parser.add_argument('--host', default='127.0.0.1', help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8080, help="port to listen on (default: 8080)")
+    parser.add_argument('--catalog', default=DEFAULT_CATALOG, help="products to serve (default: products-simple.json)")
+    parser.add_argument('--certfile', help="serve HTTPS with this certificate")
+    parser.add_argument('--keyfile', help="private key for --certfile")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="median think time per request")
+    parser.add_argument('--latency-p99-ms', type=float, help="p99 think time; lognormal when above the median (exponential tail when the median is 0)")
+    parser.add_argument('--tps', type=float, help="requests per second before answering 429 (PA-API starts accounts at 1)")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="fraction of requests answered 429 regardless of rate")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered 500")
+    parser.add_argument('--hang-rate', type=float, default=0.0, help="fraction of requests never answered")
+    parser.add_argument('--hang-seconds', type=float, default=30.0, help="how long a hung request holds its connection")
+    parser.add_argument('--drop-rate', type=float, default=0.0, help="fraction of connections closed without a response")
+    parser.add_argument('--price-drift', type=float, default=0.0, help="random price change per item, e.g. 0.1 for +/-10%%")
+    parser.add_argument('--require-signature', action='store_true', help="reject requests without a SigV4 Authorization header")
+    parser.add_argument('--seed', type=int, help="seed for latency and fault sampling")
+    args = parser.parse_args(argv)
+
+    stand_in = StandIn(
+        list(iter_products(args.catalog)),
+        latency=LatencyModel(args.latency_ms, args.latency_p99_ms),
+        tps=args.tps,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds,
+        drop_rate=args.drop_rate,
+        price_drift=args.price_drift,
+        require_signature=args.require_signature,
+        seed=args.seed,
+    )
+    server = start_stand_in(stand_in, args.port, args.certfile, args.keyfile, args.host)
+    scheme = 'https' if args.certfile else 'http'
+    print(f"PA-API stand-in serving {len(stand_in.products)} products on {scheme}://{args.host}:{server.server_address[1]}",
+          file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    print(json.dumps(stand_in.stats()), file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
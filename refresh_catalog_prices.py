@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Refresh catalog prices and availability from PA-API GetItems and write the
+changes as a catalog delta (see catalog_delta), so warm Lambdas pick them up
+without a rebuild or redeploy.
+
+    python refresh_catalog_prices.py                                  # products-simple.json -> catalog-deltas/
+    python refresh_catalog_prices.py --deltas s3://bucket/catalog-deltas/
+    python refresh_catalog_prices.py --endpoint http://localhost:8080  # against a local PA-API stand-in
+
+ASINs are sent 10 per GetItems call (the PA-API maximum) through a token
+bucket (--rate requests per second; PA-API starts accounts at 1). Throttled
+(429) and failed calls are retried with backoff. Progress is checkpointed
+after every batch, so a run that stops part-way resumes where it left off
+when started again against the same catalog. Every price and availability
+PA-API returned goes into the delta, changed or not: earlier deltas may have
+moved a product away from the catalog file, and this one is layered over them.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from typing import Dict, List, Optional, Any, Iterator
+from catalog_stream import file_content_hash, iter_products
+from paapi_client import AMAZON_API_ENDPOINT, ConnectionPool, PAAPIError, TokenBucket, call_operation
+from sigv4 import SigV4Signer
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+GET_ITEMS_BATCH = 10
+RESOURCES = ['Offers.Listings.Price', 'Offers.Listings.Availability.Message']
+CHECKPOINT_NAME = '.price-refresh.checkpoint'
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+DEFAULT_CATALOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'products-simple.json')
+
+def batches(items: List[str], size: int = GET_ITEMS_BATCH) -> Iterator[List[str]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def parse_items(response: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """ASIN -> {'price', 'availability'} for every item GetItems returned (None when not offered)"""
+    results = {}
+    for item in response.get('ItemsResult', {}).get('Items', []):
+        listings = item.get('Offers', {}).get('Listings') or [{}]
+        results[item['ASIN']] = {
+            'price': listings[0].get('Price', {}).get('Amount'),
+            'availability': listings[0].get('Availability', {}).get('Message'),
+        }
+    return results
+
+class PriceRefresh:
+    """One refresh run over a catalog, resumable through its checkpoint file"""
+
+    def __init__(self, catalog_path: str, pool: ConnectionPool, signer: Any, bucket: TokenBucket,
+                 partner_tag: str, checkpoint_path: str, retries: int = 3, backoff_seconds: float = 1.0):
+        self.catalog_path = catalog_path
+        self.pool = pool
+        self.signer = signer
+        self.bucket = bucket
+        self.partner_tag = partner_tag
+        self.checkpoint_path = checkpoint_path
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.products = {p['asin']: p for p in iter_products(catalog_path)}
+        self.checkpoint = self._load_checkpoint(file_content_hash(catalog_path))
+
+    def run(self) -> bool:
+        """Fetch every ASIN not yet in the checkpoint; False if a batch failed (rerun to resume)"""
+        done = set(self.checkpoint['done'])
+        pending = [asin for asin in self.products if asin not in done]
+        if done:
+            print(f"Resuming: {len(done)} ASINs already refreshed, {len(pending)} to go", file=sys.stderr)
+        for batch in batches(pending):
+            try:
+                response = self._get_items(batch)
+            except Exception as e:
+                logger.error(f"GetItems failed for {batch[0]}..{batch[-1]}, stopping: {str(e)}")
+                return False
+            results = parse_items(response)
+            self.checkpoint['results'].update(results)
+            self.checkpoint['missing'].extend(asin for asin in batch if asin not in results)
+            self.checkpoint['done'].extend(batch)
+            self._save_checkpoint()
+        return True
+
+    def delta(self) -> Dict[str, Any]:
+        """
+        Upserts with every fetched price and availability. They are not diffed
+        against the catalog file: the served catalog is that file plus earlier
+        deltas, and a value equal to the file's must still override theirs.
+        """
+        upserts = []
+        for asin, result in self.checkpoint['results'].items():
+            if asin not in self.products:
+                continue
+            upsert: Dict[str, Any] = {'asin': asin}
+            if result['price'] is not None:
+                upsert['price'] = result['price']
+            if result['availability'] is not None:
+                upsert['availability'] = result['availability']
+            if len(upsert) > 1:
+                upserts.append(upsert)
+        return {'upserts': upserts, 'deletes': []}
+
+    @property
+    def delta_name(self) -> str:
+        """Named by the run's start time, so a resumed run writes the same delta and deltas sort by age"""
+        return f"{self.checkpoint['started_at']}-price-refresh.json"
+
+    def finish(self) -> None:
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    def _get_items(self, asins: List[str]) -> Dict[str, Any]:
+        payload = {
+            'ItemIds': asins,
+            'ItemIdType': 'ASIN',
+            'Resources': RESOURCES,
+            'PartnerTag': self.partner_tag,
+            'PartnerType': 'Associates',
+            'Marketplace': 'www.amazon.com',
+        }
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            try:
+                return call_operation(self.pool, self.signer, 'GetItems', payload)
+            except (PAAPIError, OSError) as e:
+                if attempt == self.retries or (isinstance(e, PAAPIError) and e.status not in RETRY_STATUSES):
+                    raise
+                delay = self.backoff_seconds * 2 ** attempt
+                attempt += 1
+                logger.warning(f"GetItems attempt {attempt} failed ({str(e)}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _load_checkpoint(self, version: str) -> Dict[str, Any]:
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+            if checkpoint.get('catalog_version') == version:
+                return checkpoint
+            print("Checkpoint belongs to a different catalog version, starting over", file=sys.stderr)
+        return {
+            'catalog_version': version,
+            'started_at': time.strftime('%Y%m%dT%H%M%SZ', time.gmtime()),
+            'done': [],
+            'missing': [],
+            'results': {},
+        }
+
+    def _save_checkpoint(self) -> None:
+        # Write-then-rename, so a crash mid-write leaves the previous checkpoint intact
+        temp_path = self.checkpoint_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.checkpoint, f)
+        os.replace(temp_path, self.checkpoint_path)
+
+def write_delta(location: str, name: str, delta: Dict[str, Any]) -> str:
+    """Write a delta file into a directory or under an s3://bucket/prefix location"""
+    data = json.dumps(delta, indent=2).encode('utf-8')
+    if location.startswith('s3://'):
+        import boto3
+        bucket, _, prefix = location[len('s3://'):].partition('/')
+        key = f"{prefix.rstrip('/')}/{name}" if prefix else name
+        boto3.client('s3', endpoint_url=os.environ.get('CATALOG_DELTA_ENDPOINT')).put_object(
+            Bucket=bucket, Key=key, Body=data, ContentType='application/json')
+        return f"s3://{bucket}/{key}"
+    os.makedirs(location, exist_ok=True)
+    # Written under a name warm Lambdas ignore, then renamed, so a poll never sees half a delta
+    path = os.path.join(location, name)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(path + '.tmp', path)
+    return path
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Refresh catalog prices from PA-API GetItems into a catalog delta")
+    parser.add_argument('--catalog', default=DEFAULT_CATALOG, help="products JSON/JSONL to refresh (default: products-simple.json)")
+    parser.add_argument('--deltas', default=os.environ.get('CATALOG_DELTA_LOCATION', 'catalog-deltas'),
+                        help="delta directory or s3://bucket/prefix (default: CATALOG_DELTA_LOCATION or catalog-deltas)")
+    parser.add_argument('--checkpoint', help=f"checkpoint file (default: {CHECKPOINT_NAME} next to the catalog)")
+    parser.add_argument('--endpoint', default=AMAZON_API_ENDPOINT, help="PA-API endpoint (default: AMAZON_API_ENDPOINT)")
+    parser.add_argument('--rate', type=float, default=1.0, help="GetItems requests per second (default: 1)")
+    parser.add_argument('--retries', type=int, default=3, help="retries per batch on throttling and server errors")
+    args = parser.parse_args(argv)
+
+    access_key, secret_key = os.environ.get('AMAZON_ACCESS_KEY'), os.environ.get('AMAZON_SECRET_KEY')
+    if not access_key or not secret_key:
+        print("AMAZON_ACCESS_KEY and AMAZON_SECRET_KEY must be set", file=sys.stderr)
+        return 2
+
+    checkpoint = args.checkpoint or os.path.join(os.path.dirname(os.path.abspath(args.catalog)), CHECKPOINT_NAME)
+    refresh = PriceRefresh(
+        args.catalog,
+        ConnectionPool(args.endpoint),
+        SigV4Signer(access_key, secret_key, 'us-east-1', 'ProductAdvertisingAPI'),
+        TokenBucket(args.rate),
+        os.environ.get('AMAZON_PARTNER_TAG', 'aipro00-20'),
+        checkpoint,
+        retries=args.retries,
+    )
+    if not refresh.run():
+        print(f"Refresh incomplete; progress saved to {checkpoint}, run again to resume", file=sys.stderr)
+        return 1
+
+    delta = refresh.delta()
+    missing = len(refresh.checkpoint['missing'])
+    if delta['upserts']:
+        where = write_delta(args.deltas, refresh.delta_name, delta)
+        print(f"Refreshed {len(refresh.products)} products ({missing} not returned by PA-API): "
+              f"{len(delta['upserts'])} updated, delta written to {where}")
+    else:
+        print(f"Refreshed {len(refresh.products)} products ({missing} not returned by PA-API): no prices or availability")
+    refresh.finish()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
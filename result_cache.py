@@ -0,0 +1,98 @@
+# result_cache.py
+# Bounded LRU cache with TTL expiry for search results
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Any, Hashable, Tuple
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+SEARCH_CACHE_SIZE = int(os.environ.get('SEARCH_CACHE_SIZE', '512'))
+SEARCH_CACHE_TTL_SECONDS = float(os.environ.get('SEARCH_CACHE_TTL_SECONDS', '300'))
+
+def search_cache_key(query: str, max_price: Optional[float] = None, category: Optional[str] = None) -> Tuple[str, Optional[float], Optional[str]]:
+    """
+    Normalize a search request so "Coffee  Maker" and "coffee maker" share an
+    entry. Category filters are case-sensitive, so the category is kept as-is.
+    """
+    return (
+        ' '.join((query or '').lower().split()),
+        float(max_price) if max_price else None,
+        category or None,
+    )
+
+class ResultCache:
+    """
+    LRU cache of search results with a per-entry TTL. Entries belong to a
+    catalog version; a get/put with a different version drops everything,
+    so results never outlive the snapshot they were ranked against.
+    """
+
+    def __init__(self, max_entries: int = SEARCH_CACHE_SIZE, ttl_seconds: float = SEARCH_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version: Optional[str] = None
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, version: Optional[str] = None) -> Optional[Any]:
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, version: Optional[str] = None) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for tuning size and TTL"""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
+
+    def _check_version(self, version: Optional[str]) -> None:
+        if version is not None and version != self.version:
+            if self._entries:
+                self.invalidations += 1
+                logger.info(f"Catalog version changed, dropping {len(self._entries)} cached results")
+                self._entries.clear()
+            self.version = version
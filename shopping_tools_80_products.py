@@ -1,1458 +1,63 @@
 # shopping_tools_80_products.py
-# 80 Premium Products with Categories and Best-Seller Badges
+# Premium products with categories and best-seller badges, loaded from the compiled catalog
 
 import os
+import math
 import json
 import logging
 from typing import Dict, List, Optional, Any
+from catalog_index import FIELD_NAME, FIELD_DESCRIPTION, FIELD_SUBCATEGORY, split_price_cap
+from catalog_snapshot import SnapshotCache
+from catalog_ranking import FieldWeightRanker, materialize, top_products
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 AMAZON_PARTNER_TAG = os.environ.get('AMAZON_PARTNER_TAG', 'aipro00-20')
 
+# Same compiled catalog as shopping_tools (built from catalog/ by extract_products.py); the .catalog.map
+# next to it is used only when it was compiled from this JSON
+_CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'products-simple.json')
+_catalog = SnapshotCache(path=_CATALOG_FILE)
+
 def get_all_products() -> List[Dict[str, Any]]:
     """
-    Returns 80 real Amazon best-sellers with categories and badges.
+    Returns real Amazon best-sellers with categories and badges.
     Organized by category for easy browsing.
     """
-    
-    products = [
-        # ========== ELECTRONICS - HEADPHONES (10 products) ==========
-        {
-            "name": "Sony WH-1000XM5 Wireless Premium Noise Canceling Headphones",
-            "price": 398.00,
-            "asin": "B09XS7JWHH",
-            "url": f"https://www.amazon.com/dp/B09XS7JWHH?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61+btxzpfDL._AC_SL1500_.jpg",
-            "rating": 4.5,
-            "reviews": 8543,
-            "description": "Industry-leading noise canceling, 30-hour battery, premium sound quality",
-            "category": "electronics",
-            "subcategory": "headphones",
-            "badge": "Best Seller"
-        },
-        {
-            "name": "Apple AirPods Pro (2nd Generation) with MagSafe Case",
-            "price": 249.00,
-            "asin": "B0CHWRXH8B",
-            "url": f"https://www.amazon.com/dp/B0CHWRXH8B?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61SUj2aKoEL._AC_SL1500_.jpg",
-            "rating": 4.6,
-            "reviews": 45782,
-            "description": "Active Noise Cancellation, Spatial Audio, MagSafe charging",
-            "category": "electronics",
-            "subcategory": "headphones",
-            "badge": "Amazon's Choice"
-        },
-        {
-            "name": "Bose QuietComfort Ultra Wireless Headphones",
-            "price": 429.00,
-            "asin": "B0CCZ26B5V",
-            "url": f"https://www.amazon.com/dp/B0CCZ26B5V?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/51QeS0jCLEL._AC_SL1500_.jpg",
-            "rating": 4.3,
-            "reviews": 3421,
-            "description": "CustomTune technology, spatial audio, 24-hour battery life",
-            "category": "electronics",
-            "subcategory": "headphones",
-            "badge": "Premium Pick"
-        },
-        {
-            "name": "Anker Soundcore Life Q30 Hybrid Active Noise Cancelling",
-            "price": 79.99,
-            "asin": "B08HMWZBXC",
-            "url": f"https://www.amazon.com/dp/B08HMWZBXC?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61g7J3v9XML._AC_SL1500_.jpg",
-            "rating": 4.5,
-            "reviews": 89234,
-            "description": "Hi-Res Audio, 40H playtime, memory foam ear cups",
-            "category": "electronics",
-            "subcategory": "headphones",
-            "badge": "Best Value"
-        },
-        {
-            "name": "JBL Tune 510BT Wireless On-Ear Headphones",
-            "price": 39.95,
-            "asin": "B08WM3LMJM",
-            "url": f"https://www.amazon.com/dp/B08WM3LMJM?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61WJBJT3V8L._AC_SL1500_.jpg",
-            "rating": 4.4,
-            "reviews": 67543,
-            "description": "JBL Pure Bass Sound, 40-hour battery, lightweight and foldable",
-            "category": "electronics",
-            "subcategory": "headphones",
-            "badge": "Budget Pick"
-        },
-        {
-            "name": "Beats Studio Pro Wireless Bluetooth Noise Cancelling Headphones",
-            "price": 349.99,
-            "asin": "B0C8PL6YY9",
-            "url": f"https://www.amazon.com/dp/B0C8PL6YY9?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/51K95DVM2qL._AC_SL1500_.jpg",
-            "rating": 4.4,
-            "reviews": 12456,
-            "description": "Personalized spatial audio, lossless audio via USB-C, 40-hour battery",
-            "category": "electronics",
-            "subcategory": "headphones",
-            "badge": "Trending"
-        },
-        {
-            "name": "Samsung Galaxy Buds2 Pro True Wireless Bluetooth Earbuds",
-            "price": 229.99,
-            "asin": "B0B2SH4CN6",
-            "url": f"https://www.amazon.com/dp/B0B2SH4CN6?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61O2I4zTZgL._AC_SL1500_.jpg",
-            "rating": 4.3,
-            "reviews": 8765,
-            "description": "Intelligent ANC, 360 audio, water resistant, wireless charging",
-            "category": "electronics",
-            "subcategory": "headphones",
-            "badge": "New Arrival"
-        },
-        {
-            "name": "Sennheiser Momentum 4 Wireless Headphones",
-            "price": 379.95,
-            "asin": "B0B94KNZZS",
-            "url": f"https://www.amazon.com/dp/B0B94KNZZS?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61MHzd7I0UL._AC_SL1500_.jpg",
-            "rating": 4.5,
-            "reviews": 5432,
-            "description": "Audiophile sound, 60-hour battery, adaptive noise cancellation",
-            "category": "electronics",
-            "subcategory": "headphones",
-            "badge": "Editor's Choice"
-        },
-        {
-            "name": "Sony WF-1000XM5 Wireless Noise Canceling Earbuds",
-            "price": 299.99,
-            "asin": "B0C33XXS56",
-            "url": f"https://www.amazon.com/dp/B0C33XXS56?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/51EgyubbSfL._AC_SL1500_.jpg",
-            "rating": 4.6,
-            "reviews": 6789,
-            "description": "Best noise canceling earbuds, 8-hour battery, Hi-Res audio",
-            "category": "electronics",
-            "subcategory": "headphones",
-            "badge": "Top Rated"
-        },
-        {
-            "name": "Jabra Elite 85h Wireless Noise-Canceling Headphones",
-            "price": 249.99,
-            "asin": "B07RS2WTYJ",
-            "url": f"https://www.amazon.com/dp/B07RS2WTYJ?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71uoqBP3xzL._AC_SL1500_.jpg",
-            "rating": 4.3,
-            "reviews": 15234,
-            "description": "SmartSound audio, 36-hour battery, voice assistant compatible",
-            "category": "electronics",
-            "subcategory": "headphones",
-            "badge": "Customer Favorite"
-        },
-        
-        # ========== HOME & KITCHEN - APPLIANCES (15 products) ==========
-        {
-            "name": "Ninja Professional Plus BL660 Blender with Auto-iQ",
-            "price": 89.99,
-            "asin": "B071FCKRFG",
-            "url": f"https://www.amazon.com/dp/B071FCKRFG?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/715hdjzAqvL._AC_SL1500_.jpg",
-            "rating": 4.7,
-            "reviews": 42921,
-            "description": "1000W motor, 72oz pitcher, perfect for smoothies and frozen drinks",
-            "category": "home",
-            "subcategory": "kitchen_appliances",
-            "badge": "Best Seller"
-        },
-        {
-            "name": "Ninja AF101 Air Fryer that Crisps, Roasts, Reheats",
-            "price": 99.99,
-            "asin": "B07FDJMC5Q",
-            "url": f"https://www.amazon.com/dp/B07FDJMC5Q?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81+vAdQAtNL._AC_SL1500_.jpg",
-            "rating": 4.6,
-            "reviews": 123456,
-            "description": "4-quart capacity, cooks 25% faster than convection ovens",
-            "category": "home",
-            "subcategory": "kitchen_appliances",
-            "badge": "Amazon's Choice"
-        },
-        {
-            "name": "Instant Pot Duo 7-in-1 Electric Pressure Cooker 6 Quart",
-            "price": 99.95,
-            "asin": "B01NBKTPTS",
-            "url": f"https://www.amazon.com/dp/B01NBKTPTS?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81ckZ+CJF0L._AC_SL1500_.jpg",
-            "rating": 4.7,
-            "reviews": 98765,
-            "description": "Pressure cooker, slow cooker, rice cooker, steamer, sauté pan",
-            "category": "home",
-            "subcategory": "kitchen_appliances",
-            "badge": "Best Seller"
-        },
-        {
-            "name": "Keurig K-Classic Coffee Maker K-Cup Pod Single-Serve",
-            "price": 89.99,
-            "asin": "B07C18P6FL",
-            "url": f"https://www.amazon.com/dp/B07C18P6FL?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61vAxIxz0eL._AC_SL1500_.jpg",
-            "rating": 4.5,
-            "reviews": 78456,
-            "description": "Brews multiple K-Cup pod sizes, 48oz reservoir, auto-off feature",
-            "category": "home",
-            "subcategory": "kitchen_appliances",
-            "badge": "Top Rated"
-        },
-        {
-            "name": "Cuisinart DCC-3200P1 Perfectemp Coffee Maker 14 Cup",
-            "price": 79.95,
-            "asin": "B00MVWGQX0",
-            "url": f"https://www.amazon.com/dp/B00MVWGQX0?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81j-sPz+4CL._AC_SL1500_.jpg",
-            "rating": 4.4,
-            "reviews": 23456,
-            "description": "Brew strength control, self-clean function, gold-tone filter",
-            "category": "home",
-            "subcategory": "kitchen_appliances",
-            "badge": "Customer Favorite"
-        },
-        {
-            "name": "KitchenAid Classic Plus Stand Mixer 4.5 Quart Empire Red",
-            "price": 329.99,
-            "asin": "B00FPSKY4K",
-            "url": f"https://www.amazon.com/dp/B00FPSKY4K?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61fAXa2FEiL._AC_SL1500_.jpg",
-            "rating": 4.8,
-            "reviews": 56789,
-            "description": "10 speeds, 67-point planetary mixing, dough hook and whisk included",
-            "category": "home",
-            "subcategory": "kitchen_appliances",
-            "badge": "Premium Pick"
-        },
-        {
-            "name": "Vitamix E310 Explorian Blender Professional-Grade 48oz Container",
-            "price": 349.95,
-            "asin": "B06Y2KW92Y",
-            "url": f"https://www.amazon.com/dp/B06Y2KW92Y?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61khRbDrgVL._AC_SL1500_.jpg",
-            "rating": 4.6,
-            "reviews": 12345,
-            "description": "Variable speed control, aircraft-grade stainless steel blades",
-            "category": "home",
-            "subcategory": "kitchen_appliances",
-            "badge": "Editor's Choice"
-        },
-        {
-            "name": "Breville BOV845BSS Smart Oven Pro Convection Toaster Oven",
-            "price": 299.95,
-            "asin": "B00XRVGSMY",
-            "url": f"https://www.amazon.com/dp/B00XRVGSMY?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/91pQ0S+rR3L._AC_SL1500_.jpg",
-            "rating": 4.7,
-            "reviews": 8765,
-            "description": "10 cooking functions, element IQ system, large capacity",
-            "category": "home",
-            "subcategory": "kitchen_appliances",
-            "badge": "Top Rated"
-        },
-        {
-            "name": "Hamilton Beach 2-Way Brewer Coffee Maker 12-Cup",
-            "price": 59.99,
-            "asin": "B078J6MZ7M",
-            "url": f"https://www.amazon.com/dp/B078J6MZ7M?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71ydqSvCDkL._AC_SL1500_.jpg",
-            "rating": 4.3,
-            "reviews": 34567,
-            "description": "Single-serve or full pot brewing, programmable timer",
-            "category": "home",
-            "subcategory": "kitchen_appliances",
-            "badge": "Best Value"
-        },
-        {
-            "name": "Instant Pot Duo Crisp 11-in-1 Air Fryer Pressure Cooker Combo",
-            "price": 149.95,
-            "asin": "B08B6XN5PC",
-            "url": f"https://www.amazon.com/dp/B08B6XN5PC?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/816yXF7vrrL._AC_SL1500_.jpg",
-            "rating": 4.6,
-            "reviews": 23456,
-            "description": "Air fryer lid included, pressure cook and air fry in one",
-            "category": "home",
-            "subcategory": "kitchen_appliances",
-            "badge": "Trending"
-        },
-        
-        # ========== VACUUMS & CLEANING (10 products) ==========
-        {
-            "name": "Dyson V15 Detect Cordless Vacuum with Laser Detection",
-            "price": 649.99,
-            "asin": "B09X5VJ8KM",
-            "url": f"https://www.amazon.com/dp/B09X5VJ8KM?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/41VhMfXs2ML._AC_SL1500_.jpg",
-            "rating": 4.4,
-            "reviews": 34567,
-            "description": "Laser reveals invisible dust, powerful suction, LCD screen",
-            "category": "home",
-            "subcategory": "vacuums",
-            "badge": "Premium Pick"
-        },
-        {
-            "name": "Shark Navigator Lift-Away Professional NV356E",
-            "price": 179.99,
-            "asin": "B08BBPPBD2",
-            "url": f"https://www.amazon.com/dp/B08BBPPBD2?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71A-c7g6qkL._AC_SL1500_.jpg",
-            "rating": 4.6,
-            "reviews": 56234,
-            "description": "Lift-Away technology, Anti-Allergen Complete Seal, bagless",
-            "category": "home",
-            "subcategory": "vacuums",
-            "badge": "Best Seller"
-        },
-        {
-            "name": "Roomba j7+ Self-Emptying Robot Vacuum",
-            "price": 799.99,
-            "asin": "B099DRGNV3",
-            "url": f"https://www.amazon.com/dp/B099DRGNV3?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61WUhEv5VgL._AC_SL1500_.jpg",
-            "rating": 4.3,
-            "reviews": 12345,
-            "description": "Identifies and avoids obstacles, empties itself for 60 days",
-            "category": "home",
-            "subcategory": "vacuums",
-            "badge": "Smart Home"
-        },
-        {
-            "name": "BISSELL CleanView Swivel Upright Bagless Vacuum",
-            "price": 79.99,
-            "asin": "B087R9FZNB",
-            "url": f"https://www.amazon.com/dp/B087R9FZNB?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71RfPlwTgML._AC_SL1500_.jpg",
-            "rating": 4.4,
-            "reviews": 78234,
-            "description": "Powerful pet hair pickup, triple action brush roll, swivel steering",
-            "category": "home",
-            "subcategory": "vacuums",
-            "badge": "Best Value"
-        },
-        {
-            "name": "Shark Cordless Stick Vacuum IZ862H Stratos Vertex",
-            "price": 199.99,
-            "asin": "B094N7DZRK",
-            "url": f"https://www.amazon.com/dp/B094N7DZRK?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71+1j0aWNhL._AC_SL1500_.jpg",
-            "rating": 4.5,
-            "reviews": 23456,
-            "description": "Clean Sense IQ, removable battery, converts to handheld",
-            "category": "home",
-            "subcategory": "vacuums",
-            "badge": "Amazon's Choice"
-        },
-        {
-            "name": "eufy BoostIQ RoboVac 11S Robot Vacuum Cleaner",
-            "price": 229.99,
-            "asin": "B079QYYGF1",
-            "url": f"https://www.amazon.com/dp/B079QYYGF1?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71dFNHTbGjL._AC_SL1500_.jpg",
-            "rating": 4.4,
-            "reviews": 67890,
-            "description": "Super-thin, quiet operation, 1300Pa suction, self-charging",
-            "category": "home",
-            "subcategory": "vacuums",
-            "badge": "Budget Pick"
-        },
-        {
-            "name": "Tineco Pure ONE S11 Smart Cordless Stick Vacuum",
-            "price": 299.99,
-            "asin": "B087B5C8DR",
-            "url": f"https://www.amazon.com/dp/B087B5C8DR?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61Vf6TqGZ1L._AC_SL1500_.jpg",
-            "rating": 4.3,
-            "reviews": 8765,
-            "description": "iLoop smart sensor, LED display, 40min runtime",
-            "category": "home",
-            "subcategory": "vacuums",
-            "badge": "Trending"
-        },
-        {
-            "name": "BLACK+DECKER Handheld Vacuum Cordless 16V",
-            "price": 44.99,
-            "asin": "B006LXOJC0",
-            "url": f"https://www.amazon.com/dp/B006LXOJC0?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71VD5zFhRlL._AC_SL1500_.jpg",
-            "rating": 4.2,
-            "reviews": 45678,
-            "description": "Portable, cyclonic action, washable filter, crevice tool",
-            "category": "home",
-            "subcategory": "vacuums",
-            "badge": "Top Rated"
-        },
-        {
-            "name": "Hoover WindTunnel 3 Max Performance Upright Vacuum",
-            "price": 149.99,
-            "asin": "B00CKGFXR4",
-            "url": f"https://www.amazon.com/dp/B00CKGFXR4?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71LS+uGGqjL._AC_SL1500_.jpg",
-            "rating": 4.5,
-            "reviews": 34567,
-            "description": "WindTunnel technology, HEPA filter, extra-large capacity",
-            "category": "home",
-            "subcategory": "vacuums",
-            "badge": "Customer Favorite"
-        },
-        {
-            "name": "Miele Complete C3 Marin Canister Vacuum",
-            "price": 999.00,
-            "asin": "B07CNTQGH5",
-            "url": f"https://www.amazon.com/dp/B07CNTQGH5?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61T43cpGdVL._AC_SL1250_.jpg",
-            "rating": 4.7,
-            "reviews": 5432,
-            "description": "Premium German engineering, 1200W motor, HEPA filtration",
-            "category": "home",
-            "subcategory": "vacuums",
-            "badge": "Luxury Choice"
-        },
-        
-        # ========== SMART HOME DEVICES (10 products) ==========
-        {
-            "name": "Amazon Echo Dot (5th Gen) Smart Speaker with Alexa",
-            "price": 49.99,
-            "asin": "B09B8V1LZ3",
-            "url": f"https://www.amazon.com/dp/B09B8V1LZ3?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/714Rq4k05UL._AC_SL1000_.jpg",
-            "rating": 4.6,
-            "reviews": 234567,
-            "description": "Voice control smart home, crisp audio, Alexa built-in",
-            "category": "electronics",
-            "subcategory": "smart_home",
-            "badge": "Best Seller"
-        },
-        {
-            "name": "Amazon Echo Show 8 (3rd Gen) Smart Display",
-            "price": 149.99,
-            "asin": "B0BLS3Y632",
-            "url": f"https://www.amazon.com/dp/B0BLS3Y632?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/51FxfO8EuDL._AC_SL1000_.jpg",
-            "rating": 4.5,
-            "reviews": 56789,
-            "description": "8-inch HD display, 13MP camera, spatial audio, smart home hub",
-            "category": "electronics",
-            "subcategory": "smart_home",
-            "badge": "Amazon's Choice"
-        },
-        {
-            "name": "Ring Video Doorbell Pro 2 with 3D Motion Detection",
-            "price": 249.99,
-            "asin": "B08GD6W9W9",
-            "url": f"https://www.amazon.com/dp/B08GD6W9W9?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61Z8YpK7iZL._AC_SL1000_.jpg",
-            "rating": 4.3,
-            "reviews": 34567,
-            "description": "1536p HD video, two-way talk, advanced motion detection",
-            "category": "electronics",
-            "subcategory": "smart_home",
-            "badge": "Premium Pick"
-        },
-        {
-            "name": "Google Nest Thermostat Smart Programmable",
-            "price": 129.99,
-            "asin": "B08HRXQW9Z",
-            "url": f"https://www.amazon.com/dp/B08HRXQW9Z?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/51Wq1i3gRNL._AC_SL1500_.jpg",
-            "rating": 4.4,
-            "reviews": 23456,
-            "description": "Energy savings, remote control, programmable schedule",
-            "category": "electronics",
-            "subcategory": "smart_home",
-            "badge": "Energy Saver"
-        },
-        {
-            "name": "Philips Hue White and Color Ambiance Smart Bulb Starter Kit",
-            "price": 199.99,
-            "asin": "B07QV9XB87",
-            "url": f"https://www.amazon.com/dp/B07QV9XB87?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61AUr4SxPYL._AC_SL1500_.jpg",
-            "rating": 4.6,
-            "reviews": 67890,
-            "description": "16 million colors, voice control, works with Alexa",
-            "category": "electronics",
-            "subcategory": "smart_home",
-            "badge": "Top Rated"
-        },
-        {
-            "name": "TP-Link Kasa Smart WiFi Light Switch 3-Way Kit",
-            "price": 49.99,
-            "asin": "B07YXJN1BB",
-            "url": f"https://www.amazon.com/dp/B07YXJN1BB?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/51vrDK9XdVL._AC_SL1000_.jpg",
-            "rating": 4.5,
-            "reviews": 45678,
-            "description": "Voice control, schedule timer, no hub required",
-            "category": "electronics",
-            "subcategory": "smart_home",
-            "badge": "Best Value"
-        },
-        {
-            "name": "Wyze Cam v3 with Color Night Vision HD Indoor/Outdoor",
-            "price": 35.98,
-            "asin": "B08R59YH7W",
-            "url": f"https://www.amazon.com/dp/B08R59YH7W?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61yoYbil17L._AC_SL1500_.jpg",
-            "rating": 4.5,
-            "reviews": 89012,
-            "description": "1080p HD, color night vision, two-way audio, weatherproof",
-            "category": "electronics",
-            "subcategory": "smart_home",
-            "badge": "Budget Pick"
-        },
-        {
-            "name": "ecobee SmartThermostat with Voice Control",
-            "price": 249.99,
-            "asin": "B09XXS8Q8Q",
-            "url": f"https://www.amazon.com/dp/B09XXS8Q8Q?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/41xWFqz4SOL._AC_SL1000_.jpg",
-            "rating": 4.5,
-            "reviews": 12345,
-            "description": "Built-in Alexa, remote sensor, energy reports",
-            "category": "electronics",
-            "subcategory": "smart_home",
-            "badge": "Editor's Choice"
-        },
-        {
-            "name": "August Wi-Fi Smart Lock 4th Generation",
-            "price": 229.99,
-            "asin": "B0B2P8ZKR8",
-            "url": f"https://www.amazon.com/dp/B0B2P8ZKR8?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/41PrB4nScrL._AC_SL1000_.jpg",
-            "rating": 4.2,
-            "reviews": 8765,
-            "description": "Keyless entry, auto-lock, voice control, activity tracking",
-            "category": "electronics",
-            "subcategory": "smart_home",
-            "badge": "Trending"
-        },
-        {
-            "name": "Fire TV Stick 4K Max streaming device",
-            "price": 54.99,
-            "asin": "B08MQZXN1X",
-            "url": f"https://www.amazon.com/dp/B08MQZXN1X?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/51TjJOTfslL._AC_SL1000_.jpg",
-            "rating": 4.7,
-            "reviews": 123456,
-            "description": "4K streaming, Wi-Fi 6, Alexa Voice Remote, Dolby Vision",
-            "category": "electronics",
-            "subcategory": "smart_home",
-            "badge": "Best Seller"
-        },
-        
-        # ========== FITNESS & SPORTS (10 products) ==========
-        {
-            "name": "Fitbit Charge 6 Fitness Tracker with Heart Rate and GPS",
-            "price": 149.95,
-            "asin": "B0CGJ5P5HN",
-            "url": f"https://www.amazon.com/dp/B0CGJ5P5HN?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/618Bv5LxbUL._AC_SL1500_.jpg",
-            "rating": 4.3,
-            "reviews": 12345,
-            "description": "Built-in GPS, 40+ exercise modes, 7-day battery, Google apps",
-            "category": "sports",
-            "subcategory": "fitness_trackers",
-            "badge": "Best Seller"
-        },
-        {
-            "name": "Apple Watch Series 9 GPS 45mm Smartwatch",
-            "price": 429.00,
-            "asin": "B0CHX3SZDL",
-            "url": f"https://www.amazon.com/dp/B0CHX3SZDL?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71fVoVHhaaL._AC_SL1500_.jpg",
-            "rating": 4.7,
-            "reviews": 45678,
-            "description": "Always-On Retina display, fitness tracking, heart health, ECG",
-            "category": "sports",
-            "subcategory": "fitness_trackers",
-            "badge": "Premium Pick"
-        },
-        {
-            "name": "BalanceFrom GoYoga All-Purpose 1/2-Inch Extra Thick Mat",
-            "price": 29.99,
-            "asin": "B09PKPGCPC",
-            "url": f"https://www.amazon.com/dp/B09PKPGCPC?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81bWswvC-gL._AC_SL1500_.jpg",
-            "rating": 4.6,
-            "reviews": 78901,
-            "description": "Non-slip surface, waterproof, carry strap, 72x24 inches",
-            "category": "sports",
-            "subcategory": "fitness",
-            "badge": "Amazon's Choice"
-        },
-        {
-            "name": "Bowflex SelectTech 552 Adjustable Dumbbells Pair",
-            "price": 399.00,
-            "asin": "B001ARYU58",
-            "url": f"https://www.amazon.com/dp/B001ARYU58?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71AJtqiOLbL._AC_SL1500_.jpg",
-            "rating": 4.7,
-            "reviews": 23456,
-            "description": "Adjusts from 5 to 52.5 lbs, space-saving, 15 weight settings",
-            "category": "sports",
-            "subcategory": "fitness",
-            "badge": "Top Rated"
-        },
-        {
-            "name": "Hydro Flask Standard Mouth Water Bottle 32 Fl Oz",
-            "price": 37.95,
-            "asin": "B07H9Y1B3Y",
-            "url": f"https://www.amazon.com/dp/B07H9Y1B3Y?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81c8YbNKnvL._AC_SL1500_.jpg",
-            "rating": 4.7,
-            "reviews": 45678,
-            "description": "TempShield insulation, keeps cold 24h, hot 12h, BPA-free",
-            "category": "sports",
-            "subcategory": "fitness",
-            "badge": "Customer Favorite"
-        },
-        {
-            "name": "TRX Training ALL-IN-ONE Suspension Training System",
-            "price": 169.95,
-            "asin": "B07GWZQB92",
-            "url": f"https://www.amazon.com/dp/B07GWZQB92?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81fX-PGJfJL._AC_SL1500_.jpg",
-            "rating": 4.6,
-            "reviews": 12345,
-            "description": "Full body workouts, door anchor, workout guide included",
-            "category": "sports",
-            "subcategory": "fitness",
-            "badge": "Editor's Choice"
-        },
-        {
-            "name": "NordicTrack Commercial 1750 Treadmill",
-            "price": 1999.00,
-            "asin": "B09TQJHW9Y",
-            "url": f"https://www.amazon.com/dp/B09TQJHW9Y?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71NYuSm4z0L._AC_SL1500_.jpg",
-            "rating": 4.4,
-            "reviews": 6789,
-            "description": "14-inch HD touchscreen, iFit compatible, 12% incline/-3% decline",
-            "category": "sports",
-            "subcategory": "fitness",
-            "badge": "Premium Pick"
-        },
-        {
-            "name": "Resistance Bands Set 11-Piece Exercise Bands",
-            "price": 29.99,
-            "asin": "B07XYDBLFY",
-            "url": f"https://www.amazon.com/dp/B07XYDBLFY?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81WZxZuXL1L._AC_SL1500_.jpg",
-            "rating": 4.5,
-            "reviews": 67890,
-            "description": "5 resistance levels, door anchor, handles, ankle straps",
-            "category": "sports",
-            "subcategory": "fitness",
-            "badge": "Best Value"
-        },
-        {
-            "name": "Garmin Forerunner 255 GPS Running Smartwatch",
-            "price": 349.99,
-            "asin": "B0B1DLF9PH",
-            "url": f"https://www.amazon.com/dp/B0B1DLF9PH?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71aJN9RBVSL._AC_SL1500_.jpg",
-            "rating": 4.6,
-            "reviews": 8765,
-            "description": "Advanced GPS, training metrics, 14-day battery, recovery time",
-            "category": "sports",
-            "subcategory": "fitness_trackers",
-            "badge": "Runner's Choice"
-        },
-        {
-            "name": "Peloton Bike+ Indoor Exercise Bike with Auto-Follow",
-            "price": 2495.00,
-            "asin": "B08LV81GNZ",
-            "url": f"https://www.amazon.com/dp/B08LV81GNZ?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61Q9zBiJ-NL._AC_SL1500_.jpg",
-            "rating": 4.8,
-            "reviews": 12345,
-            "description": "Rotating 23.8-inch HD touchscreen, automatic resistance, immersive classes",
-            "category": "sports",
-            "subcategory": "fitness",
-            "badge": "Luxury Choice"
-        },
-        
-        # ========== BEAUTY & PERSONAL CARE (10 products - 10% commission!) ==========
-        {
-            "name": "Olaplex No.3 Hair Perfector Repairing Treatment",
-            "price": 30.00,
-            "asin": "B00TSSNS30",
-            "url": f"https://www.amazon.com/dp/B00TSSNS30?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/7159HdluZvL._AC_SL1500_.jpg",
-            "rating": 4.5,
-            "reviews": 34567,
-            "description": "Bond-building treatment for damaged hair, salon-quality results",
-            "category": "beauty",
-            "subcategory": "haircare",
-            "badge": "Best Seller"
-        },
-        {
-            "name": "Revlon One-Step Hair Dryer and Volumizer Hot Air Brush",
-            "price": 59.99,
-            "asin": "B01LSUQSB0",
-            "url": f"https://www.amazon.com/dp/B01LSUQSB0?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61Kz5IixwvL._AC_SL1500_.jpg",
-            "rating": 4.5,
-            "reviews": 123456,
-            "description": "Dries and volumizes in one step, oval brush design",
-            "category": "beauty",
-            "subcategory": "hair_tools",
-            "badge": "Amazon's Choice"
-        },
-        {
-            "name": "Oral-B iO Series 9 Electric Toothbrush with iOSense",
-            "price": 299.99,
-            "asin": "B085R8J6RK",
-            "url": f"https://www.amazon.com/dp/B085R8J6RK?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61wq9cPqaJL._AC_SL1500_.jpg",
-            "rating": 4.6,
-            "reviews": 8765,
-            "description": "AI recognition, pressure sensor, 7 modes, premium travel case",
-            "category": "beauty",
-            "subcategory": "personal_care",
-            "badge": "Premium Pick"
-        },
-        {
-            "name": "CeraVe Moisturizing Cream for Face and Body 19 Ounce",
-            "price": 18.79,
-            "asin": "B00TTD9BRC",
-            "url": f"https://www.amazon.com/dp/B00TTD9BRC?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71j7I-rOYJL._AC_SL1500_.jpg",
-            "rating": 4.7,
-            "reviews": 98765,
-            "description": "Hyaluronic acid, ceramides, fragrance-free, dermatologist recommended",
-            "category": "beauty",
-            "subcategory": "skincare",
-            "badge": "Dermatologist Recommended"
-        },
-        {
-            "name": "Dyson Airwrap Multi-Styler Complete Long",
-            "price": 599.99,
-            "asin": "B0BHYT38B9",
-            "url": f"https://www.amazon.com/dp/B0BHYT38B9?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61nLWXXk+gL._AC_SL1500_.jpg",
-            "rating": 4.4,
-            "reviews": 5432,
-            "description": "Styles without extreme heat, multiple attachments, salon-quality",
-            "category": "beauty",
-            "subcategory": "hair_tools",
-            "badge": "Luxury Choice"
-        },
-        {
-            "name": "Philips Norelco Multigroom Series 7000 Trimmer 23 Pieces",
-            "price": 59.96,
-            "asin": "B083WN3DWQ",
-            "url": f"https://www.amazon.com/dp/B083WN3DWQ?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71sC0MhqvQL._AC_SL1500_.jpg",
-            "rating": 4.6,
-            "reviews": 45678,
-            "description": "23 pieces for all grooming needs, 5-hour runtime, waterproof",
-            "category": "beauty",
-            "subcategory": "personal_care",
-            "badge": "Best Value"
-        },
-        {
-            "name": "The Ordinary AHA 30% + BHA 2% Peeling Solution",
-            "price": 8.70,
-            "asin": "B01M4MCUAF",
-            "url": f"https://www.amazon.com/dp/B01M4MCUAF?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/51nMX+y+4IL._AC_SL1500_.jpg",
-            "rating": 4.5,
-            "reviews": 67890,
-            "description": "Exfoliating facial, improves texture, cruelty-free, vegan",
-            "category": "beauty",
-            "subcategory": "skincare",
-            "badge": "Cult Favorite"
-        },
-        {
-            "name": "Waterpik Aquarius Water Flosser Professional",
-            "price": 69.99,
-            "asin": "B000GLRREU",
-            "url": f"https://www.amazon.com/dp/B000GLRREU?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71wW7uNE8kL._AC_SL1500_.jpg",
-            "rating": 4.5,
-            "reviews": 89012,
-            "description": "10 pressure settings, 7 tips, ADA accepted, clinically proven",
-            "category": "beauty",
-            "subcategory": "personal_care",
-            "badge": "Top Rated"
-        },
-        {
-            "name": "Neutrogena Makeup Remover Cleansing Face Wipes 25 Count",
-            "price": 8.97,
-            "asin": "B005ISG77S",
-            "url": f"https://www.amazon.com/dp/B005ISG77S?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81gIVnE+8sL._AC_SL1500_.jpg",
-            "rating": 4.7,
-            "reviews": 134567,
-            "description": "Ultra-soft, removes waterproof mascara, no rinsing needed",
-            "category": "beauty",
-            "subcategory": "skincare",
-            "badge": "Best Seller"
-        },
-        {
-            "name": "Braun Silk-epil 9 9-985 Epilator for Women",
-            "price": 129.94,
-            "asin": "B07DRCDTYG",
-            "url": f"https://www.amazon.com/dp/B07DRCDTYG?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71PJ7SWnPRL._AC_SL1500_.jpg",
-            "rating": 4.3,
-            "reviews": 12345,
-            "description": "MicroGrip technology, 12 extras, wet/dry, cordless",
-            "category": "beauty",
-            "subcategory": "personal_care",
-            "badge": "Editor's Choice"
-        },
-        
-        # ========== FASHION & LUGGAGE (10 products) ==========
-        {
-            "name": "Samsonite Winfield 3 DLX Hardside Luggage 28 Inch Navy",
-            "price": 299.99,
-            "asin": "B08JC7TZWF",
-            "url": f"https://www.amazon.com/dp/B08JC7TZWF?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71v-gDxN74L._AC_SL1500_.jpg",
-            "rating": 4.6,
-            "reviews": 12345,
-            "description": "Hardside spinner, TSA lock, 360-degree wheels, 10-year warranty",
-            "category": "fashion",
-            "subcategory": "luggage",
-            "badge": "Best Seller"
-        },
-        {
-            "name": "SwissGear 1900 ScanSmart TSA Laptop Backpack Black",
-            "price": 69.99,
-            "asin": "B07G9ZQMNL",
-            "url": f"https://www.amazon.com/dp/B07G9ZQMNL?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81VZ5ZC5UHL._AC_SL1500_.jpg",
-            "rating": 4.7,
-            "reviews": 45678,
-            "description": "TSA-compliant laptop compartment, air mesh back, multi-organization",
-            "category": "fashion",
-            "subcategory": "luggage",
-            "badge": "Amazon's Choice"
-        },
-        {
-            "name": "Ray-Ban Aviator Large Metal Sunglasses",
-            "price": 153.00,
-            "asin": "B001GNBJNW",
-            "url": f"https://www.amazon.com/dp/B001GNBJNW?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61FIaWqfqwL._AC_SL1500_.jpg",
-            "rating": 4.5,
-            "reviews": 23456,
-            "description": "100% UV protection, iconic design, crystal lenses",
-            "category": "fashion",
-            "subcategory": "accessories",
-            "badge": "Classic Icon"
-        },
-        {
-            "name": "Levi's Men's 501 Original Fit Jeans",
-            "price": 59.50,
-            "asin": "B0018OMYXI",
-            "url": f"https://www.amazon.com/dp/B0018OMYXI?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71f1zxL6eVL._AC_SL1500_.jpg",
-            "rating": 4.4,
-            "reviews": 67890,
-            "description": "Original fit, button fly, straight leg, classic 5-pocket design",
-            "category": "fashion",
-            "subcategory": "clothing",
-            "badge": "Best Seller"
-        },
-        {
-            "name": "Herschel Supply Co. Little America Laptop Backpack",
-            "price": 100.00,
-            "asin": "B01J1R5FJC",
-            "url": f"https://www.amazon.com/dp/B01J1R5FJC?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81jxjhXvzFL._AC_SL1500_.jpg",
-            "rating": 4.6,
-            "reviews": 34567,
-            "description": "Padded laptop sleeve, magnetic strap closures, contoured straps",
-            "category": "fashion",
-            "subcategory": "luggage",
-            "badge": "Top Rated"
-        },
-        {
-            "name": "Tumi Alpha 3 International Expandable 4 Wheeled Carry-On",
-            "price": 795.00,
-            "asin": "B07KP67ZD3",
-            "url": f"https://www.amazon.com/dp/B07KP67ZD3?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71rRXhOpfnL._AC_SL1500_.jpg",
-            "rating": 4.7,
-            "reviews": 4567,
-            "description": "Ballistic nylon, expansion capability, TSA lock, premium quality",
-            "category": "fashion",
-            "subcategory": "luggage",
-            "badge": "Luxury Choice"
-        },
-        {
-            "name": "Timberland Men's White Ledge Mid Waterproof Hiking Boot",
-            "price": 94.95,
-            "asin": "B000XVF7NO",
-            "url": f"https://www.amazon.com/dp/B000XVF7NO?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81NVItvVALL._AC_SL1500_.jpg",
-            "rating": 4.5,
-            "reviews": 45678,
-            "description": "Waterproof, rubber lug outsole, padded collar, rust-proof hardware",
-            "category": "fashion",
-            "subcategory": "shoes",
-            "badge": "Customer Favorite"
-        },
-        {
-            "name": "Fossil Gen 6 Smartwatch 44mm Stainless Steel",
-            "price": 299.00,
-            "asin": "B09C8W7VB6",
-            "url": f"https://www.amazon.com/dp/B09C8W7VB6?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71TycYX18LL._AC_SL1500_.jpg",
-            "rating": 4.2,
-            "reviews": 8765,
-            "description": "Wear OS, heart rate, GPS, Google Assistant, smartphone notifications",
-            "category": "fashion",
-            "subcategory": "accessories",
-            "badge": "Tech Fashion"
-        },
-        {
-            "name": "Columbia Men's Bora Bora Booney II Sun Hat",
-            "price": 30.00,
-            "asin": "B0058ZPCGG",
-            "url": f"https://www.amazon.com/dp/B0058ZPCGG?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81O5ORGfcUL._AC_SL1500_.jpg",
-            "rating": 4.6,
-            "reviews": 23456,
-            "description": "UPF 50 sun protection, moisture-wicking, adjustable chin strap",
-            "category": "fashion",
-            "subcategory": "accessories",
-            "badge": "Best Value"
-        },
-        {
-            "name": "Kate Spade New York Morgan Satchel Leather Handbag",
-            "price": 329.00,
-            "asin": "B07QYC19MS",
-            "url": f"https://www.amazon.com/dp/B07QYC19MS?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71BbwlDFjxL._AC_SL1500_.jpg",
-            "rating": 4.4,
-            "reviews": 5678,
-            "description": "Genuine leather, zip closure, multiple compartments, elegant design",
-            "category": "fashion",
-            "subcategory": "accessories",
-            "badge": "Premium Pick"
-        },
-        
-        # ========== BOOKS & MEDIA (5 products) ==========
-        {
-            "name": "Atomic Habits: An Easy & Proven Way to Build Good Habits",
-            "price": 16.00,
-            "asin": "B07D23CFGR",
-            "url": f"https://www.amazon.com/dp/B07D23CFGR?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81F90H7hnML._AC_SL1500_.jpg",
-            "rating": 4.8,
-            "reviews": 123456,
-            "description": "#1 New York Times bestseller, transform your life with tiny changes",
-            "category": "books",
-            "subcategory": "self_help",
-            "badge": "Best Seller"
-        },
-        {
-            "name": "The 48 Laws of Power by Robert Greene",
-            "price": 17.99,
-            "asin": "B0024CEZR6",
-            "url": f"https://www.amazon.com/dp/B0024CEZR6?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71aG+xDKSYL._AC_SL1500_.jpg",
-            "rating": 4.7,
-            "reviews": 67890,
-            "description": "International bestseller, 3 million copies sold, timeless wisdom",
-            "category": "books",
-            "subcategory": "business",
-            "badge": "Classic"
-        },
-        {
-            "name": "Kindle Paperwhite (16 GB) 6.8-inch Display Waterproof",
-            "price": 149.99,
-            "asin": "B08KTZ8249",
-            "url": f"https://www.amazon.com/dp/B08KTZ8249?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/51QCk82iGsL._AC_SL1000_.jpg",
-            "rating": 4.6,
-            "reviews": 89012,
-            "description": "Glare-free display, adjustable warm light, 10-week battery",
-            "category": "electronics",
-            "subcategory": "ereaders",
-            "badge": "Best Seller"
-        },
-        {
-            "name": "The Psychology of Money by Morgan Housel",
-            "price": 14.99,
-            "asin": "B084HJSJJ2",
-            "url": f"https://www.amazon.com/dp/B084HJSJJ2?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81cpDaCJJCL._AC_SL1500_.jpg",
-            "rating": 4.7,
-            "reviews": 45678,
-            "description": "Timeless lessons on wealth and happiness, Wall Street Journal bestseller",
-            "category": "books",
-            "subcategory": "finance",
-            "badge": "Top Rated"
-        },
-        {
-            "name": "Rich Dad Poor Dad by Robert T. Kiyosaki",
-            "price": 8.15,
-            "asin": "B07C7M8SX9",
-            "url": f"https://www.amazon.com/dp/B07C7M8SX9?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81BE7eeKzAL._AC_SL1500_.jpg",
-            "rating": 4.7,
-            "reviews": 234567,
-            "description": "What the rich teach their kids about money, #1 personal finance book",
-            "category": "books",
-            "subcategory": "finance",
-            "badge": "Classic"
-        },
-        
-        # ========== TOYS & GAMES (5 products) ==========
-        {
-            "name": "LEGO Star Wars Millennium Falcon Building Kit",
-            "price": 849.99,
-            "asin": "B075SDMGP7",
-            "url": f"https://www.amazon.com/dp/B075SDMGP7?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/91DSjyo+zoL._AC_SL1500_.jpg",
-            "rating": 4.9,
-            "reviews": 12345,
-            "description": "7541 pieces, most detailed Millennium Falcon ever, display model",
-            "category": "toys",
-            "subcategory": "building",
-            "badge": "Collector's Item"
-        },
-        {
-            "name": "Nintendo Switch OLED Model with White Joy-Con",
-            "price": 349.99,
-            "asin": "B098RKWHHZ",
-            "url": f"https://www.amazon.com/dp/B098RKWHHZ?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61-PblYntsL._AC_SL1500_.jpg",
-            "rating": 4.8,
-            "reviews": 67890,
-            "description": "7-inch OLED screen, enhanced audio, 64GB internal storage",
-            "category": "electronics",
-            "subcategory": "gaming",
-            "badge": "Best Seller"
-        },
-        {
-            "name": "PlayStation 5 Console",
-            "price": 499.99,
-            "asin": "B0CL5KNB9M",
-            "url": f"https://www.amazon.com/dp/B0CL5KNB9M?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/51JqjGm7caL._AC_SL1230_.jpg",
-            "rating": 4.7,
-            "reviews": 89012,
-            "description": "Ultra-high speed SSD, ray tracing, 4K gaming, DualSense controller",
-            "category": "electronics",
-            "subcategory": "gaming",
-            "badge": "Premium Pick"
-        },
-        {
-            "name": "Monopoly Classic Board Game",
-            "price": 19.82,
-            "asin": "B00CV5PN1W",
-            "url": f"https://www.amazon.com/dp/B00CV5PN1W?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81xvs+C-ooL._AC_SL1500_.jpg",
-            "rating": 4.8,
-            "reviews": 123456,
-            "description": "Fast-dealing property trading game, 2-6 players, ages 8+",
-            "category": "toys",
-            "subcategory": "board_games",
-            "badge": "Classic"
-        },
-        {
-            "name": "Barbie Dreamhouse Dollhouse with Pool Slide Elevator",
-            "price": 199.99,
-            "asin": "B07Q2S42KC",
-            "url": f"https://www.amazon.com/dp/B07Q2S42KC?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/91oYxGfJZoL._AC_SL1500_.jpg",
-            "rating": 4.7,
-            "reviews": 34567,
-            "description": "3 stories, 8 rooms, pool, slide, working elevator, 75+ accessories",
-            "category": "toys",
-            "subcategory": "dolls",
-            "badge": "Best Seller"
-        },
-        
-        # ========== OFFICE & TECH ACCESSORIES (10 products) ==========
-        {
-            "name": "Apple iPad (10th Generation) 10.9-inch Wi-Fi 64GB",
-            "price": 349.00,
-            "asin": "B0BJLXMVMV",
-            "url": f"https://www.amazon.com/dp/B0BJLXMVMV?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61NGnpjoRDL._AC_SL1500_.jpg",
-            "rating": 4.8,
-            "reviews": 23456,
-            "description": "10.9-inch Liquid Retina display, A14 Bionic chip, Touch ID",
-            "category": "electronics",
-            "subcategory": "tablets",
-            "badge": "Best Seller"
-        },
-        {
-            "name": "Logitech MX Master 3S Wireless Performance Mouse",
-            "price": 99.99,
-            "asin": "B09HM94VDS",
-            "url": f"https://www.amazon.com/dp/B09HM94VDS?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61ni3t1ryQL._AC_SL1500_.jpg",
-            "rating": 4.6,
-            "reviews": 12345,
-            "description": "8K DPI sensor, quiet clicks, ergonomic design, multi-device",
-            "category": "electronics",
-            "subcategory": "computer_accessories",
-            "badge": "Editor's Choice"
-        },
-        {
-            "name": "Apple AirTag 4 Pack - Precision Finding with iPhone",
-            "price": 99.00,
-            "asin": "B0933QJXHY",
-            "url": f"https://www.amazon.com/dp/B0933QJXHY?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81LhHLZjRyL._AC_SL1500_.jpg",
-            "rating": 4.5,
-            "reviews": 234567,
-            "description": "One-tap setup, Precision Finding, privacy built in, replaceable battery",
-            "category": "electronics",
-            "subcategory": "accessories",
-            "badge": "Best Seller"
-        },
-        {
-            "name": "Anker PowerCore 20100mAh Portable Charger",
-            "price": 49.99,
-            "asin": "B00X5RV14Y",
-            "url": f"https://www.amazon.com/dp/B00X5RV14Y?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71fKJNtBnjL._AC_SL1500_.jpg",
-            "rating": 4.6,
-            "reviews": 89012,
-            "description": "Ultra high capacity, charges iPhone 8 times, dual USB ports",
-            "category": "electronics",
-            "subcategory": "accessories",
-            "badge": "Amazon's Choice"
-        },
-        {
-            "name": "Samsung T7 Portable SSD 1TB External Solid State Drive",
-            "price": 119.99,
-            "asin": "B0874XN4D8",
-            "url": f"https://www.amazon.com/dp/B0874XN4D8?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81itBYZgCNL._AC_SL1500_.jpg",
-            "rating": 4.8,
-            "reviews": 34567,
-            "description": "Up to 1050MB/s transfer speed, USB-C, password protection",
-            "category": "electronics",
-            "subcategory": "computer_accessories",
-            "badge": "Top Rated"
-        },
-        {
-            "name": "Blue Yeti USB Microphone for Streaming Gaming Podcasting",
-            "price": 99.99,
-            "asin": "B00N1YPXW2",
-            "url": f"https://www.amazon.com/dp/B00N1YPXW2?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61gPCD7+UZL._AC_SL1500_.jpg",
-            "rating": 4.5,
-            "reviews": 123456,
-            "description": "Professional sound quality, 4 pickup patterns, mute button",
-            "category": "electronics",
-            "subcategory": "computer_accessories",
-            "badge": "Streamer's Choice"
-        },
-        {
-            "name": "LG 27-Inch UltraGear QHD Gaming Monitor 165Hz",
-            "price": 299.99,
-            "asin": "B0B7K7W6MJ",
-            "url": f"https://www.amazon.com/dp/B0B7K7W6MJ?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81SbnMZqHsL._AC_SL1500_.jpg",
-            "rating": 4.5,
-            "reviews": 8765,
-            "description": "QHD 2560x1440, 165Hz refresh rate, 1ms response, HDR10",
-            "category": "electronics",
-            "subcategory": "monitors",
-            "badge": "Gamer's Choice"
-        },
-        {
-            "name": "Bose SoundLink Flex Bluetooth Portable Speaker",
-            "price": 149.00,
-            "asin": "B09Q3JG3T2",
-            "url": f"https://www.amazon.com/dp/B09Q3JG3T2?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71ODf0xN2HL._AC_SL1500_.jpg",
-            "rating": 4.7,
-            "reviews": 23456,
-            "description": "Waterproof, dustproof, 12-hour battery, crisp clear audio",
-            "category": "electronics",
-            "subcategory": "speakers",
-            "badge": "Best Seller"
-        },
-        {
-            "name": "Keychron K2 Wireless Mechanical Keyboard RGB Backlight",
-            "price": 84.00,
-            "asin": "B07QBZH7KN",
-            "url": f"https://www.amazon.com/dp/B07QBZH7KN?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71Pyu6MRMLL._AC_SL1500_.jpg",
-            "rating": 4.5,
-            "reviews": 12345,
-            "description": "Compact 75% layout, hot-swappable, Mac/Windows compatible",
-            "category": "electronics",
-            "subcategory": "computer_accessories",
-            "badge": "Mechanical Keyboard Favorite"
-        },
-        {
-            "name": "Lamicall Laptop Stand Ergonomic Aluminum Computer Stand",
-            "price": 29.99,
-            "asin": "B07DWM9WNM",
-            "url": f"https://www.amazon.com/dp/B07DWM9WNM?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71a+xQX+q7L._AC_SL1500_.jpg",
-            "rating": 4.7,
-            "reviews": 45678,
-            "description": "Ergonomic height, heat ventilation, stable, fits 10-17 inch laptops",
-            "category": "office",
-            "subcategory": "desk_accessories",
-            "badge": "Amazon's Choice"
-        },
-        
-        # ========== AUTOMOTIVE (5 products) ==========
-        {
-            "name": "NOCO Boost Plus GB40 1000A UltraSafe Jump Starter",
-            "price": 99.95,
-            "asin": "B015TKUPIC",
-            "url": f"https://www.amazon.com/dp/B015TKUPIC?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81utGJ2W0FL._AC_SL1500_.jpg",
-            "rating": 4.6,
-            "reviews": 67890,
-            "description": "Jump starts up to 6.0L gas, safety features, USB charging",
-            "category": "automotive",
-            "subcategory": "tools",
-            "badge": "Best Seller"
-        },
-        {
-            "name": "Garmin DriveSmart 65 GPS Navigator with Alexa 6.95 Display",
-            "price": 249.99,
-            "asin": "B07RXQNVX1",
-            "url": f"https://www.amazon.com/dp/B07RXQNVX1?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71eKfQSSRpL._AC_SL1500_.jpg",
-            "rating": 4.4,
-            "reviews": 12345,
-            "description": "Built-in Alexa, traffic updates, TripAdvisor ratings",
-            "category": "automotive",
-            "subcategory": "electronics",
-            "badge": "Top Rated"
-        },
-        {
-            "name": "Rain-X Latitude Water Repellency Wiper Blade 22 Inch",
-            "price": 17.97,
-            "asin": "B000BPQPKE",
-            "url": f"https://www.amazon.com/dp/B000BPQPKE?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71p7qgH6Y9L._AC_SL1500_.jpg",
-            "rating": 4.5,
-            "reviews": 45678,
-            "description": "Water beading technology, all-weather performance, easy installation",
-            "category": "automotive",
-            "subcategory": "parts",
-            "badge": "Best Value"
-        },
-        {
-            "name": "Armor All Car Vacuum Cleaner 2.5 Gallon Wet/Dry",
-            "price": 59.99,
-            "asin": "B00JZIGY7U",
-            "url": f"https://www.amazon.com/dp/B00JZIGY7U?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81xv8xfvlnL._AC_SL1500_.jpg",
-            "rating": 4.3,
-            "reviews": 23456,
-            "description": "Wet/dry functionality, 2HP motor, 10-foot power cord, accessories",
-            "category": "automotive",
-            "subcategory": "cleaning",
-            "badge": "Amazon's Choice"
-        },
-        {
-            "name": "Chemical Guys HOL148 16-Piece Arsenal Builder Car Wash Kit",
-            "price": 99.99,
-            "asin": "B01N30WPSA",
-            "url": f"https://www.amazon.com/dp/B01N30WPSA?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/91fmXOb-q8L._AC_SL1500_.jpg",
-            "rating": 4.6,
-            "reviews": 34567,
-            "description": "Complete detailing kit, premium wash soaps, microfiber towels",
-            "category": "automotive",
-            "subcategory": "cleaning",
-            "badge": "Premium Set"
-        },
-        
-        # ========== HOME COMFORT & BEDDING (5 products) ==========
-        {
-            "name": "Dyson Pure Cool TP01 HEPA Air Purifier and Tower Fan",
-            "price": 399.99,
-            "asin": "B01D8DAYII",
-            "url": f"https://www.amazon.com/dp/B01D8DAYII?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/61B7IuI2ybL._AC_SL1500_.jpg",
-            "rating": 4.4,
-            "reviews": 12345,
-            "description": "Removes 99.97% pollutants, oscillates 70 degrees, bladeless fan",
-            "category": "home",
-            "subcategory": "air_quality",
-            "badge": "Best Seller"
-        },
-        {
-            "name": "Beckham Hotel Collection Bed Pillows Queen Size 2 Pack",
-            "price": 49.99,
-            "asin": "B01ICUHNIO",
-            "url": f"https://www.amazon.com/dp/B01ICUHNIO?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81AvSZRErTL._AC_SL1500_.jpg",
-            "rating": 4.4,
-            "reviews": 234567,
-            "description": "Luxury plush gel pillow, fade-resistant, machine washable",
-            "category": "home",
-            "subcategory": "bedding",
-            "badge": "Amazon's Choice"
-        },
-        {
-            "name": "Utopia Bedding Queen Sheet Set 4 Piece Grey",
-            "price": 26.99,
-            "asin": "B079GJJZ59",
-            "url": f"https://www.amazon.com/dp/B079GJJZ59?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81PiSSRF9rL._AC_SL1500_.jpg",
-            "rating": 4.4,
-            "reviews": 123456,
-            "description": "Soft brushed microfiber, deep pockets, wrinkle/fade resistant",
-            "category": "home",
-            "subcategory": "bedding",
-            "badge": "Best Value"
-        },
-        {
-            "name": "Levoit Core 300 True HEPA Air Purifier for Home",
-            "price": 99.99,
-            "asin": "B07VVK39F7",
-            "url": f"https://www.amazon.com/dp/B07VVK39F7?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/71nDIqZzl+L._AC_SL1500_.jpg",
-            "rating": 4.6,
-            "reviews": 89012,
-            "description": "Removes 99.97% allergens, quiet 24dB, covers 219 sq ft",
-            "category": "home",
-            "subcategory": "air_quality",
-            "badge": "Top Rated"
-        },
-        {
-            "name": "Weighted Blanket 15 lbs Queen Size 60x80 Grey",
-            "price": 59.99,
-            "asin": "B07HHMWV6V",
-            "url": f"https://www.amazon.com/dp/B07HHMWV6V?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/91mxVs0smfL._AC_SL1500_.jpg",
-            "rating": 4.5,
-            "reviews": 67890,
-            "description": "Premium glass beads, cooling cotton, 7-layer design, sleep better",
-            "category": "home",
-            "subcategory": "bedding",
-            "badge": "Sleep Better"
-        },
-        
-        # ========== GARDEN & OUTDOOR (5 products) ==========
-        {
-            "name": "Keter Urban Bloomer Raised Garden Bed Planter 37 Gallon",
-            "price": 99.95,
-            "asin": "B00YL3D9HO",
-            "url": f"https://www.amazon.com/dp/B00YL3D9HO?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81b5YSa8mZL._AC_SL1500_.jpg",
-            "rating": 4.5,
-            "reviews": 8765,
-            "description": "Self-watering system, 37-gallon capacity, easy assembly, drainage",
-            "category": "garden",
-            "subcategory": "outdoor",
-            "badge": "Best Seller"
-        },
-        {
-            "name": "Sun Joe SPX3000 Pressure Washer 2030 PSI Electric",
-            "price": 169.00,
-            "asin": "B00CPGMUXW",
-            "url": f"https://www.amazon.com/dp/B00CPGMUXW?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81OOlmA9T1L._AC_SL1500_.jpg",
-            "rating": 4.4,
-            "reviews": 34567,
-            "description": "2030 PSI max, dual detergent tanks, 5 quick-connect nozzles",
-            "category": "garden",
-            "subcategory": "tools",
-            "badge": "Amazon's Choice"
-        },
-        {
-            "name": "Coleman Sundome Camping Tent 4-Person Dome Tent",
-            "price": 69.99,
-            "asin": "B004J2GUOU",
-            "url": f"https://www.amazon.com/dp/B004J2GUOU?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/91IUGBSkmwL._AC_SL1500_.jpg",
-            "rating": 4.5,
-            "reviews": 56789,
-            "description": "WeatherTec system, easy setup, ground vent, mesh windows",
-            "category": "garden",
-            "subcategory": "camping",
-            "badge": "Outdoor Essential"
-        },
-        {
-            "name": "Greenworks 40V 16-Inch Cordless Lawn Mower",
-            "price": 299.99,
-            "asin": "B07Q3D13DV",
-            "url": f"https://www.amazon.com/dp/B07Q3D13DV?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81VkMm+N3LL._AC_SL1500_.jpg",
-            "rating": 4.3,
-            "reviews": 12345,
-            "description": "Cordless convenience, 45-minute runtime, easy push-button start",
-            "category": "garden",
-            "subcategory": "tools",
-            "badge": "Top Rated"
-        },
-        {
-            "name": "Miracle-Gro Water Soluble All Purpose Plant Food 1.5 lb",
-            "price": 11.48,
-            "asin": "B00GWK3S8U",
-            "url": f"https://www.amazon.com/dp/B00GWK3S8U?tag={AMAZON_PARTNER_TAG}",
-            "image_url": "https://m.media-amazon.com/images/I/81b+Q0XcEHL._AC_SL1500_.jpg",
-            "rating": 4.6,
-            "reviews": 45678,
-            "description": "Feeds all flowers, vegetables, trees, shrubs, houseplants",
-            "category": "garden",
-            "subcategory": "supplies",
-            "badge": "Gardener's Choice"
-        }
-    ]
-    
-    return products
+    return _catalog.get().products()
+
+def _field_score(mask: int) -> int:
+    """Name match, else description match, else subcategory match"""
+    if mask & FIELD_NAME:
+        return 10
+    if mask & FIELD_DESCRIPTION:
+        return 3
+    if mask & FIELD_SUBCATEGORY:
+        return 5
+    return 0
+
+_ranker = FieldWeightRanker(_field_score)
 
 def search_products(query: str, max_price: Optional[float] = None, category: Optional[str] = None) -> List[Dict[str, Any]]:
     """Smart search with category filtering and keyword matching"""
-    all_products = get_all_products()
-    
-    # Filter by category if specified
-    if category:
-        all_products = [p for p in all_products if p.get('category') == category or p.get('subcategory') == category]
+    snapshot = _catalog.get()
+    if max_price is None:
+        query, max_price = split_price_cap(query)
+    hits = top_products(snapshot, _ranker, query, 5, max_price=max_price, category=category)
+    if hits:
+        return materialize(snapshot.store, hits)
     
-    # Keyword search
-    query_lower = query.lower()
-    query_words = query_lower.split()
+    # Keyword matches that are all over the price cap: no results, not the fallback
+    if max_price and top_products(snapshot, _ranker, query, 1, max_price=math.inf, category=category):
+        return []
     
-    scored_products = []
-    for product in all_products:
-        score = 0
-        name_lower = product['name'].lower()
-        desc_lower = product.get('description', '').lower()
-        
-        for word in query_words:
-            if word in name_lower:
-                score += 10
-            elif word in desc_lower:
-                score += 3
-            elif word == product.get('subcategory', ''):
-                score += 5
-        
-        if score > 0:
-            product['_search_score'] = score
-            scored_products.append(product)
-    
-    if not scored_products:
-        scored_products = all_products[:10]
-    
-    # Filter by price
+    # No keyword match: the best rated of the first 10 products in the category
+    products = [p for p in snapshot.products() if not category or category in (p.get('category'), p.get('subcategory'))][:10]
     if max_price:
-        scored_products = [p for p in scored_products if p['price'] <= max_price]
-    
-    # Sort by score, then rating
-    scored_products.sort(key=lambda x: (x.get('_search_score', 0), x.get('rating', 0)), reverse=True)
-    
-    return scored_products[:5]
+        products = [p for p in products if p['price'] <= max_price]
+    products.sort(key=lambda p: p.get('rating', 0), reverse=True)
+    return products[:5]
 
 def product_search_tool(query: str, max_price: Optional[float] = None, category: Optional[str] = None) -> str:
     """Main product search function"""
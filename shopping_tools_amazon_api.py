@@ -2,14 +2,15 @@
 # Real Amazon Product Advertising API Integration
 
 import os
+import copy
 import json
 import logging
 from typing import Dict, List, Optional, Any
-import hmac
-import hashlib
-import urllib.parse
-from datetime import datetime
-import urllib.request
+from paapi_client import PAAPIUnavailable, call_operation, get_breaker, get_limiter, get_pool
+from sigv4 import SigV4Signer
+from paapi_cache import StaleWhileRevalidateCache, result_store_from_env
+from result_cache import search_cache_key
+from single_flight import SingleFlight
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -19,141 +20,158 @@ AMAZON_ACCESS_KEY = os.environ.get('AMAZON_ACCESS_KEY')
 AMAZON_SECRET_KEY = os.environ.get('AMAZON_SECRET_KEY')
 AMAZON_PARTNER_TAG = os.environ.get('AMAZON_PARTNER_TAG', 'ai-pro-20')
 AMAZON_REGION = 'us-east-1'
-AMAZON_HOST = 'webservices.amazon.com'
-AMAZON_URI = '/paapi5/searchitems'
+AMAZON_SERVICE = 'ProductAdvertisingAPI'
+AMAZON_API_CONFIGURED = bool(AMAZON_ACCESS_KEY and AMAZON_SECRET_KEY)
 
-def create_signature(secret_key: str, string_to_sign: str) -> str:
-    """Create AWS Signature Version 4"""
-    signature = hmac.new(
-        secret_key.encode('utf-8'),
-        string_to_sign.encode('utf-8'),
-        hashlib.sha256
-    ).hexdigest()
-    return signature
+# One signer per container; its derived signing key is reused for the whole UTC day
+_signer = SigV4Signer(AMAZON_ACCESS_KEY, AMAZON_SECRET_KEY, AMAZON_REGION, AMAZON_SERVICE) \
+    if AMAZON_API_CONFIGURED else None
 
-def search_amazon_products_api(query: str, max_price: Optional[float] = None, max_results: int = 5) -> List[Dict[str, Any]]:
+# In-container LRU in front of the shared DynamoDB tier (PAAPI_CACHE_TABLE), kept across warm invocations
+_search_cache = StaleWhileRevalidateCache(store=result_store_from_env())
+
+def get_search_cache_stats() -> Dict[str, Any]:
+    """Hit/miss/refresh counters for the PA-API result cache"""
+    return _search_cache.stats()
+
+def get_api_health_stats() -> Dict[str, Any]:
+    """Adaptive rate limiter and circuit breaker state for PA-API calls"""
+    return {'limiter': get_limiter().stats(), 'breaker': get_breaker().stats()}
+
+# Waiters get their own copy of the products, as a cache hit would
+_search_flight = SingleFlight(clone=copy.deepcopy)
+
+def get_search_flight_stats() -> Dict[str, int]:
+    """Coalescing counters: searches run vs. callers that waited on one in flight"""
+    return _search_flight.stats()
+
+def search_amazon_products_api(query: str, max_price: Optional[float] = None, max_results: int = 5,
+                               category: Optional[str] = None) -> List[Dict[str, Any]]:
     """
-    Search Amazon products using PA-API 5.0
+    Search Amazon products using PA-API 5.0. Results are cached (see
+    paapi_cache); `category` selects the freshness window.
     
     Official Documentation: https://webservices.amazon.com/paapi5/documentation/
     """
     
-    if not AMAZON_ACCESS_KEY or not AMAZON_SECRET_KEY:
+    if not AMAZON_API_CONFIGURED:
         logger.error("Amazon API credentials not configured")
         # Fall back to mock data
         return get_mock_products(query, max_price)
     
     try:
-        # Build the request payload
-        payload = {
-            "Keywords": query,
-            "Resources": [
-                "Images.Primary.Large",
-                "ItemInfo.Title",
-                "ItemInfo.Features",
-                "Offers.Listings.Price",
-                "CustomerReviews.StarRating",
-                "CustomerReviews.Count"
-            ],
-            "PartnerTag": AMAZON_PARTNER_TAG,
-            "PartnerType": "Associates",
-            "Marketplace": "www.amazon.com",
-            "ItemCount": max_results
-        }
+        return search_amazon_products_live(query, max_price, max_results, category)
         
-        # Add price filter if specified
-        if max_price:
-            payload["MaxPrice"] = int(max_price * 100)  # Convert to cents
-        
-        # Prepare headers
-        timestamp = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
-        headers = {
-            'Content-Type': 'application/json; charset=utf-8',
-            'X-Amz-Target': 'com.amazon.paapi5.v1.ProductAdvertisingAPIv1.SearchItems',
-            'X-Amz-Date': timestamp,
-            'Content-Encoding': 'amz-1.0'
-        }
-        
-        # Make the API request
-        url = f'https://{AMAZON_HOST}{AMAZON_URI}'
-        
-        req = urllib.request.Request(
-            url,
-            data=json.dumps(payload).encode('utf-8'),
-            headers=headers,
-            method='POST'
-        )
-        
-        # Add AWS authentication (simplified - in production use boto3 or AWS SDK)
-        # For full authentication, you'd need AWS Signature V4
+    except PAAPIUnavailable as e:
+        logger.info(f"Amazon API skipped: {str(e)}")
+        return get_mock_products(query, max_price)
         
-        with urllib.request.urlopen(req, timeout=10) as response:
-            result = json.loads(response.read().decode('utf-8'))
-            
-            products = []
-            
-            if 'SearchResult' in result and 'Items' in result['SearchResult']:
-                for item in result['SearchResult']['Items']:
-                    try:
-                        # Extract product information
-                        asin = item.get('ASIN', '')
-                        
-                        # Title
-                        title = item.get('ItemInfo', {}).get('Title', {}).get('DisplayValue', 'Unknown Product')
-                        
-                        # Price
-                        price = 0.0
-                        offers = item.get('Offers', {}).get('Listings', [])
-                        if offers and len(offers) > 0:
-                            price_data = offers[0].get('Price', {})
-                            price = price_data.get('Amount', 0.0)
-                        
-                        # Image
-                        image_url = ''
-                        images = item.get('Images', {}).get('Primary', {})
-                        if images:
-                            image_url = images.get('Large', {}).get('URL', '')
-                        
-                        # Rating
-                        rating = 0.0
-                        reviews_count = 0
-                        customer_reviews = item.get('CustomerReviews', {})
-                        if customer_reviews:
-                            rating_str = customer_reviews.get('StarRating', {}).get('Value', '0')
-                            rating = float(rating_str) if rating_str else 0.0
-                            reviews_count = customer_reviews.get('Count', 0)
-                        
-                        # Build affiliate URL
-                        product_url = f"https://www.amazon.com/dp/{asin}?tag={AMAZON_PARTNER_TAG}"
-                        
-                        # Features (description)
-                        features = item.get('ItemInfo', {}).get('Features', {}).get('DisplayValues', [])
-                        description = features[0] if features else ''
-                        
-                        products.append({
-                            'name': title,
-                            'price': price,
-                            'url': product_url,
-                            'image_url': image_url,
-                            'rating': rating,
-                            'reviews': reviews_count,
-                            'description': description,
-                            'asin': asin,
-                            'affiliate_source': 'amazon'
-                        })
-                        
-                    except Exception as e:
-                        logger.error(f"Error parsing product: {str(e)}")
-                        continue
-            
-            logger.info(f"Found {len(products)} products from Amazon API")
-            return products
-            
     except Exception as e:
         logger.error(f"Amazon API error: {str(e)}")
         # Fall back to mock data on error
         return get_mock_products(query, max_price)
 
+def search_amazon_products_live(query: str, max_price: Optional[float] = None, max_results: int = 5,
+                                category: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    search_amazon_products_api without the mock fallback: raises when the
+    API is not configured or the call fails, for callers with their own
+    fallback (see shopping_tools_federated).
+    """
+    if not AMAZON_API_CONFIGURED:
+        raise RuntimeError("Amazon API credentials not configured")
+    # Cached per normalized keywords and price cap; stale results are served while PA-API is re-queried
+    key = search_cache_key(query, max_price)[:2] + (max_results,)
+    # Identical concurrent searches share one lookup (and at most one PA-API call)
+    return _search_flight.do(key + (category,), lambda: _search_cache.get(
+        key, lambda: _search_items(query, max_price, max_results), category))
+
+def _search_items(query: str, max_price: Optional[float], max_results: int) -> List[Dict[str, Any]]:
+    """One signed SearchItems call; raises on transport and API errors"""
+    # Build the request payload
+    payload = {
+        "Keywords": query,
+        "Resources": [
+            "Images.Primary.Large",
+            "ItemInfo.Title",
+            "ItemInfo.Features",
+            "Offers.Listings.Price",
+            "CustomerReviews.StarRating",
+            "CustomerReviews.Count"
+        ],
+        "PartnerTag": AMAZON_PARTNER_TAG,
+        "PartnerType": "Associates",
+        "Marketplace": "www.amazon.com",
+        "ItemCount": max_results
+    }
+    
+    # Add price filter if specified
+    if max_price:
+        payload["MaxPrice"] = int(max_price * 100)  # Convert to cents
+    
+    # Signed request over the container's keep-alive connection pool; fails fast (PAAPIUnavailable)
+    # while the breaker is open or the rate limit has no slot, so callers fall back without waiting
+    result = call_operation(get_pool(), _signer, 'SearchItems', payload, limiter=get_limiter(), breaker=get_breaker())
+    
+    products = []
+    
+    if 'SearchResult' in result and 'Items' in result['SearchResult']:
+        for item in result['SearchResult']['Items']:
+            try:
+                # Extract product information
+                asin = item.get('ASIN', '')
+                
+                # Title
+                title = item.get('ItemInfo', {}).get('Title', {}).get('DisplayValue', 'Unknown Product')
+                
+                # Price
+                price = 0.0
+                offers = item.get('Offers', {}).get('Listings', [])
+                if offers and len(offers) > 0:
+                    price_data = offers[0].get('Price', {})
+                    price = price_data.get('Amount', 0.0)
+                
+                # Image
+                image_url = ''
+                images = item.get('Images', {}).get('Primary', {})
+                if images:
+                    image_url = images.get('Large', {}).get('URL', '')
+                
+                # Rating
+                rating = 0.0
+                reviews_count = 0
+                customer_reviews = item.get('CustomerReviews', {})
+                if customer_reviews:
+                    rating_str = customer_reviews.get('StarRating', {}).get('Value', '0')
+                    rating = float(rating_str) if rating_str else 0.0
+                    reviews_count = customer_reviews.get('Count', 0)
+                
+                # Build affiliate URL
+                product_url = f"https://www.amazon.com/dp/{asin}?tag={AMAZON_PARTNER_TAG}"
+                
+                # Features (description)
+                features = item.get('ItemInfo', {}).get('Features', {}).get('DisplayValues', [])
+                description = features[0] if features else ''
+                
+                products.append({
+                    'name': title,
+                    'price': price,
+                    'url': product_url,
+                    'image_url': image_url,
+                    'rating': rating,
+                    'reviews': reviews_count,
+                    'description': description,
+                    'asin': asin,
+                    'affiliate_source': 'amazon'
+                })
+                
+            except Exception as e:
+                logger.error(f"Error parsing product: {str(e)}")
+                continue
+    
+    logger.info(f"Found {len(products)} products from Amazon API")
+    return products
+
 def get_mock_products(query: str, max_price: Optional[float] = None) -> List[Dict[str, Any]]:
     """
     Fallback mock products when API is not available or returns errors.
@@ -243,7 +261,7 @@ def product_search_tool(query: str, max_price: Optional[float] = None, category:
     """
     try:
         # Try real Amazon API
-        products = search_amazon_products_api(query, max_price)
+        products = search_amazon_products_api(query, max_price, category=category)
         
         # If API returned no results, use mock data
         if not products:
@@ -258,7 +276,7 @@ def product_search_tool(query: str, max_price: Optional[float] = None, category:
             "max_price": max_price,
             "total_results": len(products),
             "products": products,
-            "data_source": "amazon_api" if AMAZON_ACCESS_KEY else "mock_data"
+            "data_source": "amazon_api" if AMAZON_API_CONFIGURED else "mock_data"
         }
         
         return json.dumps(response)
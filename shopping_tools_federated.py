@@ -0,0 +1,181 @@
+# shopping_tools_federated.py
+# Curated catalog and live PA-API searched together under one deadline, merged by ASIN
+
+import os
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional, Any, Callable, Tuple
+import shopping_tools
+import shopping_tools_amazon_api
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Time budget for a whole search; live results not in by then are left out of the response
+FEDERATED_DEADLINE_SECONDS = float(os.environ.get('FEDERATED_DEADLINE_MS', '1200')) / 1000.0
+# Live searches run on a small shared pool so they can outlive the response that stopped waiting for them
+FEDERATED_WORKERS = int(os.environ.get('FEDERATED_WORKERS', '4'))
+MAX_RESULTS = 10
+LIVE_MAX_RESULTS = 5
+
+Search = Callable[[str, Optional[float], Optional[str]], List[Dict[str, Any]]]
+
+def merge_by_asin(curated: List[Dict[str, Any]], live: List[Dict[str, Any]],
+                  max_results: int = MAX_RESULTS) -> List[Dict[str, Any]]:
+    """
+    Interleave the two ranked lists, keeping the first product seen per
+    ASIN. A curated product that also came back live keeps its curated
+    details but takes the live price. Products without an ASIN are kept.
+    """
+    live_prices = {p['asin']: p['price'] for p in live if p.get('asin') and p.get('price')}
+    merged: List[Dict[str, Any]] = []
+    seen = set()
+    for i in range(max(len(curated), len(live))):
+        for products in (curated, live):
+            if i >= len(products):
+                continue
+            product = products[i]
+            asin = product.get('asin')
+            if asin:
+                if asin in seen:
+                    continue
+                seen.add(asin)
+                if asin in live_prices and product.get('price') != live_prices[asin]:
+                    product = dict(product, price=live_prices[asin])
+            merged.append(product)
+            if len(merged) == max_results:
+                return merged
+    return merged
+
+class FederatedSearch:
+    """
+    Runs the live search on a worker thread and the curated search (in
+    memory, about a millisecond) on the caller's, then waits for the live
+    results only until the deadline. A live search that misses it keeps
+    running; since it goes through the PA-API cache, its results serve the
+    next identical search. `live` is None when PA-API is not configured.
+    """
+
+    def __init__(self, curated: Search, live: Optional[Search], deadline_seconds: float = FEDERATED_DEADLINE_SECONDS,
+                 workers: int = FEDERATED_WORKERS):
+        self.curated = curated
+        self.live = live
+        self.deadline_seconds = deadline_seconds
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.searches = 0
+        self.live_ok = 0
+        self.live_timeouts = 0
+        self.live_errors = 0
+        self.live_skipped = 0
+        self.curated_errors = 0
+
+    def search(self, query: str, max_price: Optional[float] = None, category: Optional[str] = None,
+               deadline_seconds: Optional[float] = None) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+        """(merged products, per-source outcome: ok / timeout / error / unavailable / not_configured)"""
+        budget = self.deadline_seconds if deadline_seconds is None else deadline_seconds
+        deadline = time.monotonic() + budget
+        self._count('searches')
+        pending = self._get_executor().submit(self.live, query, max_price, category) if self.live else None
+
+        sources = {}
+        try:
+            curated = self.curated(query, max_price, category)
+            sources['curated'] = 'ok'
+        except Exception as e:
+            logger.error(f"Curated search error: {str(e)}")
+            self._count('curated_errors')
+            curated, sources['curated'] = [], 'error'
+
+        live: List[Dict[str, Any]] = []
+        if pending is None:
+            sources['amazon_api'] = 'not_configured'
+        else:
+            try:
+                live = pending.result(timeout=max(0.0, deadline - time.monotonic()))
+                self._count('live_ok')
+                sources['amazon_api'] = 'ok'
+            except shopping_tools_amazon_api.PAAPIUnavailable:
+                # Breaker open or rate limit reached: answered at once, no upstream call made
+                self._count('live_skipped')
+                sources['amazon_api'] = 'unavailable'
+            except FutureTimeoutError:
+                logger.info(f"PA-API missed the {budget * 1000:.0f}ms search deadline, answering without it")
+                self._count('live_timeouts')
+                sources['amazon_api'] = 'timeout'
+            except Exception as e:
+                logger.error(f"Amazon API error: {str(e)}")
+                self._count('live_errors')
+                sources['amazon_api'] = 'error'
+
+        return merge_by_asin(curated, live), sources
+
+    def stats(self) -> Dict[str, int]:
+        """Searches run and how the live source did on them"""
+        with self._lock:
+            return {
+                'searches': self.searches,
+                'live_ok': self.live_ok,
+                'live_timeouts': self.live_timeouts,
+                'live_errors': self.live_errors,
+                'live_skipped': self.live_skipped,
+                'curated_errors': self.curated_errors,
+            }
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='federated-live')
+        return self._executor
+
+def _live_search(query: str, max_price: Optional[float], category: Optional[str]) -> List[Dict[str, Any]]:
+    return shopping_tools_amazon_api.search_amazon_products_live(query, max_price, LIVE_MAX_RESULTS, category or None)
+
+# The curated leg shares product_search_tool's result cache and single-flight
+_federated = FederatedSearch(shopping_tools.search_products_cached,
+                             _live_search if shopping_tools_amazon_api.AMAZON_API_CONFIGURED else None)
+
+def get_federated_stats() -> Dict[str, int]:
+    """Deadline hits and live-source outcomes for product_search_tool"""
+    return _federated.stats()
+
+def product_search_tool(query: str, max_price: Optional[float] = None, category: Optional[str] = None) -> str:
+    """
+    Product search over the curated catalog and PA-API at once, in
+    shopping_tools.product_search_tool's format plus a `sources` field.
+    Never takes much longer than FEDERATED_DEADLINE_MS.
+    """
+    try:
+        products, sources = _federated.search(query, max_price, category)
+        response = {
+            "status": "success",
+            "query": query,
+            "category": category,
+            "max_price": max_price,
+            "total_results": len(products),
+            "products": products,
+            "data_source": "federated",
+            "sources": sources
+        }
+        return json.dumps(response)
+
+    except Exception as e:
+        logger.error(f"Product search error: {str(e)}")
+        error_response = {
+            "status": "error",
+            "query": query,
+            "error": str(e),
+            "message": "Unable to search for products."
+        }
+        return json.dumps(error_response)
+
+affiliate_injector = shopping_tools.affiliate_injector
@@ -0,0 +1,80 @@
+# single_flight.py
+# Request coalescing: concurrent identical calls share one in-flight computation
+
+import threading
+from typing import Dict, Optional, Any, Callable, Hashable
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls by key within a process. The first caller
+    for a key runs the computation; callers arriving while it is in flight
+    wait for it and get the same result (or exception) instead of running
+    it again. Nothing is kept once the call completes; caching is left to
+    the caches in front of or behind it.
+
+    `clone` is applied to the result handed to each waiter, for results
+    that callers may modify.
+    """
+
+    def __init__(self, clone: Optional[Callable[[Any], Any]] = None):
+        self.clone = clone
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.peak_waiters = 0
+        self._waiting: Dict[Hashable, int] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """fn() for the first caller of `key`; its result for everyone who joins while it runs"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                waiting = self._waiting[key] = self._waiting.get(key, 0) + 1
+                self.peak_waiters = max(self.peak_waiters, waiting)
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return self.clone(call.result) if self.clone else call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                self._waiting.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def stats(self) -> Dict[str, int]:
+        """Counters: computations run, callers that waited on one instead, and the largest wait group"""
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'errors': self.errors,
+                'peak_waiters': self.peak_waiters,
+            }
@@ -0,0 +1,95 @@
+# test_catalog_delta.py
+# Delta upserts, deletes and new products layered onto a base snapshot
+
+import json
+import pytest
+from catalog_delta import DeltaFeed, DirectoryDeltaSource, LayeredSnapshot
+from catalog_ranking import BM25FRanker, top_products
+from catalog_snapshot import CatalogSnapshot
+
+BASE = [
+    {'name': 'Wireless Headphones', 'price': 99.0, 'asin': 'B000000001', 'category': 'electronics',
+     'subcategory': 'headphones', 'rating': 4.5},
+    {'name': 'Studio Headphones', 'price': 149.0, 'asin': 'B000000002', 'category': 'electronics',
+     'subcategory': 'headphones', 'rating': 4.7},
+    {'name': 'Coffee Maker', 'price': 49.0, 'asin': 'B000000003', 'category': 'home',
+     'subcategory': 'kitchen', 'rating': 4.1},
+]
+
+@pytest.fixture
+def base():
+    return CatalogSnapshot(BASE, version='base', source='test')
+
+@pytest.fixture
+def deltas(tmp_path):
+    def write(name, upserts=(), deletes=()):
+        (tmp_path / name).write_text(json.dumps({'upserts': list(upserts), 'deletes': list(deletes)}))
+    write.feed = DeltaFeed(DirectoryDeltaSource(str(tmp_path)), poll_seconds=0)
+    return write
+
+def _asins(snapshot, query, **filters):
+    return [snapshot.store.to_dict(hit.product_id)['asin']
+            for hit in top_products(snapshot, BM25FRanker(), query, 10, **filters)]
+
+def _product(snapshot, asin):
+    doc_id = snapshot.store.find(asin)
+    return snapshot.store.to_dict(doc_id) if doc_id is not None else None
+
+def test_no_deltas_serves_the_base(base, deltas):
+    assert deltas.feed.apply(base) is base
+
+def test_upsert_merges_over_the_base_record(base, deltas):
+    deltas('001.json', upserts=[{'asin': 'B000000001', 'price': 19.0}])
+    snapshot = deltas.feed.apply(base)
+    assert isinstance(snapshot, LayeredSnapshot)
+    assert len(snapshot) == 3
+    assert _product(snapshot, 'B000000001') == dict(BASE[0], price=19.0)
+    assert _asins(snapshot, 'headphones', max_price=50) == ['B000000001']
+    # The replaced base row no longer matches, under any price
+    assert _asins(snapshot, 'headphones').count('B000000001') == 1
+    assert [snapshot.store.to_dict(doc_id)['asin'] for doc_id in snapshot.index.match('headphones')].count('B000000001') == 1
+    assert _product(base, 'B000000001')['price'] == 99.0
+
+def test_delete_removes_the_product(base, deltas):
+    deltas('001.json', deletes=['B000000002'])
+    snapshot = deltas.feed.apply(base)
+    assert len(snapshot) == 2
+    assert _product(snapshot, 'B000000002') is None
+    assert _asins(snapshot, 'headphones') == ['B000000001']
+    assert 'B000000002' not in [p['asin'] for p in snapshot.products()]
+    assert snapshot.facets.counts()['subcategory']['headphones'] == 1
+
+def test_new_product_is_searchable(base, deltas):
+    deltas('001.json', upserts=[{'asin': 'B000000009', 'name': 'Travel Neck Pillow', 'price': 25.0,
+                                 'category': 'home', 'subcategory': 'travel', 'rating': 4.6}])
+    snapshot = deltas.feed.apply(base)
+    assert len(snapshot) == 4
+    assert _asins(snapshot, 'pillow') == ['B000000009']
+    assert _asins(snapshot, 'pillow', category='travel') == ['B000000009']
+    assert [snapshot.store.to_dict(doc_id)['asin'] for doc_id in snapshot.index.match('pillow')] == ['B000000009']
+    assert snapshot.facets.counts()['category']['home'] == 2
+
+def test_later_deltas_win_and_invalid_upserts_are_skipped(base, deltas):
+    deltas('001.json', upserts=[{'asin': 'B000000003', 'price': 45.0}], deletes=['B000000002'])
+    first = deltas.feed.apply(base)
+    deltas('002.json', upserts=[{'asin': 'B000000003', 'price': 39.0}, {'asin': 'B000000002', 'price': 120.0},
+                                {'asin': 'B000000010', 'price': 5.0}])
+    second = deltas.feed.apply(base)
+    assert second is not first and second.version != first.version
+    assert second.deltas == ('001.json', '002.json')
+    assert _product(second, 'B000000003')['price'] == 39.0
+    # Neither a deleted product nor an unknown ASIN has a full record to merge a price into
+    assert _product(second, 'B000000002') is None
+    assert _product(second, 'B000000010') is None
+
+def test_overlay_scores_match_a_rebuilt_catalog(base, deltas):
+    deltas('001.json', upserts=[{'asin': 'B000000002', 'price': 139.0}])
+    layered = deltas.feed.apply(base)
+    rebuilt = CatalogSnapshot([BASE[0], BASE[2], dict(BASE[1], price=139.0)], version='rebuilt', source='test')
+    ranker = BM25FRanker()
+    for query in ('headphones', 'studio headphones', 'coffee'):
+        scores = {layered.store.to_dict(hit.product_id)['asin']: hit.score
+                  for hit in top_products(layered, ranker, query, 10)}
+        expected = {rebuilt.store.to_dict(hit.product_id)['asin']: hit.score
+                    for hit in top_products(rebuilt, ranker, query, 10)}
+        assert scores == pytest.approx(expected, rel=1e-5)
@@ -0,0 +1,68 @@
+# test_catalog_mmap.py
+# A mapped catalog is only used for the JSON it was compiled from
+
+import os
+import json
+import pytest
+from catalog_artifact import ArtifactError
+from catalog_mmap import mapped_path_for, open_mapped
+from catalog_snapshot import SnapshotCache
+from catalog_stream import file_content_hash
+from extract_products import compile_catalog
+
+PRODUCTS = [
+    {'name': 'Wireless Headphones', 'price': 99.0, 'asin': 'B000000001', 'category': 'electronics', 'rating': 4.5},
+    {'name': 'Coffee Maker', 'price': 49.0, 'asin': 'B000000002', 'category': 'home', 'rating': 4.1},
+]
+
+@pytest.fixture
+def catalog(tmp_path):
+    path = str(tmp_path / 'products-simple.json')
+    _write(path, PRODUCTS)
+    compile_catalog(path)
+    return path
+
+def _write(path, products):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(products, f)
+
+def _replace(path, products):
+    """Rewrite the JSON and move its mtime on, as a redeploy would"""
+    stat = os.stat(path)
+    _write(path, products)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+def _repriced(price):
+    return [dict(PRODUCTS[0], price=price)] + PRODUCTS[1:]
+
+def test_open_mapped_rejects_another_source(catalog):
+    open_mapped(mapped_path_for(catalog), source_hash=file_content_hash(catalog))
+    _write(catalog, _repriced(1.5))
+    with pytest.raises(ArtifactError, match='stale'):
+        open_mapped(mapped_path_for(catalog), source_hash=file_content_hash(catalog))
+    with pytest.raises(ArtifactError, match='stale'):
+        open_mapped(mapped_path_for(catalog), source_size=os.path.getsize(catalog))
+
+def test_cold_start_uses_matching_map(catalog):
+    snapshot = SnapshotCache(path=catalog).get()
+    assert snapshot.source == mapped_path_for(catalog)
+    assert snapshot.version == file_content_hash(catalog)
+    assert snapshot.store.to_dict(0)['price'] == 99.0
+
+def test_cold_start_ignores_map_of_a_resized_source(catalog):
+    _write(catalog, _repriced(1.5))
+    snapshot = SnapshotCache(path=catalog).get()
+    assert snapshot.source == catalog
+    assert snapshot.store.to_dict(0)['price'] == 1.5
+
+def test_warm_reload_ignores_map_of_a_changed_source(catalog):
+    cache = SnapshotCache(path=catalog, recheck_seconds=0)
+    assert cache.get().source == mapped_path_for(catalog)
+    # Same size, different content: only the hash can tell
+    size = os.path.getsize(catalog)
+    _replace(catalog, _repriced(11.0))
+    assert os.path.getsize(catalog) == size
+    snapshot = cache.get()
+    assert snapshot.source == catalog
+    assert snapshot.version == file_content_hash(catalog)
+    assert snapshot.store.to_dict(0)['price'] == 11.0
@@ -0,0 +1,43 @@
+# test_catalog_ranking.py
+# BM25F ranking gives the same results with and without NumPy
+
+import os
+import pytest
+import catalog_ranking
+from catalog_snapshot import CatalogSnapshot
+from catalog_stream import iter_products
+from catalog_ranking import BM25FRanker, top_products
+
+CATALOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'products-simple.json')
+
+QUERIES = ('wireless headphones', 'noise canceling headphones', 'best', 'coffee maker', 'kitchen',
+           'smart home speaker', 'batteries', 'tv', 'zzzz no such product')
+
+@pytest.fixture(scope='module')
+def snapshot():
+    return CatalogSnapshot(iter_products(CATALOG), version='test', source=CATALOG)
+
+def _ranked(snapshot, query, max_price=None, category=None):
+    return [(hit.product_id, hit.score) for hit in
+            top_products(snapshot, BM25FRanker(), query, 10, max_price=max_price, category=category)]
+
+def _assert_same(expected, actual):
+    assert [doc_id for doc_id, _ in actual] == [doc_id for doc_id, _ in expected]
+    assert [score for _, score in actual] == pytest.approx([score for _, score in expected], rel=1e-5)
+
+@pytest.mark.skipif(catalog_ranking.np is None, reason="NumPy not installed")
+@pytest.mark.parametrize('query', QUERIES)
+@pytest.mark.parametrize('max_price, category', [(None, None), (100.0, None), (None, 'electronics')])
+def test_pure_python_matches_numpy(snapshot, monkeypatch, query, max_price, category):
+    expected = _ranked(snapshot, query, max_price, category)
+    monkeypatch.setattr(catalog_ranking, 'np', None)
+    _assert_same(expected, _ranked(snapshot, query, max_price, category))
+
+@pytest.mark.skipif(catalog_ranking.np is None, reason="NumPy not installed")
+@pytest.mark.parametrize('query', QUERIES)
+def test_threshold_algorithm_matches_numpy(snapshot, monkeypatch, query):
+    expected = _ranked(snapshot, query, max_price=200.0)
+    monkeypatch.setattr(catalog_ranking, 'np', None)
+    # Force the early-terminating path even on this small catalog
+    monkeypatch.setattr(catalog_ranking, 'EARLY_TERMINATION_MIN_POSTINGS', 0)
+    _assert_same(expected, _ranked(snapshot, query, max_price=200.0))
@@ -0,0 +1,107 @@
+# test_paapi_client.py
+# Circuit breaker states and the rate limiter in front of PA-API calls
+
+import pytest
+import paapi_client
+from paapi_client import AdaptiveTokenBucket, CircuitBreaker, PAAPIError, PAAPIUnavailable, TokenBucket, call_operation
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, cooldown_seconds=10, clock=FakeClock())
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    breaker.record_success()
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.stats()['opened'] == 1 and breaker.stats()['rejected'] == 1
+
+def test_breaker_half_opens_and_closes_on_a_good_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 9.9
+    assert not breaker.allow()
+    clock.now = 10.0
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one probe at a time
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() and breaker.allow()
+
+def test_failed_probe_reopens_for_another_cooldown():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10.0
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now = 19.9
+    assert not breaker.allow()
+    clock.now = 20.0
+    assert breaker.allow()
+    assert breaker.stats()['opened'] == 2 and breaker.stats()['probes'] == 2
+
+def test_released_probe_lets_another_through():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10.0
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+def test_call_operation_feeds_breaker_and_limiter(monkeypatch):
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_seconds=10, clock=clock)
+    limiter = AdaptiveTokenBucket(100, clock=clock, sleep=clock.sleep)
+    responses = [PAAPIError(429, b''), PAAPIError(500, b''), {'ok': True}]
+
+    def send(pool, signer, operation, payload, timeout):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(paapi_client, '_send_operation', send)
+    call = lambda: call_operation(None, None, 'SearchItems', {}, limiter=limiter, breaker=breaker, max_wait=1.0)
+    with pytest.raises(PAAPIError):
+        call()
+    assert limiter.rate == 50 and limiter.throttles == 1
+    with pytest.raises(PAAPIError):
+        call()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(PAAPIUnavailable):
+        call()
+    clock.now += 10
+    assert call() == {'ok': True}
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert limiter.rate == 55
+
+def test_token_bucket_waits_up_to_max_wait():
+    clock = FakeClock()
+    bucket = TokenBucket(2, clock=clock, sleep=clock.sleep)
+    assert bucket.try_acquire(0)
+    assert not bucket.try_acquire(0.25)
+    assert clock.now == 0
+    assert bucket.try_acquire(0.5)
+    assert clock.now == pytest.approx(0.5)
+
+def test_token_bucket_rejects_a_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
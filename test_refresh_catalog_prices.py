@@ -0,0 +1,76 @@
+# test_refresh_catalog_prices.py
+# A price refresh that stops part-way resumes from its checkpoint
+
+import json
+import pytest
+import refresh_catalog_prices
+from paapi_client import PAAPIError, TokenBucket
+from refresh_catalog_prices import GET_ITEMS_BATCH, PriceRefresh
+
+ASINS = [f"B{n:09d}" for n in range(25)]
+
+@pytest.fixture
+def catalog(tmp_path):
+    path = tmp_path / 'products.json'
+    path.write_text(json.dumps([{'name': f"Product {asin}", 'asin': asin, 'price': 10.0} for asin in ASINS]))
+    return str(path)
+
+class FakeGetItems:
+    """Stands in for call_operation: every item costs 12.5, except that chosen calls fail"""
+
+    def __init__(self, fail_calls=()):
+        self.fail_calls = set(fail_calls)
+        self.calls = []
+
+    def __call__(self, pool, signer, operation, payload):
+        assert operation == 'GetItems' and len(payload['ItemIds']) <= GET_ITEMS_BATCH
+        self.calls.append(list(payload['ItemIds']))
+        if len(self.calls) in self.fail_calls:
+            raise PAAPIError(503, b'{"Errors": []}')
+        items = [{'ASIN': asin, 'Offers': {'Listings': [{'Price': {'Amount': 12.5}}]}}
+                 for asin in payload['ItemIds'] if asin != ASINS[-1]]
+        return {'ItemsResult': {'Items': items}}
+
+def _refresh(catalog, tmp_path):
+    return PriceRefresh(catalog, pool=None, signer=None, bucket=TokenBucket(1000, 10), partner_tag='tag',
+                        checkpoint_path=str(tmp_path / 'checkpoint'), retries=0)
+
+def test_resume_fetches_only_the_remaining_batches(catalog, tmp_path, monkeypatch):
+    failing = FakeGetItems(fail_calls={2})
+    monkeypatch.setattr(refresh_catalog_prices, 'call_operation', failing)
+    first = _refresh(catalog, tmp_path)
+    assert first.run() is False
+    assert failing.calls[0] == ASINS[:10]
+    assert first.checkpoint['done'] == ASINS[:10]
+
+    resumed_calls = FakeGetItems()
+    monkeypatch.setattr(refresh_catalog_prices, 'call_operation', resumed_calls)
+    resumed = _refresh(catalog, tmp_path)
+    assert resumed.delta_name == first.delta_name
+    assert resumed.run() is True
+    assert resumed_calls.calls == [ASINS[10:20], ASINS[20:]]
+    assert resumed.checkpoint['missing'] == [ASINS[-1]]
+
+    delta = resumed.delta()
+    assert [upsert['asin'] for upsert in delta['upserts']] == ASINS[:-1]
+    assert all(upsert['price'] == 12.5 for upsert in delta['upserts'])
+    resumed.finish()
+    assert not (tmp_path / 'checkpoint').exists()
+
+def test_checkpoint_of_another_catalog_version_is_discarded(catalog, tmp_path, monkeypatch):
+    monkeypatch.setattr(refresh_catalog_prices, 'call_operation', FakeGetItems(fail_calls={2}))
+    assert _refresh(catalog, tmp_path).run() is False
+
+    with open(catalog, 'w') as f:
+        json.dump([{'name': 'Only product', 'asin': ASINS[0], 'price': 10.0}], f)
+    calls = FakeGetItems()
+    monkeypatch.setattr(refresh_catalog_prices, 'call_operation', calls)
+    refresh = _refresh(catalog, tmp_path)
+    assert refresh.run() is True
+    assert calls.calls == [[ASINS[0]]]
+
+def test_unchanged_prices_are_still_written(catalog, tmp_path):
+    # Earlier deltas may have moved the price away from the catalog file; this one must put it back
+    refresh = _refresh(catalog, tmp_path)
+    refresh.checkpoint['results'] = {ASINS[0]: {'price': 10.0, 'availability': None}}
+    assert refresh.delta()['upserts'] == [{'asin': ASINS[0], 'price': 10.0}]
@@ -5,7 +5,7 @@ import json
 import boto3
 import os
 import logging
-from shopping_tools import product_search_tool
+from shopping_tools import product_search_tool, product_search_batch, get_facet_counts, MAX_BATCH_SEARCHES
 
 # Configure logging
 logger = logging.getLogger()
@@ -32,6 +32,10 @@ def lambda_handler(event, context):
             return handle_shopping_search(event)
         elif path == '/api/shopping-results':
             return handle_shopping_results(event)
+        elif path == '/api/shopping/facets':
+            return handle_shopping_facets(event)
+        elif path == '/api/shopping/batch':
+            return handle_shopping_batch(event)
         else:
             # Return the main page
             return {
@@ -153,6 +157,82 @@ def handle_shopping_search(event):
             'body': json.dumps({'error': 'Failed to search for products'})
         }
 
+def handle_shopping_batch(event):
+    """Handle several shopping searches in one request, run in parallel"""
+    try:
+        # Parse request body: {"searches": [{"query": ..., "max_price": ..., "category": ...}, ...]}
+        body = json.loads(event.get('body', '{}'))
+        searches = body.get('searches')
+        
+        if not isinstance(searches, list) or not searches or not all(isinstance(s, dict) and s.get('query') for s in searches):
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({'error': 'searches must be a non-empty list of objects with a query'})
+            }
+        
+        if len(searches) > MAX_BATCH_SEARCHES:
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({'error': f'At most {MAX_BATCH_SEARCHES} searches per batch'})
+            }
+        
+        # Each result is already a product_search_tool JSON document
+        tool_outputs = product_search_batch(searches)
+        
+        logger.info(f"Shopping batch completed: {len(tool_outputs)} searches")
+        
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': '{"results": [' + ', '.join(tool_outputs) + ']}'
+        }
+        
+    except Exception as e:
+        logger.error(f"Error in shopping batch: {str(e)}")
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({'error': 'Failed to search for products'})
+        }
+
+def handle_shopping_facets(event):
+    """Handle requests for category/subcategory product counts"""
+    try:
+        # Counts are precomputed when the catalog loads - no catalog scan here
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({'facets': get_facet_counts()})
+        }
+        
+    except Exception as e:
+        logger.error(f"Error in shopping facets: {str(e)}")
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({'error': 'Failed to load product categories'})
+        }
+
 def handle_shopping_results(event):
     """Handle requests for shopping results from DynamoDB"""
     try: